@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # İstek profili (kapalıyken etkisiz; bkz. REQUEST_PROFILER_* ayarları). Tüm sorguları görmesi için en başta.
+    'policy_management.profiling.RequestProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -181,4 +183,154 @@ ALLIANZ_API_SECRET = "SIZIN_ALLIANZ_SIFRENIZ"
 DOGA_API_USER = "SIZIN_DOGA_KULLANICI_ADINIZ"
 DOGA_API_PASS = "SIZIN_DOGA_SIFRENIZ"
 
-TURKIYE_API_TOKEN = "SIZIN_TURKIYE_TOKENINIZ"
\ No newline at end of file
+TURKIYE_API_TOKEN = "SIZIN_TURKIYE_TOKENINIZ"
+
+# ----------------------------------------------------------------------
+# ⏱️ TEKLİF MOTORU SÜRE SINIRLARI (saniye)
+# ----------------------------------------------------------------------
+# Tüm şirketler aynı anda çağrılır. Süresinde yanıt vermeyen şirket
+# "Zaman aşımı" olarak kaydedilir, diğer teklifler beklemeden gösterilir.
+QUOTE_DEFAULT_CARRIER_TIMEOUT = 5.0
+QUOTE_CARRIER_TIMEOUTS = {
+    'allianz': 5.0,
+    'doga': 5.0,
+    'turkiye': 5.0,
+}
+QUOTE_OVERALL_TIMEOUT = 8.0
+QUOTE_ENGINE_MAX_WORKERS = 16
+
+# Gerçek API'ler hazır olduğunda True yapın: teklifler asenkron, bağlantı
+# havuzlu bağlayıcılarla (aget_quote) alınır. False iken simülasyon çalışır.
+QUOTE_USE_REAL_APIS = False
+
+# Şirket bazlı HTTP bağlantı havuzu ayarları (boş bırakılanlar varsayılanı kullanır)
+# Örnek: {'allianz': {'url': 'http://127.0.0.1:8765/allianz', 'pool_maxsize': 20, 'read_timeout': 5.0}}
+CARRIER_HTTP_OPTIONS = {}
+
+# ----------------------------------------------------------------------
+# 💾 TEKLİF ÖNBELLEĞİ
+# ----------------------------------------------------------------------
+# Aynı müşteri + sigorta tipi + şirket için alınan teklif, TTL süresince
+# şirkete tekrar sorulmadan kullanılır. Süresi dolan teklif
+# QUOTE_CACHE_STALE_TTL boyunca şirket beklenmeden "güncel değil" işaretiyle
+# gösterilir (en iyi teklif seçilmez); bu sırada şirket arka planda yeniden sorgulanır.
+QUOTE_CACHE_ENABLED = True
+QUOTE_CACHE_DEFAULT_TTL = 300
+QUOTE_CACHE_TTLS = {
+    'allianz': 300,
+    'doga': 300,
+    'turkiye': 600,
+}
+QUOTE_CACHE_STALE_TTL = 900
+QUOTE_CACHE_MAX_ENTRIES = 2048
+
+# ----------------------------------------------------------------------
+# 🩺 ŞİRKET SAĞLIK TAKİBİ (Devre kesici ve uyarlanabilir süre sınırı)
+# ----------------------------------------------------------------------
+# Art arda hata veren şirket bir süre hiç çağrılmaz; süre sınırı şirketin
+# gözlenen p95 yanıt süresine göre (QUOTE_CARRIER_TIMEOUTS'u aşmadan) ayarlanır.
+CARRIER_HEALTH_ENABLED = True
+CARRIER_BREAKER_FAILURE_THRESHOLD = 5
+CARRIER_BREAKER_RESET_TIMEOUT = 30.0
+CARRIER_HEALTH_WINDOW = 100
+CARRIER_ADAPTIVE_MIN_SAMPLES = 20
+CARRIER_ADAPTIVE_TIMEOUT_FACTOR = 1.5
+CARRIER_ADAPTIVE_MIN_TIMEOUT = 0.2
+
+# ----------------------------------------------------------------------
+# 🧵 ARKA PLAN TEKLİF İŞLERİ
+# ----------------------------------------------------------------------
+# True iken "Fiyat Çek" isteği işi kuyruğa yazar ve hemen döner; sayfa
+# sonuçları yoklar. İşçileri başlatmak için:
+#   python manage.py run_quote_workers --processes 4
+QUOTE_BACKGROUND_JOBS = False
+
+# ----------------------------------------------------------------------
+# 📈 ŞİRKET ÇAĞRI METRİKLERİ
+# ----------------------------------------------------------------------
+# Her bağlayıcı çağrısının süresi, sonucu ve veri boyutu kaydedilir.
+# Özet: python manage.py carrier_metrics  |  JSON: /metrics/carriers/ (yöneticiler)
+# Çağrı başına ayrıntılı log için 'policy_management.carriers' logger'ını DEBUG yapın.
+CARRIER_METRICS_ENABLED = True
+# Sayaçlar bellekte biriktirilir; en geç bu kadar saniyede bir veya bu kadar
+# çağrı birikince tek bir işlemle (transaction) veritabanına yazılır.
+CARRIER_METRICS_FLUSH_INTERVAL = 10.0
+CARRIER_METRICS_FLUSH_THRESHOLD = 200
+
+# ----------------------------------------------------------------------
+# 🔍 İSTEK PROFİLİ (SQL sayısı/süresi, tekrarlanan sorgular, yavaş istek kaydı)
+# ----------------------------------------------------------------------
+# Canlı ortamda açılabilir: isteklerin sadece SAMPLE_RATE kadarı ölçülür ve
+# SLOW_MS'i aşanlar "Yavaş İstekler" tablosuna (admin) yazılır.
+REQUEST_PROFILER_ENABLED = False
+REQUEST_PROFILER_SAMPLE_RATE = 0.1
+REQUEST_PROFILER_SLOW_MS = 500
+REQUEST_PROFILER_TOP_QUERIES = 5
+REQUEST_PROFILER_REPEAT_THRESHOLD = 3
+REQUEST_PROFILER_MAX_ROWS = 5000
+# Fazla kayıtlar her yavaş istekte değil, bu kadar kayıtta bir silinir.
+REQUEST_PROFILER_PRUNE_EVERY = 100
+
+# ----------------------------------------------------------------------
+# 🔎 MÜŞTERİ ARAMA
+# ----------------------------------------------------------------------
+# None: SQLite'ta FTS5 indeksi, diğer veritabanlarında indekssiz tarama.
+# Başka bir arka uç için sınıfın nokta yolu verilebilir, ör.
+# 'policy_management.customer_search.DatabaseScanBackend'
+CUSTOMER_SEARCH_BACKEND = None
+
+# ----------------------------------------------------------------------
+# 📎 POLİÇE DÖKÜMANLARI (içerik adresli depo)
+# ----------------------------------------------------------------------
+# Aynı dosya birden fazla poliçeye yüklense de diskte tek kopya tutulur
+# (MEDIA_ROOT/policies/blobs/). Bakım ve eski dosyaların taşınması:
+#   python manage.py policy_documents --migrate-legacy --recount --gc
+
+# ----------------------------------------------------------------------
+# 🧾 DÖKÜMAN ANALİZİ (işlem havuzu)
+# ----------------------------------------------------------------------
+# Analiz web isteği dışında, düşük öncelikli ayrı süreçlerde çalışır.
+# Aynı içerikteki döküman ikinci kez analiz edilmez (SHA-256 ile saklanır).
+DOCUMENT_EXTRACTION_WORKERS = 2
+DOCUMENT_EXTRACTION_QUEUE_SIZE = 8   # Kuyruk doluysa istemciye 503 (tekrar dene) döner
+DOCUMENT_EXTRACTION_NICE = 10
+DOCUMENT_EXTRACTION_TIMEOUT = 120
+DOCUMENT_EXTRACTION_WAIT = 5         # JavaScript'siz formda sonucun beklendiği süre (sn)
+
+# ----------------------------------------------------------------------
+# 📊 PRİM ANALİZİ
+# ----------------------------------------------------------------------
+# Sonuçlar (acente, filtreler) bazında önbelleğe alınır ve poliçe yazıldığında
+# geçersiz olur. Birden fazla web süreci varsa ANALYTICS_CACHE_ALIAS paylaşılan
+# bir önbelleği (Redis/Memcached) göstermeli; aksi halde süreçler TTL dolana kadar
+# eski sonucu gösterebilir.
+ANALYTICS_CACHE_ALIAS = 'default'
+ANALYTICS_CACHE_TTL = 600
+
+# ----------------------------------------------------------------------
+# 🏆 EN İYİ TEKLİF TABLOSU
+# ----------------------------------------------------------------------
+# Müşteri + sigorta tipi başına bu süre (saniye) içindeki en ucuz başarılı
+# teklif tutulur; teklif listesindeki "en iyi fiyat" işareti buradan gelir.
+# Mevcut teklifler için tabloyu ilk kez doldurmak (veya sapmayı düzeltmek):
+#   python manage.py rebuild_best_offers
+QUOTE_BEST_OFFER_MAX_AGE = 7 * 24 * 3600
+
+# ----------------------------------------------------------------------
+# 🧩 ACENTE SAYFA PARÇASI ÖNBELLEĞİ
+# ----------------------------------------------------------------------
+# Dashboard, müşteri ve poliçe listelerinin içeriği acente başına önbelleğe
+# alınır; müşteri/poliçe/teklif yazıldığında o acentenin parçaları geçersiz olur.
+# Varsayılan önbellek süreç içidir (locmem). Birden fazla web süreci/sunucu
+# varsa paylaşılan bir önbellek tanımlanıp AGENT_FRAGMENT_CACHE_ALIAS ona
+# yönlendirilmeli (geçersiz kılma tüm süreçlerde görünsün), örnek:
+#   CACHES['shared'] = {'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#                       'LOCATION': 'redis://127.0.0.1:6379/1'}
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+AGENT_FRAGMENT_CACHE_ENABLED = True
+AGENT_FRAGMENT_CACHE_ALIAS = 'default'
+AGENT_FRAGMENT_CACHE_TTL = 300
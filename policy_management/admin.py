@@ -1,7 +1,8 @@
 # policy_management/admin.py
 
 from django.contrib import admin
-from .models import Customer, Policy
+from .models import BestOffer, Customer, DocumentBlob, DocumentExtraction, Policy, RequestProfile
+from .customer_search import get_backend as get_search_backend
 
 # ------------------------------------
 # 1. Customer ModelAdmin Sınıfı
@@ -16,6 +17,15 @@ class CustomerAdmin(admin.ModelAdmin):
     
     # Arama çubuğunda arama yapılacak alanlar
     search_fields = ('name', 'tckn_vkn', 'email', 'phone')
+
+    # Arama icontains ile tüm tabloyu taramak yerine tam metin indeksini kullanır
+    search_limit = 1000
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        ids = get_search_backend().search(search_term, limit=self.search_limit)
+        return queryset.filter(customer_id__in=ids), False
     
     # Detay sayfasında alanların gruplandırılması
     fieldsets = (
@@ -46,6 +56,9 @@ class PolicyAdmin(admin.ModelAdmin):
         'start_date', 
     )
     search_fields = ('policy_number', 'customer__name', 'policy_type')
+
+    # Poliçe.__str__ ve 'customer' sütunu müşteri adını okur; tek JOIN ile getir
+    list_select_related = ('customer',)
     
     # list_editable kısmından da status'ü çıkarın:
     list_editable = (
@@ -56,4 +69,63 @@ class PolicyAdmin(admin.ModelAdmin):
     # customer_name alanını list_display'de kullanmak için özel metot
     def customer_name(self, obj):
         return obj.customer.name
-    customer_name.short_description = 'Müşteri Adı' # Sütun başlığını ayarla
\ No newline at end of file
+    customer_name.short_description = 'Müşteri Adı' # Sütun başlığını ayarla
+
+
+# ------------------------------------
+# 3. Yavaş İstek Kayıtları (profiling.py)
+# ------------------------------------
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        'created_at', 'method', 'path', 'status_code', 'total_ms', 'db_ms',
+        'query_count', 'template_query_count', 'duplicate_query_count',
+    )
+    list_filter = ('view_name', 'status_code')
+    search_fields = ('path', 'view_name')
+    ordering = ('-id',)
+    readonly_fields = [field.name for field in RequestProfile._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+# ------------------------------------
+# 4. Poliçe Döküman Deposu (storage.py)
+# ------------------------------------
+@admin.register(DocumentBlob)
+class DocumentBlobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'size', 'ref_count', 'created_at')
+    search_fields = ('name', 'sha256')
+    ordering = ('-id',)
+    readonly_fields = [field.name for field in DocumentBlob._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(DocumentExtraction)
+class DocumentExtractionAdmin(admin.ModelAdmin):
+    list_display = ('original_name', 'status', 'duration_ms', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('original_name', 'sha256')
+    ordering = ('-id',)
+    readonly_fields = [field.name for field in DocumentExtraction._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
+
+
+# ------------------------------------
+# 5. En İyi Teklifler (best_offers.py)
+# ------------------------------------
+@admin.register(BestOffer)
+class BestOfferAdmin(admin.ModelAdmin):
+    list_display = ('customer', 'policy_type', 'company_name', 'premium_amount', 'quoted_at', 'agent')
+    list_filter = ('policy_type',)
+    search_fields = ('customer__name', 'company_name')
+    ordering = ('-quoted_at',)
+    readonly_fields = [field.name for field in BestOffer._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,266 @@
+# policy_management/analytics.py
+
+import datetime
+import hashlib
+import json
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Avg, Case, CharField, Count, F, FloatField, IntegerField, Max, Min, Sum, Value, When
+from django.db.models.functions import Cast, Substr
+from django.utils import timezone
+
+from .carrier_health import percentile
+from .carrier_metrics import histogram_percentile
+from .models import Policy
+
+try:
+    import numpy
+except ImportError:  # İsteğe bağlı: yoksa saf Python ile hesaplanır
+    numpy = None
+
+# -----------------------------------------------------
+# Prim Analizi (Gruplanmış Toplamlar)
+# -----------------------------------------------------
+# Gruplama ve toplama veritabanında yapılır (GROUP BY + SUM/COUNT/AVG); Python'a
+# yalnızca grup satırları gelir. Dağılım da veritabanında sabit prim aralıklarına
+# (PREMIUM_BUCKETS) göre sayılır, yüzdelikler bu sayımlardan tahmin edilir.
+# exact=True ise primler okunup kesin yüzdelik hesaplanır (NumPy varsa onunla).
+#
+# Sonuçlar (kapsam, filtreler) anahtarıyla önbelleğe alınır. Kapsam: acente ID'si
+# veya yöneticiler için 'all'. Poliçe yazıldığında ilgili kapsamların sürümü
+# değişir (invalidate(), signals.py) ve eski sonuçlar artık okunmaz.
+# Not: Varsayılan önbellek süreç içidir (locmem); birden fazla web süreci varsa
+# ANALYTICS_CACHE_ALIAS paylaşılan bir önbelleğe (Redis/Memcached) yönlendirilmeli.
+
+DEFAULTS = {
+    'ANALYTICS_CACHE_ALIAS': 'default',
+    'ANALYTICS_CACHE_TTL': 600,
+}
+
+# Gruplama boyutları: ad -> ifade
+DIMENSIONS = {
+    'policy_type': 'policy_type',
+    'month': Substr(Cast('start_date', CharField()), 1, 7),  # 'YYYY-MM' (tarih fonksiyonu çağrılmaz)
+    'status': 'status',
+    'city': 'customer__address_city',
+    'agent': 'issued_by_agent__username',
+}
+DIMENSION_LABELS = {
+    'policy_type': 'Sigorta Tipi',
+    'month': 'Ay',
+    'status': 'Durum',
+    'city': 'İl',
+    'agent': 'Acente',
+}
+MAX_GROUP_BY = 3
+
+# Dağılım kovalarının üst sınırları (TL)
+PREMIUM_BUCKETS = (500, 1000, 2500, 5000, 7500, 10000, 15000, 25000, 50000, 100000, float('inf'))
+PERCENTILES = (50, 90, 95, 99)
+
+
+class AnalyticsError(ValueError):
+    """Geçersiz gruplama veya filtre."""
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+def _cache():
+    return caches[_setting('ANALYTICS_CACHE_ALIAS')]
+
+
+def is_admin(user):
+    return user.is_staff or user.is_superuser or getattr(user, 'role', None) == 'admin'
+
+
+# -----------------------------------------------------
+# Parametreler
+# -----------------------------------------------------
+def parse_params(data, user):
+    """GET parametrelerini doğrulanmış bir sözlüğe çevirir (önbellek anahtarı da bundan üretilir)."""
+    group_by = [name for name in (data.get('group_by') or 'policy_type').split(',') if name]
+    unknown = [name for name in group_by if name not in DIMENSIONS]
+    if unknown:
+        raise AnalyticsError(f"Bilinmeyen gruplama: {', '.join(unknown)}")
+    if len(group_by) > MAX_GROUP_BY:
+        raise AnalyticsError(f"En fazla {MAX_GROUP_BY} alana göre gruplanabilir.")
+
+    params = {'group_by': list(dict.fromkeys(group_by))}
+    for name in ('policy_type', 'status', 'city'):
+        if data.get(name):
+            params[name] = data[name]
+    for name in ('date_from', 'date_to'):
+        if data.get(name):
+            try:
+                params[name] = datetime.date.fromisoformat(data[name]).isoformat()
+            except ValueError:
+                raise AnalyticsError(f"Geçersiz tarih ({name}): {data[name]!r}")
+    if data.get('agent') and is_admin(user):
+        params['agent'] = data['agent']
+    params['stats'] = data.get('stats') in ('1', 'true')
+    params['exact'] = data.get('exact') in ('1', 'true')
+    return params
+
+
+def scope_for(user):
+    return 'all' if is_admin(user) else str(user.pk)
+
+
+def filtered_policies(user, params):
+    queryset = Policy.objects.all()
+    if not is_admin(user):
+        queryset = queryset.filter(issued_by_agent=user)
+    elif params.get('agent'):
+        agent = params['agent']
+        queryset = queryset.filter(**{'issued_by_agent_id' if agent.isdigit() else 'issued_by_agent__username': agent})
+    if params.get('policy_type'):
+        queryset = queryset.filter(policy_type=params['policy_type'])
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    if params.get('city'):
+        queryset = queryset.filter(customer__address_city=params['city'])
+    if params.get('date_from'):
+        queryset = queryset.filter(start_date__gte=params['date_from'])
+    if params.get('date_to'):
+        queryset = queryset.filter(start_date__lte=params['date_to'])
+    return queryset
+
+
+# -----------------------------------------------------
+# Hesaplama
+# -----------------------------------------------------
+AGGREGATES = {
+    'count': Count('pk'),
+    'total': Sum('premium_amount'),
+    'average': Avg('premium_amount'),
+    'min': Min('premium_amount'),
+    'max': Max('premium_amount'),
+}
+
+
+def _money(value):
+    if value is None:
+        return None
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+def _clean_row(row):
+    for name in ('total', 'average', 'min', 'max'):
+        row[name] = _money(row[name])
+    return row
+
+
+def grouped_totals(queryset, group_by):
+    # Grup sütunları 'g_' önekiyle adlandırılır (model alanlarıyla çakışmasın)
+    expressions = {
+        f"g_{name}": F(DIMENSIONS[name]) if isinstance(DIMENSIONS[name], str) else DIMENSIONS[name]
+        for name in group_by
+    }
+    rows = queryset.values(**expressions).annotate(**AGGREGATES).order_by(*expressions)
+    return [
+        _clean_row({**{name: row[f"g_{name}"] for name in group_by},
+                    **{name: row[name] for name in AGGREGATES}})
+        for row in rows
+    ]
+
+
+def distribution(queryset):
+    """Prim aralıklarına göre poliçe sayıları (tek GROUP BY sorgusu)."""
+    bucket = Case(
+        *[When(premium_amount__lt=upper, then=Value(index)) for index, upper in enumerate(PREMIUM_BUCKETS[:-1])],
+        default=Value(len(PREMIUM_BUCKETS) - 1),
+        output_field=IntegerField(),
+    )
+    counts = [0] * len(PREMIUM_BUCKETS)
+    for row in queryset.annotate(bucket=bucket).values('bucket').annotate(n=Count('pk')).order_by():
+        counts[row['bucket']] = row['n']
+    return counts
+
+
+def exact_percentiles(queryset):
+    """Tüm primleri okuyarak kesin yüzdelikler. NumPy varsa vektörel hesaplanır."""
+    # Ondalık -> float dönüşümü veritabanında (satır başına Decimal nesnesi kurulmaz)
+    values = queryset.annotate(value=Cast('premium_amount', FloatField())).values_list('value', flat=True)
+    values = values.order_by().iterator(chunk_size=10000)
+    if numpy is not None:
+        array = numpy.fromiter(values, dtype=float)
+        if not array.size:
+            return {}, 'numpy'
+        results = numpy.percentile(array, PERCENTILES, method='inverted_cdf')
+        return {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, results)}, 'numpy'
+    data = list(values)
+    return {f"p{p}": percentile(data, p) for p in PERCENTILES} if data else {}, 'python'
+
+
+def compute_analytics(user, params):
+    queryset = filtered_policies(user, params)
+    rows = grouped_totals(queryset, params['group_by'])
+
+    totals = {'count': sum(row['count'] for row in rows),
+              'total': sum((row['total'] or Decimal('0') for row in rows), Decimal('0'))}
+    totals['average'] = _money(totals['total'] / totals['count']) if totals['count'] else None
+
+    result = {
+        'group_by': params['group_by'],
+        'filters': {k: v for k, v in params.items() if k not in ('group_by', 'stats', 'exact')},
+        'rows': rows,
+        'totals': totals,
+        'generated_at': timezone.now().isoformat(),
+    }
+
+    if params['stats']:
+        counts = distribution(queryset)
+        result['distribution'] = {
+            'buckets': ['inf' if upper == float('inf') else upper for upper in PREMIUM_BUCKETS],
+            'counts': counts,
+        }
+        if params['exact']:
+            result['percentiles'], result['percentile_method'] = exact_percentiles(queryset)
+        else:
+            # Kova sınırları gözlenen en yüksek primle kırpılır: son dolu kova
+            # (ve sınırsız kova) gerçek değer aralığında enterpole edilir
+            highest = max((float(row['max']) for row in rows if row['max'] is not None), default=0.0)
+            buckets = tuple(min(upper, highest) for upper in PREMIUM_BUCKETS)
+            result['percentiles'] = {
+                f"p{p}": histogram_percentile(counts, p, buckets) for p in PERCENTILES
+            }
+            result['percentile_method'] = 'histogram'
+    return result
+
+
+# -----------------------------------------------------
+# Önbellek
+# -----------------------------------------------------
+def _version_key(scope):
+    return f"analytics:version:{scope}"
+
+
+def invalidate(*agent_ids):
+    """Acentelerin (ve yönetici görünümünün) önbellekteki sonuçlarını geçersiz kılar."""
+    version = time.time_ns()
+    _cache().set_many(
+        {_version_key(scope): version for scope in {*(str(a) for a in agent_ids if a), 'all'}},
+        timeout=None,
+    )
+
+
+def cache_key(scope, params):
+    version = _cache().get(_version_key(scope), 0)
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    return f"analytics:{scope}:{version}:{digest}"
+
+
+def get_analytics(user, params):
+    """Önbellekte varsa oradan, yoksa hesaplayıp kaydeder. ('cached' alanı eklenir.)"""
+    key = cache_key(scope_for(user), params)
+    result = _cache().get(key)
+    if result is not None:
+        return {**result, 'cached': True}
+    result = compute_analytics(user, params)
+    _cache().set(key, result, _setting('ANALYTICS_CACHE_TTL'))
+    return {**result, 'cached': False}
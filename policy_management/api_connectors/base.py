@@ -0,0 +1,101 @@
+# policy_management/api_connectors/base.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+
+# Şirket bazlı HTTP ayarlarının varsayılanları.
+# settings.CARRIER_HTTP_OPTIONS = {'allianz': {'url': ..., 'pool_maxsize': 20}} ile ezilebilir.
+DEFAULT_HTTP_OPTIONS = {
+    'pool_maxsize': 10,       # Şirket başına açık tutulacak en fazla bağlantı
+    'connect_timeout': 3.0,   # Bağlantı kurma süre sınırı (saniye)
+    'read_timeout': 10.0,     # Yanıt bekleme süre sınırı (saniye)
+}
+
+
+class CarrierClient:
+    """
+    Tek bir sigorta şirketi için uzun ömürlü HTTP istemcisi.
+
+    Her şirketin kendi requests.Session'ı ve keep-alive bağlantı havuzu vardır;
+    böylece her teklifte yeniden TCP+TLS el sıkışması yapılmaz.
+    """
+
+    def __init__(self, code, url, pool_maxsize, connect_timeout, read_timeout, headers=None):
+        self.code = code
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,  # Havuz doluysa yeni bağlantı açmak yerine sırada bekle
+            max_retries=0,
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Connection': 'keep-alive'})
+        if headers:
+            self.session.headers.update(headers)
+
+    def post_json(self, payload):
+        """JSON gövdeyle POST atar, JSON yanıtı döndürür. HTTP hatalarında istisna fırlatır."""
+        response = self.session.post(self.url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    async def apost_json(self, payload):
+        """
+        post_json'un asenkron karşılığı (olay döngüsünü bloklamaz).
+        Paylaşılan havuz kullanılır: asyncio.run() döngünün kendi havuzunu kapatırken
+        süresi dolmuş (hâlâ okuyan) çağrıları beklerdi.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_http_executor, self.post_json, payload)
+
+    def close(self):
+        self.session.close()
+
+
+# Bloklayan HTTP çağrıları için süreç boyunca paylaşılan iş parçacığı havuzu
+_http_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'CARRIER_HTTP_MAX_WORKERS', 32),
+    thread_name_prefix='carrier-http',
+)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(code, default_url, headers=None):
+    """Şirketin süreç boyunca paylaşılan istemcisini döndürür (ilk çağrıda oluşturur)."""
+    client = _clients.get(code)
+    if client is not None:
+        return client
+
+    with _clients_lock:
+        if code not in _clients:
+            options = dict(DEFAULT_HTTP_OPTIONS)
+            options.update(getattr(settings, 'CARRIER_HTTP_OPTIONS', {}).get(code, {}))
+            _clients[code] = CarrierClient(
+                code,
+                url=options.get('url', default_url),
+                pool_maxsize=options['pool_maxsize'],
+                connect_timeout=options['connect_timeout'],
+                read_timeout=options['read_timeout'],
+                headers=headers,
+            )
+        return _clients[code]
+
+
+def close_clients():
+    """Tüm bağlantı havuzlarını kapatır (ayar değişikliği veya testler için)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
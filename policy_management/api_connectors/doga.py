@@ -1,9 +1,13 @@
+import logging
 import requests
-import json
 import random
 import time
 from django.conf import settings
 
+from .base import get_client
+
+logger = logging.getLogger('policy_management.carriers')
+
 # Doğa'nın size vereceği (varsayımsal) API adresi
 DOGA_API_URL = "https://api.gercek.dogasigorta.com.tr/teklif_al"
 COMPANY_NAME = "Doğa Sigorta"
@@ -14,38 +18,14 @@ def get_quote(customer_data, policy_type):
     """
     
     # -----------------------------------------------------------------
-    # GERÇEK API ÇAĞRISI İSKELETİ (Gelecekte burayı dolduracaksınız)
-    # -----------------------------------------------------------------
-    
-    # payload = {
-    #     "kullanici_adi": settings.DOGA_API_USER,
-    #     "sifre": settings.DOGA_API_PASS,
-    #     "musteri_detay": customer_data,
-    #     "police_tipi": policy_type
-    # }
-
-    # try:
-    #     response = requests.post(DOGA_API_URL, json=payload, timeout=10)
-    #     response.raise_for_status()
-    #     data = response.json()
-    #     fiyat = data['prim']
-        
-    #     return {
-    #         'company': COMPANY_NAME, 'price': fiyat,
-    #         'status': 'success', 'policy_type': policy_type
-    #     }
-    # except requests.exceptions.RequestException as e:
-    #     return {
-    #         'company': COMPANY_NAME, 'price': None,
-    #         'status': 'error', 'message': f"API Bağlantı Hatası: {e}"
-    #     }
+    # GERÇEK API ÇAĞRISI -> aget_quote() (asenkron, bağlantı havuzlu)
     # -----------------------------------------------------------------
 
 
     # -----------------------------------------------------------------
     # SİMÜLASYON KODU (Şimdilik bu çalışacak)
     # -----------------------------------------------------------------
-    print(f"[Simülasyon] {COMPANY_NAME} API çağrılıyor...")
+    logger.debug("[Simülasyon] %s API çağrılıyor (%s)", COMPANY_NAME, policy_type)
     time.sleep(0.3) # Doğa daha hızlı (simülasyon)
     base_price = 5000 if policy_type == 'Kasko' else 1500
     price = base_price * (1 + random.uniform(-0.2, 0.2)) # Doğa (daha rekabetçi)
@@ -55,4 +35,37 @@ def get_quote(customer_data, policy_type):
         'price': round(price, 2),
         'status': 'success',
         'policy_type': policy_type
-    }
\ No newline at end of file
+    }
+
+
+def build_payload(customer_data, policy_type):
+    return {
+        "kullanici_adi": settings.DOGA_API_USER,
+        "sifre": settings.DOGA_API_PASS,
+        "musteri_detay": customer_data,
+        "police_tipi": policy_type
+    }
+
+
+def parse_response(data, policy_type):
+    return {
+        'company': COMPANY_NAME, 'price': data['prim'],
+        'status': 'success', 'policy_type': policy_type
+    }
+
+
+async def aget_quote(customer_data, policy_type):
+    """
+    Doğa Sigorta'dan teklifi gerçek API üzerinden (asenkron) alır.
+    Bağlantılar şirkete özel keep-alive havuzundan kullanılır.
+    """
+    client = get_client('doga', DOGA_API_URL)
+
+    try:
+        data = await client.apost_json(build_payload(customer_data, policy_type))
+        return parse_response(data, policy_type)
+    except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+        return {
+            'company': COMPANY_NAME, 'price': None,
+            'status': 'error', 'message': f"API Bağlantı Hatası: {e}"
+        }
@@ -0,0 +1,327 @@
+# policy_management/api_connectors/stub_server.py
+
+import copy
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Gerçek API'lere erişmeden (offline) bağlayıcıları denemek için yerel şirket simülatörü.
+# Her şirketin yolu, o şirketin gerçek istek/yanıt biçimini kullanır. Yol başına
+# davranış (profil) ayarlanabilir:
+#   latency          : yanıt süresi dağılımı (fixed / uniform / normal / lognormal / exponential)
+#   error_rate       : HTTP 5xx dönme olasılığı (error_statuses içinden)
+#   malformed_rate   : 200 ama beklenmeyen gövde dönme olasılığı (ayrıştırma hatası)
+#   slow_loris_rate  : başlıkları gönderip gövdeyi bayt bayt, yavaşça gönderme olasılığı
+#   max_rps          : saniyedeki istek sınırı (aşılırsa 429 + Retry-After)
+#   max_concurrency  : aynı anda işlenen istek sınırı (aşılırsa 503)
+
+
+def _allianz_response(payload, rng):
+    base_price = 5000 if payload.get('urun_kodu') == 'KASKO' else 1500
+    return {'teklifDetay': {'toplamPrim': round(base_price * (1 + rng.uniform(-0.1, 0.5)), 2)}}
+
+
+def _doga_response(payload, rng):
+    base_price = 5000 if payload.get('police_tipi') == 'Kasko' else 1500
+    return {'prim': round(base_price * (1 + rng.uniform(-0.2, 0.2)), 2)}
+
+
+def _turkiye_response(payload, rng):
+    base_price = 5000 if payload.get('productType') == 'KASKO' else 1500
+    return {'quote': {'grossPremium': round(base_price * (1 + rng.uniform(0.1, 0.6)), 2)}}
+
+
+STUB_ROUTES = {
+    '/allianz': _allianz_response,
+    '/doga': _doga_response,
+    '/turkiye': _turkiye_response,
+}
+
+DEFAULT_PROFILE = {
+    'latency': {'distribution': 'fixed', 'value': 0.0},
+    'error_rate': 0.0,
+    'error_statuses': [500, 502, 503],
+    'malformed_rate': 0.0,
+    'slow_loris_rate': 0.0,
+    'slow_loris_delay': 0.5,   # Gövdenin her baytı arasındaki bekleme (saniye)
+    'max_rps': None,
+    'max_concurrency': None,
+}
+
+# Şirketlerin varsayılan süreleri, senkron simülasyondaki time.sleep değerlerine yakındır
+CARRIER_PROFILES = {
+    'allianz': {'latency': {'distribution': 'lognormal', 'median': 0.5, 'sigma': 0.3}},
+    'doga': {'latency': {'distribution': 'lognormal', 'median': 0.3, 'sigma': 0.3}},
+    'turkiye': {'latency': {'distribution': 'lognormal', 'median': 0.7, 'sigma': 0.4}},
+}
+
+
+def _merge(base, extra):
+    merged = copy.deepcopy(base)
+    for key, value in (extra or {}).items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def parse_override(text):
+    """'allianz.latency.median=0.2' -> ('allianz', ['latency', 'median'], 0.2)"""
+    path, sep, raw = text.partition('=')
+    parts = path.strip().split('.')
+    if not sep or len(parts) < 2:
+        raise ValueError(f"Geçersiz ayar: {text!r} (beklenen: sirket.alan=deger)")
+    try:
+        value = json.loads(raw)
+    except ValueError:
+        value = raw
+    return parts[0], parts[1:], value
+
+
+def build_profiles(config=None, overrides=()):
+    """
+    Varsayılan profilleri; config sözlüğü ({'allianz': {...}}) ve
+    'sirket.alan=deger' biçimindeki ayarlarla birleştirir.
+    """
+    profiles = {}
+    for route in STUB_ROUTES:
+        code = route.strip('/')
+        profile = _merge(DEFAULT_PROFILE, CARRIER_PROFILES.get(code))
+        profiles[code] = _merge(profile, (config or {}).get(code))
+
+    for text in overrides:
+        code, keys, value = parse_override(text)
+        if code not in profiles:
+            raise ValueError(f"Bilinmeyen şirket: {code}")
+        target = profiles[code]
+        for key in keys[:-1]:
+            target = target.setdefault(key, {})
+        target[keys[-1]] = value
+    return profiles
+
+
+def sample_latency(spec, rng):
+    """Profildeki dağılımdan bir yanıt süresi (saniye) çeker."""
+    kind = spec.get('distribution', 'fixed')
+    if kind == 'fixed':
+        value = spec.get('value', 0.0)
+    elif kind == 'uniform':
+        value = rng.uniform(spec['low'], spec['high'])
+    elif kind == 'normal':
+        value = rng.gauss(spec['mean'], spec['stddev'])
+    elif kind == 'lognormal':
+        value = rng.lognormvariate(math.log(spec['median']), spec['sigma'])
+    elif kind == 'exponential':
+        value = rng.expovariate(1 / spec['mean'])
+    else:
+        raise ValueError(f"Bilinmeyen dağılım: {kind}")
+    if spec.get('max') is not None:
+        value = min(value, spec['max'])
+    return max(value, 0.0)
+
+
+class TokenBucket:
+    """Saniyede 'rate' istek; anlık en fazla 'rate' kadar birikim."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class SimulatedEndpoint:
+    def __init__(self, code, responder, profile, rng):
+        self.code = code
+        self.responder = responder
+        self.profile = profile
+        self.rng = rng
+        self.bucket = TokenBucket(profile['max_rps']) if profile.get('max_rps') else None
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.stats = {'requests': 0, 'statuses': {}, 'slow_loris': 0, 'malformed': 0}
+
+    def admit(self):
+        """İstek kabul edilirse None, edilmezse (durum kodu, mesaj) döndürür."""
+        with self.lock:
+            self.stats['requests'] += 1
+        if self.bucket is not None and not self.bucket.take():
+            return 429, 'İstek sınırı aşıldı'
+        with self.lock:
+            limit = self.profile.get('max_concurrency')
+            if limit and self.in_flight >= limit:
+                return 503, 'Sunucu meşgul'
+            self.in_flight += 1
+        return None
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def count_status(self, status):
+        with self.lock:
+            statuses = self.stats['statuses']
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    def count(self, field):
+        with self.lock:
+            self.stats[field] += 1
+
+    def roll(self, field):
+        return self.rng.random() < (self.profile.get(field) or 0)
+
+    def snapshot(self):
+        with self.lock:
+            return {'profile': self.profile, 'in_flight': self.in_flight, **copy.deepcopy(self.stats)}
+
+
+class StubCarrierHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1: bağlantı istemci kapatana kadar açık kalır (keep-alive)
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections_opened += 1
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/_stats':
+            self._send_json(200, self.server.stats())
+        else:
+            self._send_json(404, {'error': 'Bulunamadı'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b'{}'
+
+        endpoint = self.server.endpoints.get(self.path.strip('/'))
+        if endpoint is None:
+            self._send_json(404, {'error': 'Bilinmeyen şirket'})
+            return
+
+        try:
+            payload = json.loads(body)
+        except ValueError:
+            self._send_json(400, {'error': 'Geçersiz JSON'})
+            return
+
+        rejected = endpoint.admit()
+        if rejected is not None:
+            status, message = rejected
+            endpoint.count_status(status)
+            self._send_json(status, {'error': message}, headers={'Retry-After': '1'})
+            return
+
+        try:
+            self._respond(endpoint, payload)
+        finally:
+            endpoint.release()
+
+    def _respond(self, endpoint, payload):
+        time.sleep(sample_latency(endpoint.profile['latency'], endpoint.rng))
+
+        with self.server.stats_lock:
+            self.server.requests_served += 1
+
+        if endpoint.roll('error_rate'):
+            status = endpoint.rng.choice(endpoint.profile['error_statuses'])
+            endpoint.count_status(status)
+            self._send_json(status, {'error': 'Simüle edilmiş sunucu hatası'})
+            return
+
+        if endpoint.roll('malformed_rate'):
+            endpoint.count('malformed')
+            data = {'beklenmeyen': 'yanit'}
+        else:
+            data = endpoint.responder(payload, endpoint.rng)
+
+        endpoint.count_status(200)
+        if endpoint.roll('slow_loris_rate'):
+            endpoint.count('slow_loris')
+            self._send_json_slowly(200, data, endpoint.profile['slow_loris_delay'])
+        else:
+            self._send_json(200, data)
+
+    def _send_headers(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _send_json(self, status, data, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        self._send_headers(status, body, headers)
+        self.wfile.write(body)
+
+    def _send_json_slowly(self, status, data, delay):
+        # Her okuma kısa sürede veri aldığı için istemcinin okuma süre sınırı tetiklenmez;
+        # yalnızca toplam süre sınırı (teklif motoru) bu durumu yakalar.
+        body = json.dumps(data).encode('utf-8')
+        self._send_headers(status, body)
+        self.wfile.flush()
+        try:
+            for i in range(len(body)):
+                self.wfile.write(body[i:i + 1])
+                self.wfile.flush()
+                time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        # Konsolu her istekte kirletmesin
+        pass
+
+
+class StubCarrierServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, handler_class=StubCarrierHandler, profiles=None, seed=None):
+        super().__init__(address, handler_class)
+        self.stats_lock = threading.Lock()
+        self.connections_opened = 0
+        self.requests_served = 0
+
+        profiles = profiles if profiles is not None else build_profiles()
+        rng = random.Random(seed)
+        self.endpoints = {
+            route.strip('/'): SimulatedEndpoint(route.strip('/'), responder, profiles[route.strip('/')], rng)
+            for route, responder in STUB_ROUTES.items()
+        }
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def http_options(self):
+        """settings.CARRIER_HTTP_OPTIONS için şirket adreslerini döndürür."""
+        return {route.strip('/'): {'url': self.base_url + route} for route in STUB_ROUTES}
+
+    def stats(self):
+        with self.stats_lock:
+            totals = {'connections_opened': self.connections_opened, 'requests_served': self.requests_served}
+        return {**totals, 'endpoints': {code: e.snapshot() for code, e in self.endpoints.items()}}
+
+
+def start_stub_server(host='127.0.0.1', port=0, profiles=None, seed=None):
+    """Sunucuyu arka planda başlatır. port=0 ise boş bir port seçilir."""
+    server = StubCarrierServer((host, port), profiles=profiles, seed=seed)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
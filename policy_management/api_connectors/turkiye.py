@@ -1,9 +1,13 @@
+import logging
 import requests
-import json
 import random
 import time
 from django.conf import settings
 
+from .base import get_client
+
+logger = logging.getLogger('policy_management.carriers')
+
 TURKIYE_API_URL = "https://api.gercek.turkiyesigorta.com.tr/quote"
 COMPANY_NAME = "Türkiye Sigorta"
 
@@ -16,12 +20,12 @@ def get_quote(customer_data, policy_type):
     # GERÇEK API ÇAĞRISI İSKELETİ (Gelecekte burayı dolduracaksınız)
     # -----------------------------------------------------------------
     
-    # ... (Buraya Türkiye Sigorta'nın API mantığı gelecek) ...
+    # -> aget_quote() (asenkron, bağlantı havuzlu)
     
     # -----------------------------------------------------------------
     # SİMÜLASYON KODU (Şimdilik bu çalışacak)
     # -----------------------------------------------------------------
-    print(f"[Simülasyon] {COMPANY_NAME} API çağrılıyor...")
+    logger.debug("[Simülasyon] %s API çağrılıyor (%s)", COMPANY_NAME, policy_type)
     time.sleep(0.7) # Türkiye Sigorta (daha yavaş)
     base_price = 5000 if policy_type == 'Kasko' else 1500
     price = base_price * (1 + random.uniform(0.1, 0.6)) # Türkiye Sigorta (daha yüksek)
@@ -31,4 +35,37 @@ def get_quote(customer_data, policy_type):
         'price': round(price, 2),
         'status': 'success',
         'policy_type': policy_type
-    }
\ No newline at end of file
+    }
+
+
+def build_payload(customer_data, policy_type):
+    return {
+        "identityNumber": customer_data.get('tckn'),
+        "productType": policy_type.upper()
+    }
+
+
+def parse_response(data, policy_type):
+    return {
+        'company': COMPANY_NAME, 'price': data['quote']['grossPremium'],
+        'status': 'success', 'policy_type': policy_type
+    }
+
+
+async def aget_quote(customer_data, policy_type):
+    """
+    Türkiye Sigorta'dan teklifi gerçek API üzerinden (asenkron) alır.
+    Bağlantılar şirkete özel keep-alive havuzundan kullanılır.
+    """
+    client = get_client('turkiye', TURKIYE_API_URL, headers={
+        "Authorization": f"Token {settings.TURKIYE_API_TOKEN}",
+    })
+
+    try:
+        data = await client.apost_json(build_payload(customer_data, policy_type))
+        return parse_response(data, policy_type)
+    except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+        return {
+            'company': COMPANY_NAME, 'price': None,
+            'status': 'error', 'message': f"API Bağlantı Hatası: {e}"
+        }
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PolicyManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'policy_management'
+
+    def ready(self):
+        # Sinyal alıcılarını kaydet (acente özet sayaçları vb.)
+        from . import signals  # noqa: F401
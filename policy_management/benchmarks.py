@@ -0,0 +1,325 @@
+# policy_management/benchmarks.py
+
+import datetime
+import gc
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .carrier_health import percentile
+from .customer_search import rebuild_index
+from .models import CustomUser, Customer, Policy, Quote
+from .quote_cache import quote_cache
+from .summaries import rebuild_summaries
+
+# -----------------------------------------------------
+# Görünüm Performans Ölçümü (benchmark_views komutu)
+# -----------------------------------------------------
+# 1) seed_dataset(): Ayrı bir veritabanına toplu INSERT ile veri üretir.
+# 2) run_scenarios(): Acente ekranlarını test istemcisiyle çağırır; her görünüm
+#    için süre yüzdelikleri, SQL sorgu sayısı ve tepe bellek ölçülür.
+# 3) Rapor JSON olarak kaydedilir; compare_reports() iki raporu karşılaştırır.
+# Ana ölçüm soğuktur: her istekten önce Django önbellekleri (sayfa parçaları,
+# prim analizi) temizlenir, görünümün gerçek maliyeti ölçülür. GET görünümleri
+# ayrıca önbellek dolu iken ölçülür ('warm').
+
+PRESETS = {
+    # ad: (acente, müşteri, poliçe, teklif)
+    'small': (10, 1_000, 10_000, 10_000),
+    'medium': (10, 10_000, 100_000, 100_000),
+    'large': (20, 100_000, 1_000_000, 1_000_000),
+}
+
+BENCHMARK_USERNAME_PREFIX = 'bench_agent_'
+
+POLICY_TYPES = ('Kasko', 'Trafik', 'DASK')
+COMPANIES = ('Allianz Sigorta', 'Doğa Sigorta', 'Türkiye Sigorta')
+CITIES = ('İstanbul', 'Ankara', 'İzmir', 'Bursa', 'Antalya', 'Konya')
+
+
+# -----------------------------------------------------
+# Veri Üretimi
+# -----------------------------------------------------
+def _bulk_insert(model, objects, batch_size):
+    """Üreteçten gelen nesneleri sabit boyutlu partiler halinde ekler (bellek sabit kalır)."""
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def seed_dataset(agents, customers, policies, quotes, batch_size=5000, seed=42):
+    """
+    Acente, müşteri, poliçe ve teklif satırlarını toplu INSERT ile üretir.
+    Aynı seed ile aynı veri oluşur (karşılaştırılabilir ölçüm için).
+    Toplu INSERT sinyalleri tetiklemediği için özet sayaçlar ve müşteri arama
+    indeksi en sonda yeniden oluşturulur.
+    """
+    rng = random.Random(seed)
+    today = timezone.localdate()
+
+    CustomUser.objects.bulk_create([
+        CustomUser(username=f"{BENCHMARK_USERNAME_PREFIX}{i}", role='agent', password='!')
+        for i in range(agents)
+    ])
+    agent_ids = list(
+        CustomUser.objects.filter(username__startswith=BENCHMARK_USERNAME_PREFIX)
+        .order_by('id').values_list('id', flat=True)
+    )
+
+    _bulk_insert(Customer, (
+        Customer(
+            name=f"Müşteri {i}",
+            tckn=f"{10_000_000_000 + i}",
+            customer_type='individual' if i % 5 else 'corporate',
+            email=f"musteri{i}@example.com",
+            address_city=CITIES[i % len(CITIES)],
+            date_of_birth=datetime.date(1960, 1, 1) + datetime.timedelta(days=i % 15000),
+            agent_id=agent_ids[i % len(agent_ids)],
+        )
+        for i in range(customers)
+    ), batch_size)
+
+    # Müşteri -> acente eşlemesi: poliçe ve teklifler müşterinin acentesine yazılır
+    customer_agents = list(Customer.objects.order_by('customer_id').values_list('customer_id', 'agent_id'))
+
+    def policy_rows():
+        for i in range(policies):
+            customer_id, agent_id = customer_agents[rng.randrange(len(customer_agents))]
+            start = today - datetime.timedelta(days=rng.randrange(0, 700))
+            yield Policy(
+                policy_number=f"BENCH-{i:08d}",
+                policy_type=rng.choice(POLICY_TYPES),
+                customer_id=customer_id,
+                issued_by_agent_id=agent_id,
+                start_date=start,
+                end_date=start + datetime.timedelta(days=365),
+                premium_amount=Decimal(rng.randrange(100_000, 2_000_000)) / 100,
+                status=rng.choice(('active', 'active', 'active', 'expired', 'cancelled')),
+            )
+
+    def quote_rows():
+        for _ in range(quotes):
+            customer_id, agent_id = customer_agents[rng.randrange(len(customer_agents))]
+            failed = rng.random() < 0.1
+            yield Quote(
+                company_name=rng.choice(COMPANIES),
+                policy_type=rng.choice(POLICY_TYPES),
+                premium_amount=0 if failed else Decimal(rng.randrange(100_000, 2_000_000)) / 100,
+                error_message='Zaman aşımı' if failed else None,
+                issued_by_agent_id=agent_id,
+                customer_id=customer_id,
+            )
+
+    if customer_agents:
+        _bulk_insert(Policy, policy_rows(), batch_size)
+        _bulk_insert(Quote, quote_rows(), batch_size)
+
+    rebuild_summaries(agent_ids)
+    rebuild_index()
+    return agent_ids
+
+
+def dataset_counts():
+    return {
+        'agents': CustomUser.objects.filter(username__startswith=BENCHMARK_USERNAME_PREFIX).count(),
+        'customers': Customer.objects.count(),
+        'policies': Policy.objects.count(),
+        'quotes': Quote.objects.count(),
+    }
+
+
+# -----------------------------------------------------
+# Senaryolar
+# -----------------------------------------------------
+# (ad, yöntem, adres, POST verisi üreten fonksiyon veya None)
+def build_scenarios(agent):
+    customer = Customer.objects.filter(agent=agent).order_by('customer_id').first()
+    quote_form = (lambda: {'customer': customer.pk, 'policy_type': 'Kasko'}) if customer else None
+    scenarios = [
+        ('dashboard', 'get', '/agent/', None),
+        ('customer_list', 'get', '/customers/', None),
+        ('customer_search', 'get', '/customers/search/?q=müşteri 12', None),
+        ('policy_list', 'get', '/policies/', None),
+        ('quote_list', 'get', '/quotes/', None),
+        ('quote_list_filtered', 'get', '/quotes/?policy_type=Kasko', None),
+        ('export_customers', 'get', '/agent/export/customers/csv/', None),
+        ('export_policies', 'get', '/agent/export/policies/csv/', None),
+        ('premium_analytics', 'get', '/analytics/premiums/?group_by=policy_type,month&stats=1', None),
+    ]
+    if quote_form:
+        scenarios.append(('quote_request', 'post', '/agent/quotes/', quote_form))
+    return scenarios
+
+
+def _request(client, method, url, data_factory):
+    """İsteği çalıştırır; akış yanıtlarının tamamı tüketilir. (durum, bayt) döndürür."""
+    if method == 'post':
+        # Önbellek temizlenir: her ölçüm şirketlere gerçekten gider
+        quote_cache.clear()
+        response = client.post(url, data_factory())
+    else:
+        response = client.get(url)
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    return response.status_code, size
+
+
+def clear_caches():
+    """Ölçümü etkileyen tüm önbellekleri boşaltır (Django CACHES + teklif önbelleği)."""
+    for cache in caches.all():
+        cache.clear()
+    quote_cache.clear()
+
+
+def _latency_summary(latencies):
+    return {
+        'min': round(min(latencies), 2),
+        'mean': round(sum(latencies) / len(latencies), 2),
+        'p50': round(percentile(latencies, 50), 2),
+        'p95': round(percentile(latencies, 95), 2),
+        'p99': round(percentile(latencies, 99), 2),
+        'max': round(max(latencies), 2),
+    }
+
+
+def _timed_runs(client, method, url, data_factory, iterations, cold):
+    latencies = []
+    queries = []
+    for _ in range(iterations):
+        if cold:
+            clear_caches()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            status, size = _request(client, method, url, data_factory)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+    return latencies, queries, status, size
+
+
+def measure_view(client, method, url, data_factory, iterations, warmup=1):
+    # Isınma (modül yükleme, bağlantı vb.); önbellekler soğuk turda her istekte temizlenir
+    for _ in range(warmup):
+        _request(client, method, url, data_factory)
+
+    latencies, queries, status, size = _timed_runs(client, method, url, data_factory, iterations, cold=True)
+
+    # Bellek ayrı bir turda ölçülür: tracemalloc süreleri yavaşlatır
+    clear_caches()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        _request(client, method, url, data_factory)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    result = {
+        'method': method.upper(),
+        'url': url,
+        'status': status,
+        'response_bytes': size,
+        'iterations': iterations,
+        'latency_ms': _latency_summary(latencies),
+        'queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+    if method == 'get':
+        # Önbellek dolu: son soğuk istek önbelleği doldurdu
+        warm_latencies, warm_queries, _, _ = _timed_runs(client, method, url, data_factory, iterations, cold=False)
+        result['warm'] = {'latency_ms': _latency_summary(warm_latencies), 'queries': max(warm_queries)}
+    return result
+
+
+def run_scenarios(agent, iterations, quote_iterations, only=None, on_result=None):
+    client = Client()
+    client.force_login(agent)
+    results = {}
+    for name, method, url, data_factory in build_scenarios(agent):
+        if only and name not in only:
+            continue
+        count = quote_iterations if method == 'post' else iterations
+        results[name] = measure_view(client, method, url, data_factory, count)
+        if on_result is not None:
+            on_result(name, results[name])
+    return results
+
+
+# -----------------------------------------------------
+# Rapor
+# -----------------------------------------------------
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_report(volumes, views):
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': connection.vendor,
+            'volumes': volumes,
+        },
+        'views': views,
+    }
+
+
+COMPARED_METRICS = (
+    ('p50', lambda v: v['latency_ms']['p50']),
+    ('p95', lambda v: v['latency_ms']['p95']),
+    ('queries', lambda v: v['queries']),
+    ('peak_memory_kb', lambda v: v['peak_memory_kb']),
+    ('warm_p50', lambda v: v['warm']['latency_ms']['p50'] if 'warm' in v else None),
+)
+
+
+def compare_reports(baseline, current, threshold=10.0):
+    """
+    Görünüm bazında farkları döndürür. Değişim yüzdesi eşiği aşan artışlar
+    'regression' olarak işaretlenir.
+    """
+    rows = []
+    for name, view in current['views'].items():
+        before = baseline.get('views', {}).get(name)
+        if before is None:
+            continue
+        for metric, getter in COMPARED_METRICS:
+            old, new = getter(before), getter(view)
+            if old is None or new is None:
+                continue  # Eski raporda olmayan ölçüm
+            change = ((new - old) / old * 100) if old else (0.0 if new == old else 100.0)
+            rows.append({
+                'view': name,
+                'metric': metric,
+                'baseline': old,
+                'current': new,
+                'change_pct': round(change, 1),
+                'regression': change > threshold,
+            })
+    return rows
@@ -0,0 +1,243 @@
+# policy_management/best_offers.py
+
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .imports import insert_rows
+from .models import BestOffer, Quote
+
+# -----------------------------------------------------
+# En İyi Teklif Tablosu (BestOffer)
+# -----------------------------------------------------
+# (acente, müşteri, sigorta tipi) başına tazelik süresi (QUOTE_BEST_OFFER_MAX_AGE)
+# içindeki en ucuz başarılı teklif BestOffer tablosunda tutulur:
+# - Teklifler kaydedilince record_quotes() yeni teklifleri mevcut satırla karşılaştırır
+#   (teklif tablosu okunmaz).
+# - Süresi geçen satır okunurken refresh() ile o grup için yeniden seçilir
+#   (quote_agent_cust_type_idx üzerinden en ucuzdan başlayan indeksli okuma).
+# - Silinen teklifler refresh_on_commit() ile biriktirilir; işlem sonunda her grup
+#   bir kez yenilenir (CASCADE ile yüzlerce teklif silinse de).
+# - rebuild() tüm tabloyu tek bir pencere fonksiyonu (ROW_NUMBER) sorgusuyla kurar.
+# Eşit primde yeni teklif tercih edilir.
+
+DEFAULTS = {
+    'QUOTE_BEST_OFFER_MAX_AGE': 7 * 24 * 3600,  # saniye
+}
+
+BEST_ORDERING = ('premium_amount', '-created_at', '-id')
+UPDATE_FIELDS = ['quote', 'company_name', 'premium_amount', 'quoted_at', 'updated_at']
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+def freshness_cutoff():
+    return timezone.now() - timedelta(seconds=_setting('QUOTE_BEST_OFFER_MAX_AGE'))
+
+
+def valid_quotes(cutoff=None):
+    """Tazelik süresi içindeki, hatasız ve primi olan, acentesi ve müşterisi belli teklifler."""
+    return Quote.objects.filter(
+        Q(error_message__isnull=True) | Q(error_message=''),
+        premium_amount__gt=0,
+        customer__isnull=False,
+        issued_by_agent__isnull=False,
+        created_at__gte=cutoff or freshness_cutoff(),
+    )
+
+
+def _key(quote):
+    return (quote.issued_by_agent_id, quote.customer_id, quote.policy_type)
+
+
+def _is_valid(quote, cutoff):
+    return (
+        not quote.error_message and quote.premium_amount and quote.premium_amount > 0
+        and quote.customer_id and quote.issued_by_agent_id and quote.created_at >= cutoff
+    )
+
+
+def _beats(quote, offer):
+    """quote, mevcut en iyi teklif satırından (offer) daha iyi mi?"""
+    if quote.premium_amount != offer.premium_amount:
+        return quote.premium_amount < offer.premium_amount
+    return (quote.created_at, quote.pk) > (offer.quoted_at, offer.quote_id)
+
+
+def _offer(quote):
+    agent_id, customer_id, policy_type = _key(quote)
+    return BestOffer(
+        agent_id=agent_id, customer_id=customer_id, policy_type=policy_type, quote_id=quote.pk,
+        company_name=quote.company_name, premium_amount=quote.premium_amount, quoted_at=quote.created_at,
+    )
+
+
+def _upsert(offers):
+    if offers:
+        BestOffer.objects.bulk_create(
+            offers,
+            update_conflicts=True,
+            unique_fields=['agent', 'customer', 'policy_type'],
+            update_fields=UPDATE_FIELDS,
+        )
+
+
+def _keys_filter(keys):
+    condition = Q()
+    for agent_id, customer_id, policy_type in keys:
+        condition |= Q(agent_id=agent_id, customer_id=customer_id, policy_type=policy_type)
+    return condition
+
+
+# -----------------------------------------------------
+# Artımlı Güncelleme
+# -----------------------------------------------------
+def record_quotes(quotes):
+    """
+    Yeni kaydedilen teklifleri en iyi teklif satırlarıyla karşılaştırır; daha ucuz
+    olan (veya mevcut satırı süresi geçmiş olan) gruplar güncellenir.
+    Quote.objects.bulk_create sinyal göndermediği için kaydeden kod çağırmalıdır.
+    """
+    cutoff = freshness_cutoff()
+    candidates = {}
+    for quote in quotes:
+        if quote.pk is None or not _is_valid(quote, cutoff):
+            continue
+        current = candidates.get(_key(quote))
+        if current is None or _beats(quote, _offer(current)):
+            candidates[_key(quote)] = quote
+    if not candidates:
+        return 0
+
+    existing = {
+        (offer.agent_id, offer.customer_id, offer.policy_type): offer
+        for offer in BestOffer.objects.filter(_keys_filter(candidates))
+    }
+    changed = [
+        _offer(quote) for key, quote in candidates.items()
+        if key not in existing or existing[key].quoted_at < cutoff or _beats(quote, existing[key])
+    ]
+    _upsert(changed)
+    return len(changed)
+
+
+def refresh(keys):
+    """Verilen (acente, müşteri, tip) grupları için en iyi teklifi teklif tablosundan yeniden seçer."""
+    keys = set(keys)
+    if not keys:
+        return
+    cutoff = freshness_cutoff()
+    best, empty = [], []
+    for agent_id, customer_id, policy_type in keys:
+        quote = valid_quotes(cutoff).filter(
+            issued_by_agent_id=agent_id, customer_id=customer_id, policy_type=policy_type
+        ).order_by(*BEST_ORDERING).first()
+        if quote is None:
+            empty.append((agent_id, customer_id, policy_type))
+        else:
+            best.append(_offer(quote))
+    with transaction.atomic():
+        _upsert(best)
+        if empty:
+            BestOffer.objects.filter(_keys_filter(empty)).delete()
+
+
+_pending = threading.local()
+
+
+def refresh_on_commit(keys):
+    """
+    Grupları içinde bulunulan işlem (transaction) tamamlanınca tek bir refresh()
+    ile yeniler; aynı grup bir kez işlenir. İşlem dışında hemen çalışır.
+    Geri alınan işlemin grupları sonraki yenilemeye katılır (zararsız: refresh
+    grubu baştan seçer).
+    """
+    pending = getattr(_pending, 'keys', None)
+    if pending is None:
+        pending = _pending.keys = set()
+    pending.update(keys)
+    transaction.on_commit(_refresh_pending)
+
+
+def _refresh_pending():
+    keys, _pending.keys = getattr(_pending, 'keys', None), None
+    if keys:
+        refresh(keys)
+
+
+# -----------------------------------------------------
+# Baştan Hesaplama (pencere fonksiyonu)
+# -----------------------------------------------------
+def ranked_best_quotes(agent_ids=None):
+    """Her grubun en iyi teklifi: ROW_NUMBER() OVER (PARTITION BY acente, müşteri, tip ...) = 1"""
+    quotes = valid_quotes()
+    if agent_ids is not None:
+        quotes = quotes.filter(issued_by_agent_id__in=agent_ids)
+    return quotes.annotate(
+        rank=Window(
+            RowNumber(),
+            partition_by=[F('issued_by_agent_id'), F('customer_id'), F('policy_type')],
+            order_by=[F('premium_amount').asc(), F('created_at').desc(), F('id').desc()],
+        )
+    ).filter(rank=1)
+
+
+def rebuild(agent_ids=None):
+    """En iyi teklif tablosunu baştan kurar. Yazılan satır sayısını döndürür."""
+    # Model nesnesi kurulmaz: pencere sorgusunun demetleri doğrudan yazılır (imports.insert_rows)
+    now = timezone.now()
+    rows = [
+        (*values, now) for values in ranked_best_quotes(agent_ids).values_list(
+            'issued_by_agent_id', 'customer_id', 'policy_type', 'id', 'company_name', 'premium_amount', 'created_at'
+        )
+    ]
+    existing = BestOffer.objects.all()
+    if agent_ids is not None:
+        existing = existing.filter(agent_id__in=agent_ids)
+    with transaction.atomic():
+        existing.delete()
+        insert_rows(BestOffer, ['agent', 'customer', 'policy_type', *UPDATE_FIELDS], rows)
+    return len(rows)
+
+
+# -----------------------------------------------------
+# Okuma
+# -----------------------------------------------------
+def best_offers(agent, customer_ids=None, policy_types=None):
+    """
+    Acentenin güncel en iyi teklif satırları. Süresi geçmiş satırlar okunurken
+    yenilenir (bu gruplarda artık daha pahalı ama taze bir teklif en iyisi olabilir).
+    """
+    offers = BestOffer.objects.filter(agent=agent).order_by('customer_id', 'policy_type')
+    if customer_ids is not None:
+        offers = offers.filter(customer_id__in=customer_ids)
+    if policy_types is not None:
+        offers = offers.filter(policy_type__in=policy_types)
+
+    rows = list(offers)
+    cutoff = freshness_cutoff()
+    stale = [(row.agent_id, row.customer_id, row.policy_type) for row in rows if row.quoted_at < cutoff]
+    if stale:
+        refresh(stale)
+        rows = list(offers.all())
+    return rows
+
+
+def best_quote_ids(agent, quotes):
+    """Listelenen tekliflerden kendi (müşteri, tip) grubunun en iyisi olanların ID'leri."""
+    listed = {quote.pk: (quote.customer_id, quote.policy_type) for quote in quotes if quote.customer_id}
+    if not listed:
+        return set()
+    offers = best_offers(
+        agent,
+        customer_ids={customer_id for customer_id, _ in listed.values()},
+        policy_types={policy_type for _, policy_type in listed.values()},
+    )
+    return {offer.quote_id for offer in offers if offer.quote_id in listed}
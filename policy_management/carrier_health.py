@@ -0,0 +1,142 @@
+# policy_management/carrier_health.py
+
+import math
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+# -----------------------------------------------------
+# Şirket Sağlık Takibi (Devre Kesici + Uyarlanabilir Süre Sınırı)
+# -----------------------------------------------------
+# Her şirket için son çağrıların süresi ve sonucu tutulur.
+# - Art arda BREAKER_FAILURE_THRESHOLD hata/zaman aşımı olursa devre AÇILIR:
+#   şirket BREAKER_RESET_TIMEOUT boyunca hiç çağrılmaz (milisaniyede hata döner).
+# - Süre dolunca devre YARI AÇIK olur: tek bir deneme çağrısına izin verilir.
+#   Deneme başarılıysa devre KAPANIR, başarısızsa yeniden AÇILIR.
+# - Süre sınırı, gözlenen p95 süresinin bir katı olarak ayarlanır
+#   (yapılandırılan sınırın üstüne çıkmaz). Zaman aşımına uğrayan çağrılar
+#   yapılandırılan sınır süresinde bitmiş sayılır: aksi halde kesilen yavaş
+#   çağrılar hesaptan düşer ve sınır giderek daralırdı.
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULTS = {
+    'CARRIER_BREAKER_FAILURE_THRESHOLD': 5,
+    'CARRIER_BREAKER_RESET_TIMEOUT': 30.0,
+    'CARRIER_HEALTH_WINDOW': 100,            # Hesaplamada kullanılan son çağrı sayısı
+    'CARRIER_ADAPTIVE_MIN_SAMPLES': 20,      # Bundan az örnekte sabit süre sınırı kullanılır
+    'CARRIER_ADAPTIVE_TIMEOUT_FACTOR': 1.5,  # süre sınırı = p95 x katsayı
+    'CARRIER_ADAPTIVE_MIN_TIMEOUT': 0.2,
+}
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+def percentile(values, p):
+    """Sıralı olmayan listeden yüzdelik değeri (en yakın sıra yöntemi)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class CarrierHealth:
+    def __init__(self, code):
+        self.code = code
+        self.samples = deque(maxlen=_setting('CARRIER_HEALTH_WINDOW'))  # (süre, başarılı_mı, zaman_aşımı_mı)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < _setting('CARRIER_BREAKER_RESET_TIMEOUT'):
+                    return False
+                self.state = HALF_OPEN
+                self.trial_in_flight = False
+            # YARI AÇIK: aynı anda tek deneme
+            if self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def record(self, latency, success, timed_out=False):
+        with self.lock:
+            self.samples.append((latency, success, timed_out))
+            if success:
+                self.consecutive_failures = 0
+                self.state = CLOSED
+            else:
+                self.consecutive_failures += 1
+                if self.state == HALF_OPEN or \
+                        self.consecutive_failures >= _setting('CARRIER_BREAKER_FAILURE_THRESHOLD'):
+                    self.state = OPEN
+                    self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+    def get_timeout(self, configured_timeout):
+        # Zaman aşımları gerçek süreleri bilinmediği için yapılandırılan sınırla sayılır
+        with self.lock:
+            latencies = [
+                configured_timeout if timed_out else latency
+                for latency, success, timed_out in self.samples if success or timed_out
+            ]
+        if len(latencies) < _setting('CARRIER_ADAPTIVE_MIN_SAMPLES'):
+            return configured_timeout
+        adaptive = percentile(latencies, 95) * _setting('CARRIER_ADAPTIVE_TIMEOUT_FACTOR')
+        return round(min(configured_timeout, max(adaptive, _setting('CARRIER_ADAPTIVE_MIN_TIMEOUT'))), 3)
+
+    def snapshot(self):
+        with self.lock:
+            samples = list(self.samples)
+            state = self.state
+        latencies = [latency for latency, _, _ in samples]
+        errors = sum(1 for _, success, _ in samples if not success)
+        return {
+            'carrier': self.code,
+            'state': state,
+            'samples': len(samples),
+            'error_rate': round(errors / len(samples), 3) if samples else 0.0,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+        }
+
+
+class HealthRegistry:
+    def __init__(self):
+        self._carriers = {}
+        self._lock = threading.Lock()
+
+    def get(self, code):
+        health = self._carriers.get(code)
+        if health is None:
+            with self._lock:
+                health = self._carriers.setdefault(code, CarrierHealth(code))
+        return health
+
+    def snapshot(self):
+        return [health.snapshot() for health in list(self._carriers.values())]
+
+    def reset(self):
+        with self._lock:
+            self._carriers.clear()
+
+
+carrier_health = HealthRegistry()
+
+
+def is_enabled():
+    return getattr(settings, 'CARRIER_HEALTH_ENABLED', True)
@@ -0,0 +1,248 @@
+# policy_management/carrier_metrics.py
+
+import bisect
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import CarrierMetric
+
+logger = logging.getLogger('policy_management.carriers')
+
+# -----------------------------------------------------
+# Şirket Çağrı Metrikleri
+# -----------------------------------------------------
+# Her bağlayıcı çağrısı için süre, sonuç ve veri boyutu kaydedilir.
+# - record(): yalnızca bellekte biriktirir (kilit + sözlük; ağ/DB yok).
+#   Şirket iş parçacıklarından güvenle çağrılabilir.
+# - flush(): birikenleri CarrierMetric satırlarına F() ile, tek bir işlemde
+#   (transaction) ekler. ORM'nin güvenle kullanılabildiği yerde (istek/işçi
+#   sonunda) çağrılır; CARRIER_METRICS_FLUSH_INTERVAL saniye geçmediyse ve
+#   CARRIER_METRICS_FLUSH_THRESHOLD çağrı birikmediyse yazmaz. Okuyan yerler
+#   (özet komutu, JSON ucu) flush(force=True) ile hepsini yazar. Süreç kapanırken
+#   yazılmamış birikim kaybolabilir (en fazla bir aralık kadar).
+# - collect(): satırlardan şirket + sigorta tipi bazında özet ve p50/p95/p99
+#   üretir (süre dağılımı kovalardan tahmin edilir).
+
+# Süre dilimlerinin üst sınırları (saniye). Son dilim sınırsızdır.
+# Veritabanında dilim sırası tutulur: liste değişirse 'carrier_metrics --reset' çalıştırın.
+LATENCY_BUCKETS = (
+    0.025, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.8, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, float('inf'),
+)
+
+DEFAULTS = {
+    'CARRIER_METRICS_FLUSH_INTERVAL': 10.0,  # saniye
+    'CARRIER_METRICS_FLUSH_THRESHOLD': 200,  # yazılmamış çağrı sayısı
+}
+
+OUTCOMES = ('success', 'error', 'timeout', 'circuit_open')
+
+# Dağılıma girmeyen sonuçlar (şirket hiç çağrılmadı)
+NOT_CALLED = ('circuit_open',)
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+def is_enabled():
+    return getattr(settings, 'CARRIER_METRICS_ENABLED', True)
+
+
+def payload_size(data):
+    """Sözlüğün JSON olarak bayt cinsinden boyutu."""
+    return len(json.dumps(data, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+def bucket_index(latency):
+    return bisect.bisect_left(LATENCY_BUCKETS, latency)
+
+
+def histogram_percentile(counts, p, buckets=LATENCY_BUCKETS):
+    """
+    Kova sayılarından yüzdelik tahmini (buckets: kovaların üst sınırları). Değer,
+    ilgili kovanın içinde doğrusal olarak konumlandırılır; son (sınırsız) kovada
+    alt sınır döndürülür.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    rank = p / 100 * total
+    seen = 0
+    for index, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower = buckets[index - 1] if index else 0.0
+            upper = buckets[index]
+            if upper == float('inf'):
+                return lower
+            return round(lower + (upper - lower) * (rank - seen) / count, 3)
+        seen += count
+    return buckets[-2]
+
+
+class MetricsRecorder:
+    def __init__(self):
+        self._pending = defaultdict(lambda: [0, 0.0, 0, 0])  # anahtar -> [sayı, süre, gönderilen, alınan]
+        self._calls = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, carrier, policy_type, outcome, latency, request_bytes=0, response_bytes=0):
+        latency = latency or 0.0
+        bucket = 0 if outcome in NOT_CALLED else bucket_index(latency)
+        with self._lock:
+            values = self._pending[(carrier, policy_type, outcome, bucket)]
+            values[0] += 1
+            values[1] += latency
+            values[2] += request_bytes
+            values[3] += response_bytes
+            self._calls += 1
+        logger.debug(
+            "carrier=%s policy_type=%s outcome=%s latency=%.3f request_bytes=%d response_bytes=%d",
+            carrier, policy_type, outcome, latency, request_bytes, response_bytes,
+        )
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: [0, 0.0, 0, 0])
+            self._calls = 0
+            self._last_flush = time.monotonic()
+        return pending
+
+    def is_due(self, interval, threshold):
+        """Yazılmamış birikim varsa ve aralık dolduysa ya da eşik aşıldıysa True."""
+        with self._lock:
+            if not self._calls:
+                return False
+            return self._calls >= threshold or time.monotonic() - self._last_flush >= interval
+
+    def flush(self):
+        """Birikenleri tek bir işlemde veritabanına ekler. Yazılan kova sayısını döndürür."""
+        pending = self.drain()
+        if pending:
+            with transaction.atomic():
+                self._write(pending)
+        return len(pending)
+
+    def _write(self, pending):
+        for (carrier, policy_type, outcome, bucket), (count, latency, sent, received) in pending.items():
+            key = {'carrier': carrier, 'policy_type': policy_type, 'outcome': outcome, 'bucket': bucket}
+            changes = {
+                'count': F('count') + count,
+                'latency_sum': F('latency_sum') + latency,
+                'request_bytes': F('request_bytes') + sent,
+                'response_bytes': F('response_bytes') + received,
+                'updated_at': timezone.now(),
+            }
+            if CarrierMetric.objects.filter(**key).update(**changes):
+                continue
+            try:
+                with transaction.atomic():
+                    CarrierMetric.objects.create(
+                        count=count, latency_sum=latency, request_bytes=sent, response_bytes=received, **key
+                    )
+            except IntegrityError:
+                # Başka bir işlem satırı aynı anda oluşturdu: ekleme olarak uygula
+                CarrierMetric.objects.filter(**key).update(**changes)
+
+
+recorder = MetricsRecorder()
+
+
+def record_call(carrier, policy_type, result, request_bytes=0):
+    """Bağlayıcı sonucunu kaydeder (quote_engine tarafından çağrılır)."""
+    if not is_enabled():
+        return
+    outcome = result.get('status') if result.get('status') in OUTCOMES else 'error'
+    response_bytes = 0 if outcome in ('timeout',) + NOT_CALLED else payload_size(result)
+    recorder.record(carrier, policy_type, outcome, result.get('elapsed'), request_bytes, response_bytes)
+
+
+def flush(force=False):
+    """
+    Birikenleri yazar. force=False iken yalnızca yazma zamanı geldiyse yazar
+    (CARRIER_METRICS_FLUSH_INTERVAL / CARRIER_METRICS_FLUSH_THRESHOLD).
+    """
+    if not is_enabled():
+        return 0
+    if not force and not recorder.is_due(
+        _setting('CARRIER_METRICS_FLUSH_INTERVAL'), _setting('CARRIER_METRICS_FLUSH_THRESHOLD')
+    ):
+        return 0
+    return recorder.flush()
+
+
+def reset():
+    recorder.drain()
+    CarrierMetric.objects.all().delete()
+
+
+def collect(carrier=None, policy_type=None):
+    """Şirket + sigorta tipi bazında özet listesi (JSON'a uygun)."""
+    rows = CarrierMetric.objects.all()
+    if carrier:
+        rows = rows.filter(carrier=carrier)
+    if policy_type:
+        rows = rows.filter(policy_type=policy_type)
+    rows = rows.values('carrier', 'policy_type', 'outcome', 'bucket').annotate(
+        total=Sum('count'), latency=Sum('latency_sum'),
+        sent=Sum('request_bytes'), received=Sum('response_bytes'),
+    ).order_by('carrier', 'policy_type')
+
+    groups = {}
+    for row in rows:
+        group = groups.setdefault((row['carrier'], row['policy_type']), {
+            'carrier': row['carrier'],
+            'policy_type': row['policy_type'],
+            'calls': 0,
+            'outcomes': dict.fromkeys(OUTCOMES, 0),
+            'histogram': [0] * len(LATENCY_BUCKETS),
+            'latency_sum': 0.0,
+            'request_bytes': 0,
+            'response_bytes': 0,
+        })
+        group['calls'] += row['total']
+        group['outcomes'][row['outcome']] = group['outcomes'].get(row['outcome'], 0) + row['total']
+        group['request_bytes'] += row['sent']
+        group['response_bytes'] += row['received']
+        if row['outcome'] not in NOT_CALLED:
+            group['histogram'][row['bucket']] += row['total']
+            group['latency_sum'] += row['latency']
+
+    summaries = []
+    for group in groups.values():
+        called = sum(group['histogram'])
+        failures = group['calls'] - group['outcomes']['success']
+        summaries.append({
+            'carrier': group['carrier'],
+            'policy_type': group['policy_type'],
+            'calls': group['calls'],
+            'outcomes': group['outcomes'],
+            'error_rate': round(failures / group['calls'], 3) if group['calls'] else 0.0,
+            'latency': {
+                'mean': round(group['latency_sum'] / called, 3) if called else None,
+                'p50': histogram_percentile(group['histogram'], 50),
+                'p95': histogram_percentile(group['histogram'], 95),
+                'p99': histogram_percentile(group['histogram'], 99),
+            },
+            'histogram': [
+                {'le': 'inf' if bound == float('inf') else bound, 'count': count}
+                for bound, count in zip(LATENCY_BUCKETS, group['histogram'])
+            ],
+            'request_bytes': {
+                'total': group['request_bytes'],
+                'mean': round(group['request_bytes'] / group['calls']) if group['calls'] else 0,
+            },
+            'response_bytes': {
+                'total': group['response_bytes'],
+                'mean': round(group['response_bytes'] / called) if called else 0,
+            },
+        })
+    return summaries
@@ -0,0 +1,209 @@
+# policy_management/customer_search.py
+
+import abc
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Customer
+
+# -----------------------------------------------------
+# Müşteri Arama (Tam Metin İndeksi)
+# -----------------------------------------------------
+# Ad, TCKN, telefon ve e-posta alanları ayrı bir arama indeksinde tutulur.
+# - Türkçe harf katlama: "İSMAİL", "ismail", "Ismail" aynı şekilde aranır;
+#   ş/ğ/ü/ö/ç/ı harfleri de sade karşılıklarına indirgenir ("sule" -> "Şule").
+# - Her kelime ön ek olarak aranır: "meh yıl" -> "Mehmet Yıldız".
+# - İndeks Customer kaydedildiğinde/silindiğinde sinyallerle güncellenir
+#   (signals.py). bulk_create/update kullanan kod index_customers() veya
+#   rebuild_index() çağırmalıdır.
+# - Arka uç ayarla değiştirilebilir: CUSTOMER_SEARCH_BACKEND (nokta yolu).
+#   Varsayılan: SQLite ise FTS5, değilse indekssiz tarama.
+
+FTS_TABLE = 'policy_management_customersearch'
+
+MIN_QUERY_LENGTH = 2
+
+_TURKISH_UPPER = str.maketrans({'İ': 'i', 'I': 'ı'})
+_ASCII_FOLD = str.maketrans('ıçğöşüâîû', 'icgosuaiu')
+_TOKEN_RE = re.compile(r'\w+')
+_NUMBER_QUERY_RE = re.compile(r'^[\d\s()+-]+$')
+# Telefon biçimli giriş: ayraç içerir veya 05/905 ile başlar. Yalnız rakamdan oluşan
+# diğer girişler TCKN/VKN olabilir; başındaki 0/90 atılmaz (VKN 0 ile başlayabilir)
+_PHONE_SHAPED_RE = re.compile(r'[\s()+-]|^(05|905)')
+
+
+def fold(text):
+    """Türkçe kurallarıyla küçük harfe çevirir ve aksanları kaldırır."""
+    return (text or '').translate(_TURKISH_UPPER).lower().translate(_ASCII_FOLD)
+
+
+def phone_digits(phone):
+    """Telefonu başında 0/90 olan ve olmayan iki biçimde döndürür (ön ek araması için)."""
+    digits = re.sub(r'\D', '', phone or '')
+    short = re.sub(r'^(90|0)', '', digits)
+    return ' '.join(dict.fromkeys(d for d in (digits, short) if d))
+
+
+def document_for(customer):
+    return {
+        'name': fold(customer.name),
+        'tckn': ' '.join(filter(None, (customer.tckn, customer.tckn_vkn))),
+        'phone': phone_digits(customer.phone),
+        'email': fold(customer.email),
+    }
+
+
+def query_tokens(query):
+    """
+    Kullanıcı girdisinden aranacak kelimeleri çıkarır. Her kelime, seçenekleri
+    listesidir (biri eşleşmesi yeter); kelimelerin hepsi eşleşmelidir.
+    """
+    query = (query or '').strip()
+    if _NUMBER_QUERY_RE.match(query):
+        # "0532 123 45" gibi girişler tek bir numara olarak aranır
+        digits = re.sub(r'\D', '', query)
+        if not digits:
+            return []
+        if not _PHONE_SHAPED_RE.search(query):
+            return [[digits]]
+        # Telefon: yazıldığı gibi veya başındaki 0/90 olmadan (indekste iki biçim de var)
+        short = re.sub(r'^(90|0)', '', digits)
+        return [list(dict.fromkeys(d for d in (digits, short) if d))]
+    return [[token] for token in _TOKEN_RE.findall(fold(query))]
+
+
+class BaseSearchBackend(abc.ABC):
+    def index(self, customers):
+        pass
+
+    def remove(self, customer_ids):
+        pass
+
+    def rebuild(self):
+        pass
+
+    @abc.abstractmethod
+    def search(self, query, agent_id=None, limit=20):
+        """Eşleşen müşteri ID'lerini en iyi eşleşme önce olacak şekilde döndürür."""
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """SQLite FTS5 sanal tablosu (0018 göçü ile oluşturulur). rowid = customer_id."""
+
+    rank_window = 1000
+
+    def index(self, customers):
+        rows = [
+            (c.pk, *document_for(c).values(), str(c.agent_id or ''))
+            for c in customers
+        ]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(row[0],) for row in rows])
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, tckn, phone, email, agent_id) "
+                f"VALUES (%s, %s, %s, %s, %s, %s)",
+                rows,
+            )
+
+    def remove(self, customer_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(pk,) for pk in customer_ids])
+
+    def rebuild(self, batch_size=2000):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        fields = ('customer_id', 'name', 'tckn', 'tckn_vkn', 'phone', 'email', 'agent_id')
+        batch = []
+        for customer in Customer.objects.only(*fields).order_by('customer_id').iterator(chunk_size=batch_size):
+            batch.append(customer)
+            if len(batch) >= batch_size:
+                self.index(batch)
+                batch = []
+        self.index(batch)
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+    def search(self, query, agent_id=None, limit=20):
+        tokens = query_tokens(query)
+        if not tokens:
+            return []
+        # Her kelime tırnak içinde ön ek olarak: FTS sözdizimi karakterleri etkisiz kalır
+        match = ' AND '.join(
+            '(' + ' OR '.join(f'"{option}"*' for option in options) + ')' for options in tokens
+        )
+        sql = f"SELECT rowid, rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+        params = [match]
+        if agent_id is not None:
+            sql += " AND agent_id = %s"
+            params.append(str(agent_id))
+        # Çok genel sorgularda ("ali") tüm eşleşmeleri puanlamamak için sıralama
+        # ilk rank_window eşleşme üzerinde yapılır
+        sql = f"SELECT rowid FROM ({sql} LIMIT %s) ORDER BY rank LIMIT %s"
+        params += [max(limit, self.rank_window), limit]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+class DatabaseScanBackend(BaseSearchBackend):
+    """İndekssiz yedek: icontains ile tarar (FTS5 olmayan veritabanları için)."""
+
+    def search(self, query, agent_id=None, limit=20):
+        query = (query or '').strip()
+        if not query:
+            return []
+        queryset = Customer.objects.all()
+        if agent_id is not None:
+            queryset = queryset.filter(agent_id=agent_id)
+        for term in query.split():
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(tckn__startswith=term) | Q(tckn_vkn__startswith=term)
+                | Q(phone__contains=term) | Q(email__icontains=term)
+            )
+        return list(queryset.order_by('name').values_list('customer_id', flat=True)[:limit])
+
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        path = getattr(settings, 'CUSTOMER_SEARCH_BACKEND', None)
+        if path:
+            _backend = import_string(path)()
+        elif connection.vendor == 'sqlite':
+            _backend = SQLiteFTSBackend()
+        else:
+            _backend = DatabaseScanBackend()
+    return _backend
+
+
+def search_customers(query, agent=None, limit=20):
+    """
+    Müşteri araması. Sonuç, eşleşme sırasına göre Customer listesidir.
+    Çok kısa sorgular (MIN_QUERY_LENGTH) boş döner.
+    """
+    if len((query or '').strip()) < MIN_QUERY_LENGTH:
+        return []
+    ids = get_backend().search(query, agent_id=agent.pk if agent is not None else None, limit=limit)
+    customers = Customer.objects.in_bulk(ids)
+    return [customers[pk] for pk in ids if pk in customers]
+
+
+def index_customers(customers):
+    get_backend().index(customers)
+
+
+def remove_customers(customer_ids):
+    get_backend().remove(customer_ids)
+
+
+def rebuild_index():
+    get_backend().rebuild()
@@ -0,0 +1,177 @@
+# policy_management/document_extraction.py
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import DocumentBlob, DocumentExtraction
+from .storage import document_storage
+from .utils import extract_policy_data_from_path
+
+# -----------------------------------------------------
+# Döküman Analizi (İşlem Havuzu)
+# -----------------------------------------------------
+# Yüklenen döküman web isteğinde analiz edilmez:
+# 1) Dosya içerik adresli depoya yazılır (storage.py); SHA-256 özeti orada hesaplanır.
+# 2) Aynı özet için tamamlanmış bir analiz varsa (DocumentExtraction) hemen döner.
+# 3) Yoksa analiz ayrı süreçlerden oluşan bir havuza gönderilir. Havuzdaki süreçler
+#    düşük öncelikle (nice) çalışır; CPU yoğun analiz web isteklerini yavaşlatmaz.
+# 4) Sırada bekleyebilecek iş sayısı sınırlıdır; kuyruk doluysa ExtractionQueueFull
+#    fırlatılır ve istemci daha sonra tekrar dener (HTTP 503).
+# Form, sonucu policy/extract/<sha256>/ adresinden sorgulayıp alanları doldurur.
+
+DEFAULTS = {
+    'DOCUMENT_EXTRACTION_WORKERS': 2,
+    'DOCUMENT_EXTRACTION_QUEUE_SIZE': 8,   # Çalışanlar dışında sırada bekleyebilecek iş
+    'DOCUMENT_EXTRACTION_NICE': 10,        # Havuz süreçlerinin öncelik düşüşü (0: değişmez)
+    'DOCUMENT_EXTRACTION_TIMEOUT': 120,    # Bu süreden uzun 'pending' kalan analiz yeniden denenir
+    'DOCUMENT_EXTRACTION_WAIT': 5,         # JavaScript'siz formda sonucun beklendiği süre
+}
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+class ExtractionQueueFull(Exception):
+    """Analiz kuyruğu dolu; istek daha sonra tekrarlanmalı."""
+
+
+_pool = None
+_slots = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(reset=False):
+    global _pool, _slots
+    with _pool_lock:
+        if reset and _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+        if _pool is None:
+            workers = _setting('DOCUMENT_EXTRACTION_WORKERS')
+            nice = _setting('DOCUMENT_EXTRACTION_NICE')
+            # 'spawn': çok iş parçacıklı web sürecini fork etmek güvenli değil.
+            # Alt süreç yalnızca utils modülünü yükler (Django kurulmaz); başlatıcı
+            # da bu yüzden bu modülde değil, doğrudan os.nice'tır.
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=os.nice if nice else None,
+                initargs=(nice,) if nice else (),
+            )
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(workers + _setting('DOCUMENT_EXTRACTION_QUEUE_SIZE'))
+        return _pool, _slots
+
+
+def shutdown(wait=True):
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=wait)
+        _pool = None
+        _slots = None
+
+
+def store_document(uploaded_file):
+    """Dosyayı içerik adresli depoya yazar; (dosya yolu, sha256) döndürür."""
+    name = document_storage().save(uploaded_file.name, uploaded_file)
+    sha256 = DocumentBlob.objects.filter(name=name).values_list('sha256', flat=True).get()
+    return name, sha256
+
+
+def request_extraction(uploaded_file):
+    """
+    Döküman için analiz kaydını döndürür. Sonuç önbellekte yoksa (veya önceki
+    deneme başarısız olduysa) analiz havuza gönderilir.
+    """
+    name, sha256 = store_document(uploaded_file)
+    extraction, _ = DocumentExtraction.objects.get_or_create(
+        sha256=sha256, defaults={'document': name, 'original_name': uploaded_file.name[:255]}
+    )
+    if extraction.status == 'done':
+        return extraction
+
+    stale_limit = timezone.now() - timedelta(seconds=_setting('DOCUMENT_EXTRACTION_TIMEOUT'))
+    if extraction.status == 'pending' and extraction.submitted_at and extraction.submitted_at > stale_limit:
+        return extraction  # Başka bir istek analizi zaten başlattı
+
+    _submit(extraction)
+    extraction.refresh_from_db()
+    return extraction
+
+
+def _submit(extraction):
+    pool, slots = _get_pool()
+    if not slots.acquire(blocking=False):
+        raise ExtractionQueueFull("Döküman analiz kuyruğu dolu, lütfen birazdan tekrar deneyin.")
+
+    # Koşullu UPDATE: aynı dosya için iki istek gelirse yalnızca biri havuza gönderir
+    claimed = DocumentExtraction.objects.filter(
+        pk=extraction.pk, status=extraction.status, submitted_at=extraction.submitted_at
+    ).update(status='pending', submitted_at=timezone.now(), error_message=None, finished_at=None)
+    if not claimed:
+        slots.release()
+        return
+
+    path = document_storage().path(extraction.document)
+    started = time.perf_counter()
+    try:
+        try:
+            future = pool.submit(extract_policy_data_from_path, path, extraction.original_name)
+        except BrokenProcessPool:
+            # Bir alt süreç çöktüyse havuz kullanılamaz: yenisi kurulur
+            pool, _ = _get_pool(reset=True)
+            future = pool.submit(extract_policy_data_from_path, path, extraction.original_name)
+    except Exception as e:
+        slots.release()
+        DocumentExtraction.objects.filter(pk=extraction.pk).update(
+            status='failed', error_message=str(e), finished_at=timezone.now()
+        )
+        raise
+    future.add_done_callback(lambda f: _finish(extraction.pk, f, started, slots))
+
+
+def _finish(pk, future, started, slots):
+    # Havuzun yönetim iş parçacığında çalışır (web isteği dışında)
+    slots.release()
+    fields = {'finished_at': timezone.now(), 'duration_ms': round((time.perf_counter() - started) * 1000, 2)}
+    try:
+        fields.update(status='done', data=future.result())
+    except Exception as e:
+        fields.update(status='failed', error_message=str(e) or e.__class__.__name__)
+    try:
+        DocumentExtraction.objects.filter(pk=pk).update(**fields)
+    finally:
+        # Bu iş parçacığının bağlantısını Django kapatmaz; işlem (transaction)
+        # içindeyse çağrı istek iş parçacığındadır, bağlantıya dokunulmaz
+        if not connection.in_atomic_block:
+            connection.close()
+
+
+def wait_for_extraction(extraction, timeout=None, interval=0.1):
+    """Analiz bitene veya süre dolana kadar bekler (JavaScript'siz form için)."""
+    deadline = time.monotonic() + (_setting('DOCUMENT_EXTRACTION_WAIT') if timeout is None else timeout)
+    while extraction.status == 'pending' and time.monotonic() < deadline:
+        time.sleep(interval)
+        extraction.refresh_from_db(fields=['status', 'data', 'error_message', 'finished_at', 'duration_ms'])
+    return extraction
+
+
+def extraction_payload(extraction):
+    return {
+        'sha256': extraction.sha256,
+        'status': extraction.status,
+        'done': extraction.status in ('done', 'failed'),
+        'data': extraction.data if extraction.status == 'done' else {},
+        'error': extraction.error_message,
+    }
@@ -0,0 +1,37 @@
+# policy_management/exports.py
+
+import csv
+
+# -----------------------------------------------------
+# Akışlı (Streaming) CSV Dışa Aktarma
+# -----------------------------------------------------
+# Resource().export() tüm satırları model nesnesi olarak belleğe alıp tek bir
+# metin üretir. Burada sütunlar doğrudan values_list ile parça parça okunur ve
+# CSV satırları oluştukça gönderilir; bellek kullanımı satır sayısından bağımsızdır.
+# Başlıklar ve hücre biçimleri (ör. "1234,50") yine Resource alanlarından gelir.
+
+
+class Echo:
+    """csv.writer için yazılanı geri döndüren sahte dosya."""
+
+    def write(self, value):
+        return value
+
+
+def stream_resource_csv(resource, queryset, chunk_size=2000):
+    fields = resource.get_export_fields()
+    attributes = [field.attribute for field in fields]
+    widgets = [field.widget for field in fields]
+
+    writer = csv.writer(Echo())
+    yield writer.writerow(resource.get_export_headers())
+
+    rows = queryset.order_by('pk').values_list(*attributes).iterator(chunk_size=chunk_size)
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow([widget.render(value) for widget, value in zip(widgets, row)]))
+        if len(buffer) >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
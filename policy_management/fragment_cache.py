@@ -0,0 +1,69 @@
+# policy_management/fragment_cache.py
+
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# -----------------------------------------------------
+# Acente Sayfa Parçası Önbelleği
+# -----------------------------------------------------
+# Dashboard, müşteri ve poliçe listelerinin içerik bölümü ({% agent_fragment %})
+# acente başına işlenmiş HTML olarak saklanır. Önbellekte varsa görünüm bağlamı
+# hiç hazırlanmaz: ne sorgu çalışır ne de o bölüm yeniden işlenir
+# (views.AgentFragmentCacheMixin).
+#
+# Anahtar acentenin sürüm numarasını içerir. Customer/Policy/Quote yazıldığında
+# (signals.py) ve toplu yüklemelerde invalidate() ilgili acentenin sürümünü
+# değiştirir; eski parçalar bir daha okunmaz ve TTL dolunca silinir.
+# Parçadaki CSRF değeri saklanmaz: yer tutucu her istekte güncel değerle değiştirilir.
+#
+# Varsayılan önbellek süreç içidir (locmem). Birden fazla web süreci varsa
+# AGENT_FRAGMENT_CACHE_ALIAS paylaşılan bir önbelleği (Redis/Memcached) göstermeli.
+
+DEFAULTS = {
+    'AGENT_FRAGMENT_CACHE_ENABLED': True,
+    'AGENT_FRAGMENT_CACHE_ALIAS': 'default',
+    'AGENT_FRAGMENT_CACHE_TTL': 300,
+}
+
+CSRF_PLACEHOLDER = '__agent_fragment_csrf_token__'
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+def _cache():
+    return caches[_setting('AGENT_FRAGMENT_CACHE_ALIAS')]
+
+
+def _version_key(agent_id):
+    return f"agent_fragment:version:{agent_id}"
+
+
+def fragment_key(agent_id, name, *vary_on):
+    """Acentenin güncel sürümüne bağlı parça anahtarı. Önbellek kapalıysa None."""
+    if not _setting('AGENT_FRAGMENT_CACHE_ENABLED') or not agent_id:
+        return None
+    version = _cache().get(_version_key(agent_id), 0)
+    digest = hashlib.sha1(repr(vary_on).encode()).hexdigest()
+    return f"agent_fragment:{agent_id}:{version}:{name}:{digest}"
+
+
+def get_fragment(key):
+    return _cache().get(key) if key else None
+
+
+def set_fragment(key, html):
+    if key:
+        _cache().set(key, html, _setting('AGENT_FRAGMENT_CACHE_TTL'))
+
+
+def invalidate(*agent_ids):
+    """Acentelerin önbellekteki sayfa parçalarını geçersiz kılar."""
+    agent_ids = {agent_id for agent_id in agent_ids if agent_id}
+    if agent_ids:
+        version = time.time_ns()
+        _cache().set_many({_version_key(agent_id): version for agent_id in agent_ids}, timeout=None)
@@ -0,0 +1,642 @@
+# policy_management/imports.py
+
+import codecs
+import csv
+import datetime
+import functools
+import re
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from . import analytics
+from . import fragment_cache
+from .customer_search import index_customers
+from .models import Customer, Policy
+from .summaries import rebuild_summaries
+
+# -----------------------------------------------------
+# Toplu İçe Aktarma (CSV / XLSX)
+# -----------------------------------------------------
+# Resource().import_data() her satır için ayrı sorgu (müşteri, benzersizlik)
+# ve ayrı INSERT çalıştırır. Burada dosya parça parça (chunk) okunur:
+# - Müşteri referansları parça başına tek sorguyla çözülür.
+# - Poliçe numarası benzersizliği dosya içi bir küme + parça başına tek sorgu ile denetlenir.
+# - Geçerli satırlar tek bir executemany ile yazılır (insert_rows); hatalı satırlar rapora eklenir.
+# Sütun adları dışa aktarma (PolicyResource) başlıklarıyla aynıdır; dışa aktarılan
+# dosya olduğu gibi geri yüklenebilir.
+
+DEFAULT_CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000  # Rapora yazılan hatalı satır sayısı (sayım tümünü kapsar)
+
+
+class ImportFileError(Exception):
+    """Dosya okunamıyor (biçim, başlık vb.)."""
+
+
+# -----------------------------------------------------
+# Dosya Okuma
+# -----------------------------------------------------
+def _normalize_header(value):
+    return str(value or '').strip().lower().replace(' ', '_')
+
+
+def _detect_encoding(file, block_size=1 << 20):
+    """
+    UTF-8 (BOM'lu/BOM'suz) değilse Türkçe Windows kodlaması (cp1254, Excel'in
+    'CSV' kaydı) varsayılır. Dosya bir kez artımlı çözücüyle taranır: hata
+    içe aktarmanın ortasında değil, yazmaya başlamadan önce anlaşılır.
+    """
+    file.seek(0)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        for block in iter(lambda: file.read(block_size), b''):
+            decoder.decode(block)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return 'cp1254'
+    finally:
+        file.seek(0)
+    return 'utf-8-sig'
+
+
+def _csv_rows(file):
+    encoding = _detect_encoding(file)
+    # Satırlar akış halinde çözülür
+    lines = codecs.iterdecode(file, encoding)
+    first = next(lines, '')
+    dialect = csv.excel
+    try:
+        dialect = csv.Sniffer().sniff(first, delimiters=',;\t')
+    except csv.Error:
+        pass
+    reader = csv.reader(_prepend(first, lines), dialect)
+    yield from reader
+
+
+def _prepend(first, lines):
+    yield first
+    yield from lines
+
+
+def _xlsx_rows(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("XLSX dosyaları için openpyxl paketi gerekli (pip install openpyxl).")
+    file.seek(0)
+    # read_only: satırlar sayfanın tamamı belleğe alınmadan okunur
+    try:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+    except Exception:  # BadZipFile, InvalidFileException, KeyError... (bozuk/yeniden adlandırılmış dosya)
+        raise ImportFileError("XLSX dosyası okunamadı (bozuk veya geçerli bir Excel dosyası değil).")
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def read_rows(file, file_name=''):
+    """
+    (satır numarası, {sütun: değer}) çiftleri üretir. Satır numarası dosyadaki
+    satırdır (başlık 1. satır). Biçim dosya adının uzantısından belirlenir.
+    """
+    if file_name.lower().endswith('.xlsx'):
+        rows = _xlsx_rows(file)
+    elif file_name.lower().endswith(('.csv', '.txt')) or not file_name:
+        rows = _csv_rows(file)
+    else:
+        raise ImportFileError("Desteklenmeyen dosya biçimi (CSV veya XLSX yükleyin).")
+
+    # Çözme ve dosya hataları hangi satırda olursa olsun ImportFileError olur
+    # (içe aktarma işlemi geri alınır, görünüm hatayı mesaj olarak gösterir)
+    try:
+        try:
+            header = [_normalize_header(value) for value in next(rows)]
+        except StopIteration:
+            raise ImportFileError("Dosya boş.")
+
+        for line_number, values in enumerate(rows, start=2):
+            if not any(value not in (None, '') for value in values):
+                continue  # Boş satır
+            yield line_number, dict(zip(header, values))
+    except UnicodeDecodeError:
+        raise ImportFileError("Dosya kodlaması çözülemedi (UTF-8 veya Windows-1254 kaydedin).")
+    except csv.Error as e:
+        raise ImportFileError(f"CSV dosyası okunamadı: {e}")
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# -----------------------------------------------------
+# Değer Dönüştürme
+# -----------------------------------------------------
+DATE_FORMATS = ('%d.%m.%Y', '%d/%m/%Y', '%Y-%m-%d %H:%M:%S')
+
+
+def clean_text(value):
+    return '' if value is None else str(value).strip()
+
+
+def parse_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    text = clean_text(value)
+    try:
+        if len(text) == 10 and text[2] == text[5] == '.':
+            # GG.AA.YYYY (en yaygın biçim): strptime'dan çok daha hızlı
+            return datetime.date(int(text[6:]), int(text[3:5]), int(text[:2]))
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Geçersiz tarih: {text!r}")
+
+
+def parse_decimal(value, max_digits=10, decimal_places=2):
+    """'1234.50', '1234,50' ve '1.234,50' biçimlerini kabul eder."""
+    if isinstance(value, (int, float, Decimal)):
+        text = str(value)
+    else:
+        text = clean_text(value).replace(' ', '')
+        if ',' in text:
+            text = text.replace('.', '').replace(',', '.')
+    try:
+        number = Decimal(text).quantize(Decimal(1).scaleb(-decimal_places))
+    except InvalidOperation:
+        raise ValueError(f"Geçersiz tutar: {clean_text(value)!r}")
+    if not number.is_finite() or abs(number) >= Decimal(10) ** (max_digits - decimal_places):
+        raise ValueError(f"Geçersiz tutar: {clean_text(value)!r}")
+    return number
+
+
+# -----------------------------------------------------
+# Toplu Yazma
+# -----------------------------------------------------
+def insert_rows(model, field_names, rows, ignore_conflicts=False):
+    """
+    Doğrulanmış değer demetlerini tek bir executemany ile ekler. bulk_create her
+    satır için model nesnesi kurar ve SQL'i parça parça derler; on binlerce
+    satırda süre bunun üzerinde geçer. Değerler alan tipine göre veritabanı
+    biçimine çevrilir (tarih, ondalık); sinyal gönderilmez.
+    ignore_conflicts=True ise benzersizlik çakışan satır hata vermeden atlanır
+    (ON CONFLICT DO NOTHING); hangi satırların atlandığını çağıran denetler.
+    """
+    ops = connection.ops
+    fields = [model._meta.get_field(name) for name in field_names]
+    adapters = [_db_adapter(ops, field) for field in fields]
+    columns = ', '.join(ops.quote_name(field.column) for field in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    on_conflict = OnConflict.IGNORE if ignore_conflicts else None
+    # SQLite 'INSERT OR IGNORE' (önek), PostgreSQL 'ON CONFLICT DO NOTHING' (sonek) kullanır
+    sql = (
+        f"{ops.insert_statement(on_conflict=on_conflict)} {ops.quote_name(model._meta.db_table)} "
+        f"({columns}) VALUES ({placeholders}) "
+        f"{ops.on_conflict_suffix_sql(fields, on_conflict, None, None)}"
+    ).rstrip()
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, _adapt_rows(adapters, rows))
+
+
+def update_rows(model, field_names, rows, keep_existing=True):
+    """
+    Satırları birincil anahtara göre tek bir executemany ile günceller. Her demetin
+    son değeri birincil anahtardır. keep_existing=True ise None değerler mevcut
+    değeri değiştirmez (COALESCE).
+    """
+    ops = connection.ops
+    fields = [model._meta.get_field(name) for name in field_names]
+    adapters = [_db_adapter(ops, field) for field in fields] + [None]
+    assignments = ', '.join(
+        f"{ops.quote_name(field.column)} = COALESCE(%s, {ops.quote_name(field.column)})" if keep_existing
+        else f"{ops.quote_name(field.column)} = %s"
+        for field in fields
+    )
+    sql = (
+        f"UPDATE {ops.quote_name(model._meta.db_table)} SET {assignments} "
+        f"WHERE {ops.quote_name(model._meta.pk.column)} = %s"
+    )
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, _adapt_rows(adapters, rows))
+
+
+def _adapt_rows(adapters, rows):
+    return [
+        [adapt(value) if adapt and value is not None else value for adapt, value in zip(adapters, row)]
+        for row in rows
+    ]
+
+
+def _db_adapter(ops, field):
+    internal_type = field.get_internal_type()
+    if internal_type == 'DateField':
+        return ops.adapt_datefield_value
+    if internal_type == 'DateTimeField':
+        # Bir parçadaki zaman damgaları genellikle aynı değerdir
+        return functools.lru_cache(maxsize=16)(ops.adapt_datetimefield_value)
+    if internal_type == 'DecimalField':
+        return lambda value: ops.adapt_decimalfield_value(value, field.max_digits, field.decimal_places)
+    return None
+
+
+# -----------------------------------------------------
+# Rapor
+# -----------------------------------------------------
+def new_report():
+    return {
+        'total': 0, 'imported': 0, 'updated': 0, 'error_count': 0, 'errors': [],
+        'seconds': 0.0, 'rows_per_second': 0,
+    }
+
+
+def add_error(report, line_number, key, messages):
+    report['error_count'] += 1
+    if len(report['errors']) < MAX_REPORTED_ERRORS:
+        report['errors'].append({'row': line_number, 'key': key, 'errors': messages})
+
+
+def write_error_report(report, file):
+    """Hatalı satırları CSV olarak yazar (satır, kayıt, hatalar)."""
+    writer = csv.writer(file)
+    writer.writerow(['row', 'key', 'errors'])
+    for error in report['errors']:
+        writer.writerow([error['row'], error['key'], ' '.join(error['errors'])])
+
+
+def finish_report(report, started):
+    report['seconds'] = round(time.perf_counter() - started, 3)
+    report['rows_per_second'] = round(report['total'] / report['seconds']) if report['seconds'] else 0
+    return report
+
+
+# -----------------------------------------------------
+# Poliçe İçe Aktarma
+# -----------------------------------------------------
+# Müşteri, dışa aktarmadaki gibi 'customer' (müşteri ID) sütunuyla ya da başka
+# bir acenteden gelen dosyalar için 'customer_tckn' (TCKN/VKN) sütunuyla belirtilir.
+# Poliçe her zaman içe aktaran acente adına yazılır (issued_by_agent sütunu yok sayılır).
+POLICY_STATUSES = {key: key for key, _ in Policy.STATUS_CHOICES}
+POLICY_STATUSES.update({label.lower(): key for key, label in Policy.STATUS_CHOICES})
+
+
+def _resolve_customers(agent, rows):
+    """Parçadaki müşteri referanslarını tek sorguyla çözer: {('id'|'tckn', değer): customer_id}."""
+    ids, tax_numbers = set(), set()
+    for _, row in rows:
+        customer_id = clean_text(row.get('customer'))
+        if customer_id.isdigit():
+            ids.add(int(customer_id))
+        tax_number = clean_text(row.get('customer_tckn'))
+        if tax_number:
+            tax_numbers.add(tax_number)
+    if not ids and not tax_numbers:
+        return {}
+
+    found = {}
+    matches = Customer.objects.filter(agent=agent).filter(
+        Q(customer_id__in=ids) | Q(tckn__in=tax_numbers) | Q(tckn_vkn__in=tax_numbers)
+    ).values_list('customer_id', 'tckn', 'tckn_vkn')
+    for customer_id, tckn, tckn_vkn in matches:
+        found[('id', customer_id)] = customer_id
+        for tax_number in (tckn, tckn_vkn):
+            if tax_number:
+                found.setdefault(('tckn', tax_number), customer_id)
+    return found
+
+
+POLICY_IMPORT_FIELDS = (
+    'policy_number', 'policy_type', 'customer', 'issued_by_agent',
+    'start_date', 'end_date', 'premium_amount', 'status',
+)
+
+
+def _build_policy(agent, row, customers):
+    """Satırı POLICY_IMPORT_FIELDS sırasındaki değerlere çevirir; (değerler, hatalar) döndürür."""
+    errors = []
+
+    policy_number = clean_text(row.get('policy_number'))
+    if not policy_number:
+        errors.append("Poliçe numarası boş.")
+    elif len(policy_number) > 50:
+        errors.append("Poliçe numarası en fazla 50 karakter olabilir.")
+
+    policy_type = clean_text(row.get('policy_type'))
+    if not policy_type:
+        errors.append("Sigorta tipi boş.")
+    elif len(policy_type) > 50:
+        errors.append("Sigorta tipi en fazla 50 karakter olabilir.")
+
+    customer_id = None
+    tax_number = clean_text(row.get('customer_tckn'))
+    raw_id = clean_text(row.get('customer'))
+    if tax_number:
+        customer_id = customers.get(('tckn', tax_number))
+    elif raw_id.isdigit():
+        customer_id = customers.get(('id', int(raw_id)))
+    if customer_id is None:
+        errors.append(f"Müşteri bulunamadı: {tax_number or raw_id or '(boş)'}")
+
+    dates = {}
+    for field in ('start_date', 'end_date'):
+        try:
+            dates[field] = parse_date(row.get(field))
+        except ValueError as e:
+            errors.append(str(e))
+    if len(dates) == 2 and dates['end_date'] < dates['start_date']:
+        errors.append("Bitiş tarihi başlangıç tarihinden önce olamaz.")
+
+    premium_amount = None
+    try:
+        premium_amount = parse_decimal(row.get('premium_amount'))
+    except ValueError as e:
+        errors.append(str(e))
+
+    status = POLICY_STATUSES.get(clean_text(row.get('status')).lower() or 'active')
+    if status is None:
+        errors.append(f"Geçersiz durum: {clean_text(row.get('status'))!r}")
+
+    if errors:
+        return None, errors
+    return (
+        policy_number, policy_type, customer_id, agent.pk,
+        dates['start_date'], dates['end_date'], premium_amount, status,
+    ), []
+
+
+def import_policies(file, agent, file_name='', chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Poliçeleri toplu içe aktarır ve satır bazında hata raporu döndürür.
+    Hatalı satırlar atlanır, geçerli satırlar yazılır. Tüm yazma işlemi tek bir
+    veritabanı işlemidir (transaction). dry_run=True ise yalnızca doğrulama yapılır.
+    """
+    started = time.perf_counter()
+    report = new_report()
+    seen_numbers = set()
+
+    with transaction.atomic():
+        for chunk in chunked(read_rows(file, file_name), chunk_size):
+            report['total'] += len(chunk)
+            customers = _resolve_customers(agent, chunk)
+
+            numbers = {clean_text(row.get('policy_number')) for _, row in chunk}
+            existing = set(
+                Policy.objects.filter(policy_number__in=numbers - seen_numbers)
+                .values_list('policy_number', flat=True)
+            ) if numbers - seen_numbers else set()
+
+            batch = []
+            for line_number, row in chunk:
+                values, errors = _build_policy(agent, row, customers)
+                if values is not None:
+                    if values[0] in seen_numbers:
+                        errors = ["Poliçe numarası dosyada birden fazla kez geçiyor."]
+                    elif values[0] in existing:
+                        errors = ["Bu poliçe numarası zaten kayıtlı."]
+                if errors:
+                    add_error(report, line_number, clean_text(row.get('policy_number')), errors)
+                    continue
+                seen_numbers.add(values[0])
+                batch.append(values)
+
+            if batch and not dry_run:
+                insert_rows(Policy, POLICY_IMPORT_FIELDS, batch)
+            report['imported'] += len(batch)
+
+        # Toplu INSERT sinyal göndermez: acente özet sayaçları yeniden hesaplanır.
+        # İçe aktarılan poliçelerin dökümanı olmadığından döküman sayaçları değişmez.
+        if report['imported'] and not dry_run:
+            rebuild_summaries([agent.pk])
+            analytics.invalidate(agent.pk)
+            fragment_cache.invalidate(agent.pk)
+
+    return finish_report(report, started)
+
+
+# -----------------------------------------------------
+# Müşteri İçe Aktarma
+# -----------------------------------------------------
+# Kimlik numarası zorunludur: 11 hane TCKN (bireysel) veya 10 hane VKN (kurumsal),
+# 'tckn' ya da dışa aktarmadaki 'tckn_vkn' sütununda. TCKN 'tckn' alanına (benzersiz),
+# VKN eski 'tckn_vkn' alanına yazılır.
+# - Kimlik numarası veritabanında varsa ve müşteri içe aktaran acenteye aitse
+#   (veya acentesi yoksa) dosyadaki dolu alanlarla güncellenir; başka acentenin
+#   müşterisine dokunulmaz.
+# - Aynı numara dosyada tekrar ederse ilk satır kullanılır, sonrakiler rapora yazılır.
+# - Yeni müşteri satırında ad zorunludur (mevcut müşteri güncellenirken boş bırakılabilir).
+# - Yeni TCKN'ler ON CONFLICT DO NOTHING ile eklenir: aynı anda başka bir işlem aynı
+#   numarayı eklerse içe aktarma yarıda kalmaz, o kayıt değiştirilmez ve satır rapora yazılır.
+CUSTOMER_IMPORT_FIELDS = (
+    'name', 'customer_type', 'phone', 'email', 'address_street', 'address_city',
+    'address_state', 'address_zipcode', 'date_of_birth',
+)
+CUSTOMER_TYPES = {key: key for key, _ in Customer.CUSTOMER_TYPE_CHOICES}
+CUSTOMER_TYPES.update({label.lower(): key for key, label in Customer.CUSTOMER_TYPE_CHOICES})
+CUSTOMER_TEXT_LIMITS = {
+    field.name: field.max_length for field in Customer._meta.fields
+    if field.name in CUSTOMER_IMPORT_FIELDS and field.max_length
+}
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+
+def is_valid_tckn(number):
+    """T.C. Kimlik No: 11 hane, ilk hane 0 değil, son iki hane kontrol hanesi."""
+    if len(number) != 11 or not number.isdigit() or number[0] == '0':
+        return False
+    d = [int(c) for c in number]
+    odd, even = d[0] + d[2] + d[4] + d[6] + d[8], d[1] + d[3] + d[5] + d[7]
+    return (odd * 7 - even) % 10 == d[9] and sum(d[:10]) % 10 == d[10]
+
+
+def is_valid_vkn(number):
+    """Vergi Kimlik No: 10 hane, son hane kontrol hanesi."""
+    if len(number) != 10 or not number.isdigit():
+        return False
+    total = 0
+    for i in range(9):
+        tmp = (int(number[i]) + 9 - i) % 10
+        value = (tmp * 2 ** (9 - i)) % 9
+        if tmp and not value:
+            value = 9
+        total += value
+    return (10 - total % 10) % 10 == int(number[9])
+
+
+def _identity_number(row):
+    for column in ('tckn', 'tckn_vkn', 'vkn'):
+        number = clean_text(row.get(column)).replace(' ', '')
+        if number:
+            return number
+    return ''
+
+
+def _build_customer(row, number):
+    """Satırı CUSTOMER_IMPORT_FIELDS sırasındaki değerlere çevirir; boş hücreler None olur."""
+    errors = []
+    values = {name: clean_text(row.get(name)) or None for name in CUSTOMER_IMPORT_FIELDS}
+
+    if number is None:
+        errors.append("Geçersiz TCKN/VKN (kontrol hanesi tutmuyor).")
+
+    for name, limit in CUSTOMER_TEXT_LIMITS.items():
+        if values[name] and len(values[name]) > limit:
+            errors.append(f"{name} en fazla {limit} karakter olabilir.")
+
+    if values['customer_type']:
+        values['customer_type'] = CUSTOMER_TYPES.get(values['customer_type'].lower())
+        if values['customer_type'] is None:
+            errors.append(f"Geçersiz müşteri tipi: {clean_text(row.get('customer_type'))!r}")
+
+    if values['email'] and not _EMAIL_RE.match(values['email']):
+        errors.append(f"Geçersiz e-posta: {values['email']!r}")
+
+    if values['date_of_birth']:
+        try:
+            values['date_of_birth'] = parse_date(row.get('date_of_birth'))
+        except ValueError as e:
+            errors.append(str(e))
+
+    if errors:
+        return None, errors
+    return [values[name] for name in CUSTOMER_IMPORT_FIELDS], []
+
+
+def _find_existing_customers(tckns, vkns):
+    """Parçadaki kimlik numaralarını tek sorguyla arar: {numara: (customer_id, agent_id)}."""
+    if not tckns and not vkns:
+        return {}
+    found = {}
+    matches = Customer.objects.filter(
+        Q(tckn__in=tckns) | Q(tckn_vkn__in=tckns | vkns)
+    ).values_list('customer_id', 'tckn', 'tckn_vkn', 'agent_id')
+    for customer_id, tckn, tckn_vkn, agent_id in matches:
+        if tckn in tckns:
+            found[tckn] = (customer_id, agent_id)  # 'tckn' eşleşmesi önceliklidir
+        if tckn_vkn in tckns or tckn_vkn in vkns:
+            found.setdefault(tckn_vkn, (customer_id, agent_id))
+    return found
+
+
+def import_customers(file, agent, file_name='', chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+    """
+    Müşterileri toplu içe aktarır (yeni kayıt veya güncelleme) ve satır bazında
+    hata raporu döndürür. Yazma tek bir veritabanı işlemidir; dry_run=True ise
+    yalnızca doğrulama yapılır.
+    """
+    started = time.perf_counter()
+    report = new_report()
+    seen = {}  # kimlik numarası -> ilk geçtiği satır
+
+    with transaction.atomic():
+        for chunk in chunked(read_rows(file, file_name), chunk_size):
+            report['total'] += len(chunk)
+            now = timezone.now()
+
+            # 1) Kimlik numaraları: kontrol hanesi ve dosya içi tekrar
+            numbers = []
+            for _, row in chunk:
+                number = _identity_number(row)
+                if not (is_valid_tckn(number) or is_valid_vkn(number)):
+                    number = None
+                numbers.append(number)
+            tckns = {n for n in numbers if n and len(n) == 11}
+            vkns = {n for n in numbers if n and len(n) == 10}
+
+            # 2) Veritabanında olanlar: tek IN sorgusu
+            existing = _find_existing_customers(tckns - seen.keys(), vkns - seen.keys())
+
+            inserts_tckn, inserts_vkn, updates, touched = [], [], [], []
+            for (line_number, row), number in zip(chunk, numbers):
+                key = number or _identity_number(row)
+                if not key:
+                    add_error(report, line_number, '', ["TCKN/VKN boş."])
+                    continue
+                values, errors = _build_customer(row, number)
+                if values is not None:
+                    if number in seen:
+                        errors = [f"Bu kimlik numarası dosyada {seen[number]}. satırda zaten var."]
+                    elif number in existing and existing[number][1] not in (None, agent.pk):
+                        errors = ["Bu kimlik numarası başka bir acenteye kayıtlı."]
+                if errors:
+                    add_error(report, line_number, key, errors)
+                    continue
+
+                is_tckn = len(number) == 11
+                if number not in existing and not values[0]:  # name
+                    add_error(report, line_number, key, ["Ad boş (yeni müşteri için zorunlu)."])
+                    continue
+
+                seen[number] = line_number
+                touched.append(number)
+                if number in existing:
+                    tckn = number if is_tckn else None
+                    updates.append((*values, tckn, agent.pk, now, existing[number][0]))
+                else:
+                    if not values[1]:  # customer_type
+                        values[1] = 'individual' if is_tckn else 'corporate'
+                    target = inserts_tckn if is_tckn else inserts_vkn
+                    target.append((*values, number if is_tckn else None, None if is_tckn else number,
+                                   agent.pk, now, now))
+
+            if not dry_run:
+                insert_fields = CUSTOMER_IMPORT_FIELDS + ('tckn', 'tckn_vkn', 'agent', 'created_at', 'updated_at')
+                if inserts_tckn:
+                    insert_rows(Customer, insert_fields, inserts_tckn, ignore_conflicts=True)
+                    skipped = _skipped_inserts([row[len(CUSTOMER_IMPORT_FIELDS)] for row in inserts_tckn], agent, now)
+                    for number in skipped:
+                        add_error(report, seen[number], number,
+                                  ["Bu kimlik numarası içe aktarma sırasında başka bir işlemle kaydedildi; satır atlandı."])
+                        touched.remove(number)
+                    inserts_tckn = [row for row in inserts_tckn if row[len(CUSTOMER_IMPORT_FIELDS)] not in skipped]
+                if inserts_vkn:
+                    insert_rows(Customer, insert_fields, inserts_vkn)
+                if updates:
+                    update_rows(Customer, CUSTOMER_IMPORT_FIELDS + ('tckn', 'agent', 'updated_at'), updates)
+                _reindex(touched)
+            report['imported'] += len(inserts_tckn) + len(inserts_vkn)
+            report['updated'] += len(updates)
+
+        # Toplu yazma sinyal göndermez: özet sayaçları (arama indeksi parça başına) güncellenir
+        if (report['imported'] or report['updated']) and not dry_run:
+            rebuild_summaries([agent.pk])
+            analytics.invalidate(agent.pk)
+            fragment_cache.invalidate(agent.pk)
+
+    return finish_report(report, started)
+
+
+def _skipped_inserts(tckns, agent, created_at):
+    """ON CONFLICT DO NOTHING ile atlanan TCKN'ler: bu parçanın yazdığı satır olmayanlar."""
+    inserted = set(
+        Customer.objects.filter(tckn__in=tckns, agent=agent, created_at=created_at)
+        .values_list('tckn', flat=True)
+    )
+    return set(tckns) - inserted
+
+
+def _reindex(numbers):
+    """Parçada eklenen/güncellenen müşterileri arama indeksine yazar."""
+    if not numbers:
+        return
+    fields = ('customer_id', 'name', 'tckn', 'tckn_vkn', 'phone', 'email', 'agent_id')
+    numbers = set(numbers)
+    index_customers(list(
+        Customer.objects.filter(Q(tckn__in=numbers) | Q(tckn_vkn__in=numbers)).only(*fields)
+    ))
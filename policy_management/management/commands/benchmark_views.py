@@ -0,0 +1,123 @@
+# policy_management/management/commands/benchmark_views.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from policy_management import benchmarks
+from policy_management.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = (
+        'Ayrı bir veritabanına toplu veri üretir ve acente ekranlarını (dashboard, listeler, '
+        'dışa aktarma, teklif) test istemcisiyle ölçer. Süre yüzdelikleri, sorgu sayıları ve '
+        'tepe bellek JSON rapor olarak kaydedilir. Gerçek veritabanına dokunmaz.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=sorted(benchmarks.PRESETS), default='small',
+                            help='Hazır veri hacmi (small: 10k, medium: 100k, large: 1M poliçe/teklif).')
+        parser.add_argument('--agents', type=int, help='Acente sayısı (ön ayarı ezer).')
+        parser.add_argument('--customers', type=int, help='Müşteri sayısı (ön ayarı ezer).')
+        parser.add_argument('--policies', type=int, help='Poliçe sayısı (ön ayarı ezer).')
+        parser.add_argument('--quotes', type=int, help='Teklif sayısı (ön ayarı ezer).')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Toplu INSERT parti boyutu.')
+        parser.add_argument('--iterations', type=int, default=20, help='Görünüm başına ölçüm sayısı.')
+        parser.add_argument('--quote-iterations', type=int, default=3,
+                            help='Teklif isteği (şirket çağrıları) için ölçüm sayısı.')
+        parser.add_argument('--view', action='append', help='Sadece bu senaryo(lar)ı çalıştır.')
+        parser.add_argument('--db-path', help='Ölçüm veritabanı dosyası. Verilirse saklanır ve sonraki '
+                                              'çalıştırmalarda aynı veri tekrar üretilmez.')
+        parser.add_argument('--output', default='benchmark.json', help='Rapor dosyası (JSON).')
+        parser.add_argument('--compare', help='Karşılaştırılacak önceki rapor (JSON).')
+        parser.add_argument('--threshold', type=float, default=10.0,
+                            help='Bu yüzdeden fazla artış gerileme sayılır (varsayılan: 10).')
+        parser.add_argument('--fail-on-regression', action='store_true',
+                            help='Gerileme varsa hata koduyla çık (CI için).')
+
+    def handle(self, *args, **options):
+        agents, customers, policies, quotes = benchmarks.PRESETS[options['preset']]
+        volumes = {
+            'agents': options['agents'] or agents,
+            'customers': options['customers'] if options['customers'] is not None else customers,
+            'policies': options['policies'] if options['policies'] is not None else policies,
+            'quotes': options['quotes'] if options['quotes'] is not None else quotes,
+        }
+
+        keepdb = bool(options['db_path'])
+        if keepdb:
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = options['db_path']
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=keepdb)
+        try:
+            report = self.run(volumes, options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+            teardown_test_environment()
+
+        with open(options['output'], 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Rapor kaydedildi: {options['output']}"))
+
+        if options['compare']:
+            self.compare(report, options)
+
+    def run(self, volumes, options):
+        counts = benchmarks.dataset_counts()
+        if counts == volumes:
+            self.stdout.write("Mevcut ölçüm verisi kullanılıyor.")
+        else:
+            if any(counts.values()):
+                raise CommandError(
+                    f"{options['db_path']} farklı hacimde veri içeriyor; dosyayı silin veya başka bir yol verin."
+                )
+            self.stdout.write(
+                f"Veri üretiliyor: {volumes['agents']} acente, {volumes['customers']} müşteri, "
+                f"{volumes['policies']} poliçe, {volumes['quotes']} teklif..."
+            )
+            benchmarks.seed_dataset(batch_size=options['batch_size'], **volumes)
+
+        agent = CustomUser.objects.filter(
+            username__startswith=benchmarks.BENCHMARK_USERNAME_PREFIX
+        ).order_by('id').first()
+
+        self.stdout.write("Soğuk: her istekten önce önbellekler temizlenir. Sıcak: önbellek dolu.")
+        self.stdout.write(f"{'Görünüm':<22} {'Durum':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+                          f"{'Sorgu':>6} {'Bellek KB':>10} {'Sıcak p50':>10} {'Sıcak sorgu':>12}")
+
+        def on_result(name, result):
+            latency = result['latency_ms']
+            warm = result.get('warm')
+            self.stdout.write(
+                f"{name:<22} {result['status']:>5} {latency['p50']:>9} {latency['p95']:>9} "
+                f"{latency['p99']:>9} {result['queries']:>6} {result['peak_memory_kb']:>10} "
+                f"{warm['latency_ms']['p50'] if warm else '-':>10} {warm['queries'] if warm else '-':>12}"
+            )
+
+        views = benchmarks.run_scenarios(
+            agent, options['iterations'], options['quote_iterations'], only=options['view'], on_result=on_result
+        )
+        return benchmarks.build_report(volumes, views)
+
+    def compare(self, report, options):
+        try:
+            with open(options['compare'], encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Karşılaştırma raporu okunamadı: {e}")
+
+        rows = benchmarks.compare_reports(baseline, report, options['threshold'])
+        self.stdout.write(f"\nKarşılaştırma: {baseline['meta'].get('git_revision')} -> "
+                          f"{report['meta'].get('git_revision')}")
+        for row in rows:
+            line = (f"{row['view']:<22} {row['metric']:<15} {row['baseline']:>10} -> "
+                    f"{row['current']:>10} ({row['change_pct']:+.1f}%)")
+            self.stdout.write(self.style.ERROR(line) if row['regression'] else line)
+
+        regressions = [row for row in rows if row['regression']]
+        if regressions and options['fail_on_regression']:
+            raise CommandError(f"{len(regressions)} ölçümde gerileme var (eşik: %{options['threshold']}).")
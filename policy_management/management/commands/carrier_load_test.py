@@ -0,0 +1,97 @@
+# policy_management/management/commands/carrier_load_test.py
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from policy_management.api_connectors.base import close_clients
+from policy_management.api_connectors.stub_server import start_stub_server
+from policy_management.carrier_health import carrier_health, percentile
+from policy_management.management.commands.carrier_stub_server import add_profile_arguments, load_profiles
+from policy_management.quote_engine import fetch_real_quotes
+
+LOAD_TEST_CUSTOMER = {
+    'customer_id': 0, 'name': 'Yük Testi', 'tckn': '10000000146',
+    'customer_type': 'individual', 'date_of_birth': '1990-01-01', 'address_city': 'İstanbul',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Yerel şirket simülatörünü başlatır ve gerçek bağlayıcı yolunu (bağlantı havuzu, süre sınırları, '
+        'devre kesici) eş zamanlı teklif istekleriyle yük altında dener.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Toplam teklif isteği (varsayılan: 50).')
+        parser.add_argument('--concurrency', type=int, default=10, help='Aynı anda çalışan istek sayısı.')
+        parser.add_argument('--policy-type', default='Kasko')
+        add_profile_arguments(parser)
+
+    def handle(self, *args, **options):
+        server = start_stub_server(profiles=load_profiles(options), seed=options['seed'])
+        # Önbellek kapalı: her istek simülatöre gider. Havuzlar yeni adresle baştan kurulur.
+        overrides = override_settings(
+            QUOTE_USE_REAL_APIS=True,
+            QUOTE_CACHE_ENABLED=False,
+            CARRIER_HTTP_OPTIONS=server.http_options(),
+        )
+        overrides.enable()
+        close_clients()
+        carrier_health.reset()
+
+        def one_request(_):
+            started = time.monotonic()
+            offers = fetch_real_quotes(dict(LOAD_TEST_CUSTOMER), options['policy_type'])
+            return time.monotonic() - started, offers
+
+        try:
+            started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                results = list(pool.map(one_request, range(options['requests'])))
+            wall = time.monotonic() - started
+        finally:
+            close_clients()
+            overrides.disable()
+            stats = server.stats()
+            server.shutdown()
+            server.server_close()
+
+        self.report(results, wall, stats)
+
+    def report(self, results, wall, stats):
+        request_latencies = [latency for latency, _ in results]
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(results)} istek {wall:.2f} sn'de tamamlandı ({len(results) / wall:.1f} istek/sn). "
+            f"İstek süresi p50/p95/p99: "
+            + '/'.join(f"{percentile(request_latencies, p) * 1000:.0f}" for p in (50, 95, 99)) + " ms"
+        ))
+
+        per_carrier = {}
+        for _, offers in results:
+            for offer in offers:
+                entry = per_carrier.setdefault(offer['carrier'], {'outcomes': {}, 'latencies': []})
+                entry['outcomes'][offer['status']] = entry['outcomes'].get(offer['status'], 0) + 1
+                if offer.get('elapsed') is not None:
+                    entry['latencies'].append(offer['elapsed'])
+
+        for code, entry in sorted(per_carrier.items()):
+            latencies = entry['latencies']
+            self.stdout.write(
+                f"  {code:<8} sonuçlar={json.dumps(entry['outcomes'], ensure_ascii=False)} "
+                f"p50/p95/p99=" + '/'.join(
+                    f"{(percentile(latencies, p) or 0) * 1000:.0f}" for p in (50, 95, 99)
+                ) + " ms"
+            )
+
+        self.stdout.write(
+            f"Simülatör: {stats['connections_opened']} bağlantı, {stats['requests_served']} işlenen istek"
+        )
+        for code, endpoint in stats['endpoints'].items():
+            self.stdout.write(
+                f"  {code:<8} istek={endpoint['requests']} durum={endpoint['statuses']} "
+                f"yavaş={endpoint['slow_loris']} bozuk={endpoint['malformed']}"
+            )
@@ -0,0 +1,55 @@
+# policy_management/management/commands/carrier_metrics.py
+
+import json
+
+from django.core.management.base import BaseCommand
+from policy_management import carrier_metrics
+
+
+def _ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:.0f}"
+
+
+class Command(BaseCommand):
+    help = (
+        'Şirket bağlayıcı çağrılarının özetini yazdırır: çağrı/hata/zaman aşımı sayıları, '
+        'p50/p95/p99 süreleri (ms) ve ortalama veri boyutları (şirket + sigorta tipi bazında).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--carrier', help='Sadece bu şirket (ör. allianz).')
+        parser.add_argument('--policy-type', help='Sadece bu sigorta tipi (ör. Kasko).')
+        parser.add_argument('--json', action='store_true', help='Tablo yerine JSON yazdırır (histogram dahil).')
+        parser.add_argument('--reset', action='store_true', help='Tüm sayaçları sıfırlar.')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            carrier_metrics.reset()
+            self.stdout.write(self.style.SUCCESS('Şirket metrikleri sıfırlandı.'))
+            return
+
+        carrier_metrics.flush(force=True)
+        summaries = carrier_metrics.collect(options['carrier'], options['policy_type'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(summaries, ensure_ascii=False, indent=2))
+            return
+
+        if not summaries:
+            self.stdout.write(self.style.WARNING('Henüz kaydedilmiş şirket çağrısı yok.'))
+            return
+
+        header = (
+            f"{'Şirket':<10} {'Tip':<12} {'Çağrı':>7} {'Başarılı':>8} {'Hata':>6} {'Z.Aşımı':>7} "
+            f"{'Devre':>6} {'Hata%':>6} {'Ort ms':>7} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7} {'Gön. B':>7} {'Alın. B':>7}"
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for s in summaries:
+            outcomes = s['outcomes']
+            self.stdout.write(
+                f"{s['carrier']:<10} {s['policy_type']:<12} {s['calls']:>7} {outcomes['success']:>8} "
+                f"{outcomes['error']:>6} {outcomes['timeout']:>7} {outcomes['circuit_open']:>6} "
+                f"{s['error_rate'] * 100:>5.1f}% {_ms(s['latency']['mean']):>7} {_ms(s['latency']['p50']):>7} {_ms(s['latency']['p95']):>7} "
+                f"{_ms(s['latency']['p99']):>7} {s['request_bytes']['mean']:>7} {s['response_bytes']['mean']:>7}"
+            )
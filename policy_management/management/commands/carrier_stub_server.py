@@ -0,0 +1,63 @@
+# policy_management/management/commands/carrier_stub_server.py
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from policy_management.api_connectors.stub_server import StubCarrierServer, build_profiles
+
+
+def load_profiles(options):
+    """--config (JSON dosyası) ve --set ayarlarından şirket profillerini oluşturur."""
+    config = None
+    if options.get('config'):
+        try:
+            with open(options['config'], encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Profil dosyası okunamadı: {e}")
+    try:
+        return build_profiles(config, options.get('set') or ())
+    except (ValueError, KeyError) as e:
+        raise CommandError(str(e))
+
+
+def add_profile_arguments(parser):
+    parser.add_argument('--config', help='Şirket profilleri (JSON): {"doga": {"error_rate": 0.1, ...}}')
+    parser.add_argument('--set', action='append', metavar='SIRKET.ALAN=DEGER',
+                        help='Tek ayar, ör. allianz.error_rate=0.2, doga.latency.median=0.05, '
+                             'turkiye.max_rps=5 (tekrarlanabilir).')
+    parser.add_argument('--seed', type=int, help='Rastgelelik tohumu (tekrarlanabilir senaryolar için).')
+
+
+class Command(BaseCommand):
+    help = (
+        'Sigorta şirketi API\'lerini taklit eden yerel simülatörü başlatır (offline test için). '
+        'Yanıt süresi dağılımı, hata oranı, yavaş yanıt (slow-loris) ve istek sınırı şirket bazında ayarlanabilir.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        add_profile_arguments(parser)
+
+    def handle(self, *args, **options):
+        profiles = load_profiles(options)
+        server = StubCarrierServer((options['host'], options['port']), profiles=profiles, seed=options['seed'])
+
+        self.stdout.write(self.style.SUCCESS(f"Şirket simülatörü çalışıyor: {server.base_url}"))
+        for code, profile in profiles.items():
+            self.stdout.write(f"  {code}: {json.dumps(profile, ensure_ascii=False)}")
+        self.stdout.write(f"İstatistikler: {server.base_url}/_stats")
+        self.stdout.write("settings.py içine ekleyin:")
+        self.stdout.write("QUOTE_USE_REAL_APIS = True")
+        self.stdout.write(f"CARRIER_HTTP_OPTIONS = {server.http_options()!r}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(
+                f"Kapatıldı. Bağlantı: {server.connections_opened}, İstek: {server.requests_served}"
+            )
@@ -2,54 +2,90 @@
 
 import datetime
 from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
-from policy_management.models import Policy
+from policy_management.models import Policy, ExpiryNotification
 # (Gerçek projede: E-posta gönderme fonksiyonunu buraya dahil edecektik)
 
+
 class Command(BaseCommand):
-    help = 'Poliçe bitiş tarihine 7 gün kalanları kontrol eder ve bildirim gönderir.'
+    help = (
+        'Bitiş tarihi önümüzdeki N gün içinde olan ve henüz uyarılmamış aktif poliçeler için bildirim gönderir. '
+        'Gönderilen bildirimler kaydedilir; komut tekrar çalıştırılırsa aynı uyarı ikinci kez gönderilmez.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=7, help='Kaç gün sonrasına kadar bakılacağı (varsayılan: 7).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Her partide işlenecek poliçe sayısı.')
+        parser.add_argument('--dry-run', action='store_true', help='Bildirim göndermeden ve kaydetmeden listeler.')
 
     def handle(self, *args, **options):
-        # Bugünün tarihini ve 7 gün sonrası tarihi hesaplayalım
         today = timezone.localdate()
-        seven_days_later = today + datetime.timedelta(days=7)
+        horizon_end = today + datetime.timedelta(days=options['horizon'])
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
 
-        self.stdout.write(f"Bugün: {today}. 7 gün sonrası: {seven_days_later}")
+        self.stdout.write(f"Bugün: {today}. Kontrol aralığı: {today} - {horizon_end}")
 
-        # Veritabanını sorgulama: Bitiş tarihi tam 7 gün sonrası olan aktif poliçeleri bul.
-        # Neden sadece 7 gün sonrası? Çünkü daha önce uyarmışsak tekrar uyarmayalım.
-        # Bu komut her gün çalıştığı için, sadece o gün 7 güne girenleri kontrol eder.
-        expiring_policies = Policy.objects.filter(
-            end_date=seven_days_later,
-            status='active'
+        # Tek gün yerine tüm aralık taranır: cron bir gün çalışmasa bile poliçe kaçmaz.
+        # Bu bitiş tarihi için daha önce uyarılmış poliçeler (kayıt defteri) hariç tutulur.
+        already_notified = ExpiryNotification.objects.filter(
+            policy=OuterRef('pk'),
+            end_date=OuterRef('end_date'),
+        )
+        expiring_policies = (
+            Policy.objects.filter(status='active', end_date__gte=today, end_date__lte=horizon_end)
+            .exclude(Exists(already_notified))
+            .select_related('customer', 'issued_by_agent')
+            .only(
+                'policy_id', 'policy_number', 'end_date',
+                'customer__name', 'customer__email', 'issued_by_agent__email',
+            )
+            .order_by('policy_id')
         )
-        
-        count = expiring_policies.count()
-        self.stdout.write(self.style.WARNING(f"Toplam {count} adet poliçe 7 gün içinde bitiyor."))
 
-        if count == 0:
+        # Sabit boyutlu partiler (policy_id üzerinden imleçle): bellek ve işlem süresi doğrusal kalır
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(expiring_policies.filter(policy_id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].policy_id
+
+            for policy in batch:
+                self.notify(policy)
+
+            if not dry_run:
+                ExpiryNotification.objects.bulk_create(
+                    [ExpiryNotification(policy_id=p.policy_id, end_date=p.end_date) for p in batch],
+                    ignore_conflicts=True,  # Eş zamanlı iki çalıştırmada çift kayıt olmasın
+                )
+            total += len(batch)
+
+        if total == 0:
             self.stdout.write(self.style.SUCCESS('Uyarı gerektiren poliçe bulunamadı.'))
             return
 
-        for policy in expiring_policies:
-            
-            # --- Gerçek Bildirim İşlemi ---
-            # Burada E-posta/SMS gönderme veya site içi bildirim kaydetme fonksiyonları çağrılmalı.
-            
-            customer_email = policy.customer.email
-            agent_email = policy.issued_by_agent.email if policy.issued_by_agent else "Acente Yok"
-            
-            log_message = (
-                f"Uyarılıyor: Poliçe No: {policy.policy_number}, "
-                f"Müşteri: {policy.customer.name}, Bitiş: {policy.end_date}, "
-                f"Müşteri E-posta: {customer_email}, Acente E-posta: {agent_email}"
-            )
-            self.stdout.write(log_message)
-            
-            # Örnek: E-posta Gönderme Fonksiyonu (Simülasyon)
-            # send_notification_email(policy, customer_email, 'customer')
-            # send_notification_email(policy, agent_email, 'agent')
-            
-            # Poliçenin durumu değiştirilmez, sadece uyarı gönderilir.
-            
-        self.stdout.write(self.style.SUCCESS('Poliçe bitiş kontrolü tamamlandı.'))
\ No newline at end of file
+        self.stdout.write(self.style.WARNING(f"Toplam {total} adet poliçe için uyarı gönderildi."))
+        self.stdout.write(self.style.SUCCESS('Poliçe bitiş kontrolü tamamlandı.'))
+
+    def notify(self, policy):
+        # --- Gerçek Bildirim İşlemi ---
+        # Burada E-posta/SMS gönderme veya site içi bildirim kaydetme fonksiyonları çağrılmalı.
+
+        customer_email = policy.customer.email
+        agent_email = policy.issued_by_agent.email if policy.issued_by_agent else "Acente Yok"
+
+        log_message = (
+            f"Uyarılıyor: Poliçe No: {policy.policy_number}, "
+            f"Müşteri: {policy.customer.name}, Bitiş: {policy.end_date}, "
+            f"Müşteri E-posta: {customer_email}, Acente E-posta: {agent_email}"
+        )
+        self.stdout.write(log_message)
+
+        # Örnek: E-posta Gönderme Fonksiyonu (Simülasyon)
+        # send_notification_email(policy, customer_email, 'customer')
+        # send_notification_email(policy, agent_email, 'agent')
+
+        # Poliçenin durumu değiştirilmez, sadece uyarı gönderilir.
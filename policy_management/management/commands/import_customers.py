@@ -0,0 +1,12 @@
+# policy_management/management/commands/import_customers.py
+
+from policy_management.imports import import_customers
+from policy_management.management.commands.import_policies import Command as ImportCommand
+
+
+class Command(ImportCommand):
+    help = (
+        'CSV/XLSX dosyasındaki müşterileri acente adına toplu olarak içe aktarır '
+        '(TCKN/VKN doğrulama, tekrar ayıklama, mevcut müşterileri güncelleme).'
+    )
+    importer = staticmethod(import_customers)
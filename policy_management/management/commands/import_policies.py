@@ -0,0 +1,46 @@
+# policy_management/management/commands/import_policies.py
+
+from django.core.management.base import BaseCommand, CommandError
+
+from policy_management.imports import DEFAULT_CHUNK_SIZE, ImportFileError, import_policies, write_error_report
+from policy_management.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = 'CSV/XLSX dosyasındaki poliçeleri acente adına toplu olarak içe aktarır.'
+    importer = staticmethod(import_policies)
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV veya XLSX dosyası')
+        parser.add_argument('--agent', required=True, help='Kayıtların yazılacağı acentenin kullanıcı adı')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='Sadece doğrula, kaydetme')
+        parser.add_argument('--errors-csv', help='Hatalı satırların yazılacağı CSV dosyası')
+
+    def handle(self, *args, **options):
+        agent = CustomUser.objects.filter(username=options['agent']).first()
+        if agent is None:
+            raise CommandError(f"Acente bulunamadı: {options['agent']}")
+
+        try:
+            with open(options['path'], 'rb') as f:
+                report = self.importer(
+                    f, agent, file_name=options['path'],
+                    chunk_size=options['chunk_size'], dry_run=options['dry_run'],
+                )
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"{report['total']} satır, {report['imported']} yeni, {report['updated']} güncellenen, "
+            f"{report['error_count']} hatalı "
+            f"({report['seconds']} sn, {report['rows_per_second']} satır/sn)"
+            + (" [deneme: kaydedilmedi]" if options['dry_run'] else "")
+        )
+        for error in report['errors'][:20]:
+            self.stdout.write(self.style.WARNING(f"  satır {error['row']} ({error['key']}): {' '.join(error['errors'])}"))
+
+        if options['errors_csv']:
+            with open(options['errors_csv'], 'w', newline='', encoding='utf-8') as f:
+                write_error_report(report, f)
+            self.stdout.write(f"Hata raporu: {options['errors_csv']}")
@@ -0,0 +1,116 @@
+# policy_management/management/commands/policy_documents.py
+
+import datetime
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from policy_management import fragment_cache
+from policy_management.models import DocumentBlob, DocumentExtraction, Policy
+from policy_management.storage import document_storage, is_blob
+
+
+class Command(BaseCommand):
+    help = (
+        'İçerik adresli poliçe döküman deposunun bakımı: eski dosyaları depoya taşır (tekrarları birleştirir), '
+        'referans sayaçlarını yeniden hesaplar ve kullanılmayan dosyaları siler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--migrate-legacy', action='store_true',
+                            help='policies/documents/ altındaki eski dosyaları içerik adresli depoya taşır.')
+        parser.add_argument('--recount', action='store_true', help='ref_count değerlerini poliçelerden hesaplar.')
+        parser.add_argument('--gc', action='store_true',
+                            help='Hiçbir poliçenin veya döküman analizinin kullanmadığı dosyaları siler '
+                                 '(yarım kalan yüklemeler).')
+        parser.add_argument('--gc-age', type=int, default=60,
+                            help='Bu kadar dakikadan yeni kullanılmayan dosyalar silinmez (süren yüklemeler).')
+        parser.add_argument('--extraction-days', type=int, default=30,
+                            help='--gc ile, bu kadar günden eski ve hiçbir poliçenin kullanmadığı dosyaların '
+                                 'döküman analizi kayıtları da silinir (varsayılan: 30).')
+
+    def handle(self, *args, **options):
+        if options['migrate_legacy']:
+            self.migrate_legacy()
+        if options['recount']:
+            self.recount()
+        if options['gc']:
+            self.collect_garbage(options['gc_age'], options['extraction_days'])
+        self.report()
+
+    def migrate_legacy(self):
+        storage = document_storage()
+        legacy = (
+            Policy.objects.exclude(document='').exclude(document__isnull=True)
+            .values('document').annotate(total=Count('pk')).order_by('document')
+        )
+        moved = 0
+        for row in legacy:
+            name = row['document']
+            if is_blob(name):
+                continue
+            if not storage.exists(name):
+                self.stdout.write(self.style.WARNING(f"Dosya bulunamadı, atlandı: {name}"))
+                continue
+            with storage.open(name, 'rb') as f:
+                new_name = storage.save(name, File(f, name=name))
+            # Toplu güncelleme sinyal göndermez: sayaç burada artırılır
+            updated = Policy.objects.filter(document=name).update(document=new_name)
+            DocumentBlob.objects.filter(name=new_name).update(ref_count=F('ref_count') + updated)
+            # Poliçe listesindeki döküman bağlantıları değişti
+            fragment_cache.invalidate(
+                *Policy.objects.filter(document=new_name).values_list('issued_by_agent_id', flat=True).distinct()
+            )
+            storage.delete(name)
+            moved += 1
+            self.stdout.write(f"{name} -> {new_name} ({updated} poliçe)")
+        self.stdout.write(self.style.SUCCESS(f"{moved} eski dosya taşındı."))
+
+    def recount(self):
+        counts = dict(
+            Policy.objects.filter(document__startswith='policies/blobs/')
+            .values_list('document').annotate(total=Count('pk')).order_by()
+        )
+        changed = 0
+        for blob in DocumentBlob.objects.all().iterator():
+            actual = counts.get(blob.name, 0)
+            if blob.ref_count != actual:
+                DocumentBlob.objects.filter(pk=blob.pk).update(ref_count=actual)
+                changed += 1
+        self.stdout.write(self.style.SUCCESS(f"Referans sayaçları hesaplandı ({changed} düzeltme)."))
+
+    def collect_garbage(self, age_minutes, extraction_days):
+        storage = document_storage()
+        now = timezone.now()
+
+        # Analiz için yüklenip poliçeye bağlanmayan dosyalar: eski analiz kayıtları silinir,
+        # dosyaları aşağıda diğer kullanılmayan dosyalarla birlikte toplanır
+        expired_extractions, _ = DocumentExtraction.objects.filter(
+            created_at__lt=now - datetime.timedelta(days=extraction_days),
+        ).exclude(
+            document__in=DocumentBlob.objects.filter(ref_count__gt=0).values('name'),
+        ).delete()
+        self.stdout.write(f"{expired_extractions} eski döküman analizi kaydı silindi.")
+
+        limit = now - datetime.timedelta(minutes=age_minutes)
+        removed = 0
+        # Döküman analizi kayıtlarının gösterdiği dosyalar poliçe sayacına girmez
+        candidates = DocumentBlob.objects.filter(ref_count__lte=0, created_at__lt=limit).exclude(
+            name__in=DocumentExtraction.objects.values('document')
+        )
+        for blob in candidates.iterator():
+            if Policy.objects.filter(document=blob.name).exists():
+                continue  # Sayaç sapmış: --recount ile düzeltilir
+            storage.delete_blob(blob.name)
+            blob.delete()
+            removed += 1
+        self.stdout.write(self.style.SUCCESS(f"{removed} kullanılmayan dosya silindi."))
+
+    def report(self):
+        totals = DocumentBlob.objects.aggregate(blobs=Count('pk'), size=Sum('size'))
+        references = Policy.objects.filter(document__startswith='policies/blobs/').count()
+        self.stdout.write(
+            f"Depo: {totals['blobs']} dosya, {(totals['size'] or 0) / 1024:.1f} KB, {references} poliçe referansı."
+        )
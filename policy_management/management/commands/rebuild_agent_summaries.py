@@ -0,0 +1,15 @@
+# policy_management/management/commands/rebuild_agent_summaries.py
+
+from django.core.management.base import BaseCommand
+from policy_management.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = 'Acente özet sayaçlarını (Dashboard) veritabanından baştan hesaplar. Sapmaları düzeltir.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--agent', type=int, action='append', help='Sadece bu acente ID(leri) için hesapla.')
+
+    def handle(self, *args, **options):
+        count = rebuild_summaries(options['agent'])
+        self.stdout.write(self.style.SUCCESS(f"{count} acentenin özet sayaçları yeniden hesaplandı."))
@@ -0,0 +1,15 @@
+# policy_management/management/commands/rebuild_best_offers.py
+
+from django.core.management.base import BaseCommand
+from policy_management.best_offers import rebuild
+
+
+class Command(BaseCommand):
+    help = 'En iyi teklif tablosunu (müşteri + sigorta tipi başına en ucuz güncel teklif) baştan hesaplar.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--agent', type=int, action='append', help='Sadece bu acente ID(leri) için hesapla.')
+
+    def handle(self, *args, **options):
+        count = rebuild(options['agent'])
+        self.stdout.write(self.style.SUCCESS(f"{count} en iyi teklif satırı yazıldı."))
@@ -0,0 +1,14 @@
+# policy_management/management/commands/rebuild_customer_search.py
+
+from django.core.management.base import BaseCommand
+from policy_management.customer_search import get_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Müşteri arama indeksini baştan oluşturur (toplu içe aktarma veya sapma sonrası).'
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Müşteri arama indeksi yeniden oluşturuldu ({type(get_backend()).__name__})."
+        ))
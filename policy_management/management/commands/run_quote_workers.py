@@ -0,0 +1,75 @@
+# policy_management/management/commands/run_quote_workers.py
+
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from policy_management import carrier_metrics
+from policy_management.quote_jobs import claim_next_job, requeue_stale_jobs, run_job, worker_name
+
+
+def worker_loop(poll_interval, once=False, stale_after=300, requeue_interval=60):
+    """
+    Tek bir işçi süreci: sıradaki işi al, çalıştır; iş yoksa bekle.
+    Her requeue_interval saniyede bir, stale_after saniyedir 'running' kalan işler
+    (çöken işçilerden) tekrar sıraya alınır; güncelleme tek UPDATE olduğu için
+    birden fazla işçinin aynı anda yapması sorun değildir.
+    """
+    name = worker_name()
+    next_requeue = time.monotonic() + requeue_interval
+    while True:
+        if time.monotonic() >= next_requeue:
+            requeue_stale_jobs(stale_after)
+            next_requeue = time.monotonic() + requeue_interval
+
+        job = claim_next_job(name)
+        if job is None:
+            if once:
+                carrier_metrics.flush(force=True)
+                return
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+
+
+class Command(BaseCommand):
+    help = 'Arka plan fiyat teklifi işlerini (QuoteJob) çalıştıran işçi süreçlerini başlatır.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help='İşçi süreci sayısı (varsayılan: 2).')
+        parser.add_argument('--poll-interval', type=float, default=0.5, help='Sıra boşken bekleme süresi (saniye).')
+        parser.add_argument('--stale-after', type=int, default=300,
+                            help='Bu kadar saniyedir "running" kalan işler tekrar sıraya alınır.')
+        parser.add_argument('--requeue-interval', type=float, default=60,
+                            help='Yarım kalmış işlerin kaç saniyede bir kontrol edileceği.')
+        parser.add_argument('--once', action='store_true', help='Sıradaki işleri bitirip çık (cron için).')
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs(options['stale_after'])
+        if requeued:
+            self.stdout.write(self.style.WARNING(f"{requeued} adet yarım kalmış iş tekrar sıraya alındı."))
+
+        loop_args = (options['poll_interval'], options['once'], options['stale_after'], options['requeue_interval'])
+        if options['processes'] <= 1:
+            self.stdout.write(self.style.SUCCESS("Teklif işçisi çalışıyor (tek süreç)."))
+            worker_loop(*loop_args)
+            return
+
+        # Açık veritabanı bağlantıları alt süreçlerle paylaşılmamalı
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=worker_loop, args=loop_args, daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(self.style.SUCCESS(f"{len(processes)} teklif işçisi çalışıyor."))
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0011_remove_customer_address_remove_quote_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['agent', '-customer_id'], name='customer_agent_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policy',
+            index=models.Index(fields=['issued_by_agent', '-policy_id'], name='policy_agent_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policy',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['issued_by_agent', 'end_date'], name='policy_agent_active_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quote',
+            index=models.Index(fields=['issued_by_agent', '-created_at', 'premium_amount'], name='quote_agent_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quote',
+            index=models.Index(fields=['issued_by_agent', 'customer', 'policy_type', 'premium_amount', '-created_at'], name='quote_agent_cust_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='quote',
+            index=models.Index(fields=['issued_by_agent', 'policy_type', 'premium_amount', '-created_at'], name='quote_agent_type_prem_idx'),
+        ),
+    ]
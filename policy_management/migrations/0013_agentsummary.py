@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0012_agent_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentSummary',
+            fields=[
+                ('agent', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Acente')),
+                ('customer_count', models.IntegerField(default=0, verbose_name='Müşteri Sayısı')),
+                ('policy_count', models.IntegerField(default=0, verbose_name='Poliçe Sayısı')),
+                ('active_count', models.IntegerField(default=0, verbose_name='Aktif Poliçe')),
+                ('expired_count', models.IntegerField(default=0, verbose_name='Süresi Dolan Poliçe')),
+                ('cancelled_count', models.IntegerField(default=0, verbose_name='İptal Edilen Poliçe')),
+                ('total_premium', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Toplam Prim')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Son Güncelleme')),
+            ],
+            options={
+                'verbose_name': 'Acente Özeti',
+                'verbose_name_plural': 'Acente Özetleri',
+            },
+        ),
+    ]
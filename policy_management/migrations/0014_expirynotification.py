@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0013_agentsummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiryNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('end_date', models.DateField(verbose_name='Uyarılan Bitiş Tarihi')),
+                ('sent_at', models.DateTimeField(auto_now_add=True, verbose_name='Gönderim Zamanı')),
+            ],
+            options={
+                'verbose_name': 'Bitiş Bildirimi',
+                'verbose_name_plural': 'Bitiş Bildirimleri',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='policy',
+            index=models.Index(condition=models.Q(('status', 'active')), fields=['end_date'], name='policy_active_end_idx'),
+        ),
+        migrations.AddField(
+            model_name='expirynotification',
+            name='policy',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expiry_notifications', to='policy_management.policy', verbose_name='Poliçe'),
+        ),
+        migrations.AddConstraint(
+            model_name='expirynotification',
+            constraint=models.UniqueConstraint(fields=('policy', 'end_date'), name='unique_expiry_notification'),
+        ),
+    ]
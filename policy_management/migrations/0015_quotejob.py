@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0014_expirynotification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuoteJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('policy_type', models.CharField(choices=[('Kasko', 'Kasko'), ('Trafik', 'Trafik Sigortası'), ('DASK', 'DASK/Konut')], max_length=50, verbose_name='Sigorta Tipi')),
+                ('status', models.CharField(choices=[('pending', 'Sırada'), ('running', 'Çalışıyor'), ('done', 'Tamamlandı'), ('failed', 'Hata')], default='pending', max_length=10, verbose_name='Durum')),
+                ('results', models.JSONField(blank=True, default=list, verbose_name='Şirket Sonuçları')),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('worker', models.CharField(blank=True, default='', max_length=100, verbose_name='İşçi')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='Başlama Zamanı')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='Bitiş Zamanı')),
+                ('agent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quote_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Acente')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='policy_management.customer', verbose_name='Müşteri')),
+            ],
+            options={
+                'verbose_name': 'Teklif İşi',
+                'verbose_name_plural': 'Teklif İşleri',
+                'indexes': [models.Index(fields=['status', 'id'], name='quotejob_status_id_idx')],
+            },
+        ),
+    ]
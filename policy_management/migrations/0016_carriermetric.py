@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0015_quotejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CarrierMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('carrier', models.CharField(max_length=20, verbose_name='Şirket')),
+                ('policy_type', models.CharField(max_length=50, verbose_name='Sigorta Tipi')),
+                ('outcome', models.CharField(max_length=20, verbose_name='Sonuç')),
+                ('bucket', models.PositiveSmallIntegerField(verbose_name='Süre Dilimi')),
+                ('count', models.BigIntegerField(default=0, verbose_name='Çağrı Sayısı')),
+                ('latency_sum', models.FloatField(default=0, verbose_name='Toplam Süre (sn)')),
+                ('request_bytes', models.BigIntegerField(default=0, verbose_name='Gönderilen Veri (bayt)')),
+                ('response_bytes', models.BigIntegerField(default=0, verbose_name='Alınan Veri (bayt)')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Son Güncelleme')),
+            ],
+            options={
+                'verbose_name': 'Şirket Metriği',
+                'verbose_name_plural': 'Şirket Metrikleri',
+                'constraints': [models.UniqueConstraint(fields=('carrier', 'policy_type', 'outcome', 'bucket'), name='unique_carrier_metric_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0016_carriermetric'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10, verbose_name='Yöntem')),
+                ('path', models.CharField(max_length=500, verbose_name='Adres')),
+                ('view_name', models.CharField(blank=True, default='', max_length=200, verbose_name='Görünüm')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='Durum Kodu')),
+                ('user_id', models.IntegerField(blank=True, null=True, verbose_name='Kullanıcı ID')),
+                ('total_ms', models.FloatField(verbose_name='Toplam Süre (ms)')),
+                ('view_ms', models.FloatField(blank=True, null=True, verbose_name='Görünüm Süresi (ms)')),
+                ('template_ms', models.FloatField(blank=True, null=True, verbose_name='Şablon Süresi (ms)')),
+                ('db_ms', models.FloatField(verbose_name='Veritabanı Süresi (ms)')),
+                ('query_count', models.PositiveIntegerField(verbose_name='Sorgu Sayısı')),
+                ('template_query_count', models.PositiveIntegerField(default=0, verbose_name='Şablondaki Sorgu Sayısı')),
+                ('duplicate_query_count', models.PositiveIntegerField(default=0, verbose_name='Tekrarlanan Sorgu Sayısı')),
+                ('slowest_queries', models.JSONField(blank=True, default=list, verbose_name='En Yavaş Sorgular')),
+                ('repeated_queries', models.JSONField(blank=True, default=list, verbose_name='Tekrarlanan Sorgular')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Kayıt Zamanı')),
+            ],
+            options={
+                'verbose_name': 'Yavaş İstek',
+                'verbose_name_plural': 'Yavaş İstekler',
+            },
+        ),
+    ]
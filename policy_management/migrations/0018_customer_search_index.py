@@ -0,0 +1,71 @@
+# Müşteri arama indeksi (SQLite FTS5). Diğer veritabanlarında işlem yapılmaz;
+# customer_search.DatabaseScanBackend kullanılır.
+
+import re
+
+from django.db import migrations
+
+FTS_TABLE = 'policy_management_customersearch'
+
+# customer_search.py'deki katlama ve belge üretiminin bu göç anındaki kopyası.
+# Canlı modül içe aktarılmaz: sonradan yapılan değişiklikler eski göçü bozmamalı.
+_TURKISH_UPPER = str.maketrans({'İ': 'i', 'I': 'ı'})
+_ASCII_FOLD = str.maketrans('ıçğöşüâîû', 'icgosuaiu')
+
+
+def _fold(text):
+    return (text or '').translate(_TURKISH_UPPER).lower().translate(_ASCII_FOLD)
+
+
+def _phone_digits(phone):
+    digits = re.sub(r'\D', '', phone or '')
+    short = re.sub(r'^(90|0)', '', digits)
+    return ' '.join(dict.fromkeys(d for d in (digits, short) if d))
+
+
+def _document_row(customer):
+    return (
+        customer.pk,
+        _fold(customer.name),
+        ' '.join(filter(None, (customer.tckn, customer.tckn_vkn))),
+        _phone_digits(customer.phone),
+        _fold(customer.email),
+        str(customer.agent_id or ''),
+    )
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        "name, tckn, phone, email, agent_id UNINDEXED, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+
+    Customer = apps.get_model('policy_management', 'Customer')
+    rows = [_document_row(customer) for customer in Customer.objects.all().iterator()]
+    if rows:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, tckn, phone, email, agent_id) "
+                f"VALUES (%s, %s, %s, %s, %s, %s)",
+                rows,
+            )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0017_requestprofile'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
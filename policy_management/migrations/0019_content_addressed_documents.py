@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:25
+
+import policy_management.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0018_customer_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Dosya Yolu')),
+                ('sha256', models.CharField(db_index=True, max_length=64, verbose_name='SHA-256')),
+                ('size', models.BigIntegerField(verbose_name='Boyut (bayt)')),
+                ('ref_count', models.IntegerField(default=0, verbose_name='Kullanan Poliçe Sayısı')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturma Tarihi')),
+            ],
+            options={
+                'verbose_name': 'Döküman İçeriği',
+                'verbose_name_plural': 'Döküman İçerikleri',
+            },
+        ),
+        migrations.AlterField(
+            model_name='policy',
+            name='document',
+            field=models.FileField(blank=True, null=True, storage=policy_management.storage.document_storage, upload_to='policies/documents/', verbose_name='Poliçe Dökümanı (PDF)'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0019_content_addressed_documents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentExtraction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('document', models.CharField(max_length=255, verbose_name='Dosya Yolu')),
+                ('original_name', models.CharField(blank=True, default='', max_length=255, verbose_name='Yüklenen Dosya Adı')),
+                ('status', models.CharField(choices=[('pending', 'Sırada'), ('done', 'Tamamlandı'), ('failed', 'Hata')], default='pending', max_length=10, verbose_name='Durum')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='Çıkarılan Veriler')),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('duration_ms', models.FloatField(blank=True, null=True, verbose_name='Süre (ms)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True, verbose_name='Havuza Gönderilme')),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Döküman Analizi',
+                'verbose_name_plural': 'Döküman Analizleri',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0020_document_extraction'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['tckn_vkn'], name='customer_tckn_vkn_idx'),
+        ),
+    ]
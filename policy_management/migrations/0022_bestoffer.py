@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0021_customer_tckn_vkn_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BestOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('policy_type', models.CharField(choices=[('Kasko', 'Kasko'), ('Trafik', 'Trafik Sigortası'), ('DASK', 'DASK/Konut')], max_length=50, verbose_name='Sigorta Tipi')),
+                ('company_name', models.CharField(max_length=100, verbose_name='Sigorta Şirketi')),
+                ('premium_amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Prim Tutarı')),
+                ('quoted_at', models.DateTimeField(verbose_name='Teklif Tarihi')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Son Güncelleme')),
+                ('agent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='best_offers', to=settings.AUTH_USER_MODEL, verbose_name='Acente')),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='policy_management.customer', verbose_name='Müşteri')),
+                ('quote', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='policy_management.quote', verbose_name='Teklif')),
+            ],
+            options={
+                'verbose_name': 'En İyi Teklif',
+                'verbose_name_plural': 'En İyi Teklifler',
+                'constraints': [models.UniqueConstraint(fields=('agent', 'customer', 'policy_type'), name='best_offer_agent_cust_type_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('policy_management', '0022_bestoffer'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='documentextraction',
+            name='document',
+            field=models.CharField(db_index=True, max_length=255, verbose_name='Dosya Yolu'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 
+from .storage import document_storage
+
 # Kendi kullanıcı modelimizi tanımlıyoruz
 class CustomUser(AbstractUser):
     ROLE_CHOICES = (
@@ -89,6 +91,12 @@ class Customer(models.Model):
     class Meta:
         verbose_name = "Müşteri"
         verbose_name_plural = "Müşteriler"
+        indexes = [
+            # AgentCustomerListView: agent=... ORDER BY -customer_id
+            models.Index(fields=['agent', '-customer_id'], name='customer_agent_id_idx'),
+            # Toplu içe aktarma: VKN'ler (ve eski kayıtların TCKN'leri) bu alanda aranır
+            models.Index(fields=['tckn_vkn'], name='customer_tckn_vkn_idx'),
+        ]
 
     def __str__(self):
         # Müşterinin TCKN'si doluysa onu, boşsa "TCKN Yok" yazısını göster.
@@ -129,8 +137,10 @@ class Policy(models.Model):
         verbose_name="Poliçe Durumu"
     ) 
     
+    # Aynı içerik diskte bir kez tutulur (storage.py); upload_to sadece eski kayıtlar içindir
     document = models.FileField(
         upload_to='policies/documents/', 
+        storage=document_storage,
         blank=True, 
         null=True,
         verbose_name='Poliçe Dökümanı (PDF)'
@@ -148,6 +158,23 @@ class Policy(models.Model):
     class Meta:
         verbose_name = "Poliçe"
         verbose_name_plural = "Poliçeler"
+        indexes = [
+            # AgentPolicyListView: issued_by_agent=... ORDER BY -policy_id
+            models.Index(fields=['issued_by_agent', '-policy_id'], name='policy_agent_id_idx'),
+            # AgentDashboardView: issued_by_agent=..., status='active', end_date aralığı ORDER BY end_date
+            # Kısmi indeks: sadece aktif poliçeler (destekleyen veritabanlarında daha küçük indeks)
+            models.Index(
+                fields=['issued_by_agent', 'end_date'],
+                condition=models.Q(status='active'),
+                name='policy_agent_active_end_idx',
+            ),
+            # check_policy_expiry: tüm acenteler, status='active', end_date aralığı
+            models.Index(
+                fields=['end_date'],
+                condition=models.Q(status='active'),
+                name='policy_active_end_idx',
+            ),
+        ]
         
     def __str__(self):
         return f"Poliçe No: {self.policy_number} ({self.customer.name})"
@@ -190,6 +217,305 @@ class Quote(models.Model):
     class Meta:
         verbose_name = "Fiyat Teklifi"
         verbose_name_plural = "Fiyat Teklifleri"
+        indexes = [
+            # QuoteListView (filtresiz): issued_by_agent=... ORDER BY -created_at, premium_amount
+            models.Index(fields=['issued_by_agent', '-created_at', 'premium_amount'], name='quote_agent_created_idx'),
+            # QuoteListView (müşteri + tip): ... ORDER BY premium_amount, -created_at
+            models.Index(
+                fields=['issued_by_agent', 'customer', 'policy_type', 'premium_amount', '-created_at'],
+                name='quote_agent_cust_type_idx',
+            ),
+            # QuoteListView (sadece tip): ... ORDER BY premium_amount, -created_at
+            models.Index(
+                fields=['issued_by_agent', 'policy_type', 'premium_amount', '-created_at'],
+                name='quote_agent_type_prem_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.company_name} - {self.policy_type} ({self.premium_amount or 'Hata'})"
+
+# -----------------------------------------------------
+# EN İYİ TEKLİF (BestOffer)
+# -----------------------------------------------------
+class BestOffer(models.Model):
+    """
+    (acente, müşteri, sigorta tipi) başına tazelik süresi içindeki en ucuz geçerli
+    teklif. Teklifler kaydedildikçe best_offers.py tarafından güncellenir; en iyi
+    fiyat sorguları teklif geçmişini taramadan tek satır okur.
+    Sapma olursa: python manage.py rebuild_best_offers
+    """
+
+    agent = models.ForeignKey(
+        'policy_management.CustomUser',
+        on_delete=models.CASCADE,
+        related_name='best_offers',
+        verbose_name="Acente"
+    )
+    customer = models.ForeignKey(Customer, on_delete=models.CASCADE, verbose_name="Müşteri")
+    policy_type = models.CharField(max_length=50, choices=Quote.QUOTE_TYPES, verbose_name="Sigorta Tipi")
+
+    quote = models.ForeignKey(Quote, on_delete=models.CASCADE, related_name='+', verbose_name="Teklif")
+    company_name = models.CharField(max_length=100, verbose_name="Sigorta Şirketi")
+    premium_amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Prim Tutarı")
+    quoted_at = models.DateTimeField(verbose_name="Teklif Tarihi")
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Son Güncelleme")
+
+    class Meta:
+        verbose_name = "En İyi Teklif"
+        verbose_name_plural = "En İyi Teklifler"
+        constraints = [
+            models.UniqueConstraint(fields=['agent', 'customer', 'policy_type'], name='best_offer_agent_cust_type_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.customer_id} / {self.policy_type}: {self.company_name} {self.premium_amount}"
+
+
+# -----------------------------------------------------
+# ACENTE ÖZET MODELİ (AgentSummary)
+# -----------------------------------------------------
+class AgentSummary(models.Model):
+    """
+    Acente başına özet sayaçlar (Dashboard için).
+    Customer/Policy kayıtları değiştikçe sinyallerle (signals.py) artımlı olarak
+    güncellenir. Sapma olursa: python manage.py rebuild_agent_summaries
+    """
+
+    agent = models.OneToOneField(
+        'policy_management.CustomUser',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='summary',
+        verbose_name="Acente"
+    )
+    customer_count = models.IntegerField(default=0, verbose_name="Müşteri Sayısı")
+    policy_count = models.IntegerField(default=0, verbose_name="Poliçe Sayısı")
+    active_count = models.IntegerField(default=0, verbose_name="Aktif Poliçe")
+    expired_count = models.IntegerField(default=0, verbose_name="Süresi Dolan Poliçe")
+    cancelled_count = models.IntegerField(default=0, verbose_name="İptal Edilen Poliçe")
+    total_premium = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Toplam Prim")
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Son Güncelleme")
+
+    class Meta:
+        verbose_name = "Acente Özeti"
+        verbose_name_plural = "Acente Özetleri"
+
+    def __str__(self):
+        return f"{self.agent} - {self.customer_count} müşteri / {self.policy_count} poliçe"
+
+
+# -----------------------------------------------------
+# BİTİŞ BİLDİRİMİ KAYDI (ExpiryNotification)
+# -----------------------------------------------------
+class ExpiryNotification(models.Model):
+    """
+    Gönderilen poliçe bitiş uyarılarının kaydı (check_policy_expiry).
+    Aynı poliçe + bitiş tarihi için ikinci kez uyarı gönderilmez; poliçe
+    yenilenip bitiş tarihi değişirse yeni tarih için tekrar uyarılır.
+    """
+
+    policy = models.ForeignKey(
+        Policy,
+        on_delete=models.CASCADE,
+        related_name='expiry_notifications',
+        verbose_name="Poliçe"
+    )
+    end_date = models.DateField(verbose_name="Uyarılan Bitiş Tarihi")
+    sent_at = models.DateTimeField(auto_now_add=True, verbose_name="Gönderim Zamanı")
+
+    class Meta:
+        verbose_name = "Bitiş Bildirimi"
+        verbose_name_plural = "Bitiş Bildirimleri"
+        constraints = [
+            models.UniqueConstraint(fields=['policy', 'end_date'], name='unique_expiry_notification'),
+        ]
+
+    def __str__(self):
+        return f"{self.policy_id} - {self.end_date}"
+
+
+# -----------------------------------------------------
+# ARKA PLAN TEKLİF İŞİ (QuoteJob)
+# -----------------------------------------------------
+class QuoteJob(models.Model):
+    """
+    Arka planda alınacak fiyat teklifi işi. Web isteği işi kuyruğa ekleyip hemen
+    döner; run_quote_workers komutundaki işçiler şirketleri çağırır ve her şirketin
+    sonucunu geldiği anda 'results' alanına yazar.
+    """
+
+    STATUS_CHOICES = (
+        ('pending', 'Sırada'),
+        ('running', 'Çalışıyor'),
+        ('done', 'Tamamlandı'),
+        ('failed', 'Hata'),
+    )
+
+    customer = models.ForeignKey(
+        Customer,
+        on_delete=models.CASCADE,
+        verbose_name="Müşteri"
+    )
+    policy_type = models.CharField(max_length=50, choices=Quote.QUOTE_TYPES, verbose_name="Sigorta Tipi")
+    agent = models.ForeignKey(
+        'policy_management.CustomUser',
+        on_delete=models.CASCADE,
+        related_name='quote_jobs',
+        verbose_name="Acente"
+    )
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Durum")
+    results = models.JSONField(default=list, blank=True, verbose_name="Şirket Sonuçları")
+    error_message = models.TextField(blank=True, null=True)
+    worker = models.CharField(max_length=100, blank=True, default='', verbose_name="İşçi")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Başlama Zamanı")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Bitiş Zamanı")
+
+    class Meta:
+        verbose_name = "Teklif İşi"
+        verbose_name_plural = "Teklif İşleri"
+        indexes = [
+            # İşçiler sıradaki en eski işi alır: status='pending' ORDER BY id
+            models.Index(fields=['status', 'id'], name='quotejob_status_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"İş #{self.pk} - {self.customer_id} / {self.policy_type} ({self.get_status_display()})"
+
+
+# -----------------------------------------------------
+# ŞİRKET ÇAĞRI METRİKLERİ (CarrierMetric)
+# -----------------------------------------------------
+class CarrierMetric(models.Model):
+    """
+    Şirket bağlayıcı çağrılarının birikimli sayaçları (carrier_metrics.py).
+    Her satır bir (şirket, sigorta tipi, sonuç, süre dilimi) kovasıdır; tüm
+    işlemler (web, işçiler) aynı satırlara F() ile ekleme yapar.
+    """
+
+    carrier = models.CharField(max_length=20, verbose_name="Şirket")
+    policy_type = models.CharField(max_length=50, verbose_name="Sigorta Tipi")
+    outcome = models.CharField(max_length=20, verbose_name="Sonuç")  # success / error / timeout / circuit_open
+    bucket = models.PositiveSmallIntegerField(verbose_name="Süre Dilimi")  # carrier_metrics.LATENCY_BUCKETS sırası
+
+    count = models.BigIntegerField(default=0, verbose_name="Çağrı Sayısı")
+    latency_sum = models.FloatField(default=0, verbose_name="Toplam Süre (sn)")
+    request_bytes = models.BigIntegerField(default=0, verbose_name="Gönderilen Veri (bayt)")
+    response_bytes = models.BigIntegerField(default=0, verbose_name="Alınan Veri (bayt)")
+
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Son Güncelleme")
+
+    class Meta:
+        verbose_name = "Şirket Metriği"
+        verbose_name_plural = "Şirket Metrikleri"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['carrier', 'policy_type', 'outcome', 'bucket'], name='unique_carrier_metric_bucket'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.carrier} / {self.policy_type} / {self.outcome} [{self.bucket}]: {self.count}"
+
+
+# -----------------------------------------------------
+# YAVAŞ İSTEK KAYDI (RequestProfile)
+# -----------------------------------------------------
+class RequestProfile(models.Model):
+    """
+    Profil middleware'inin (profiling.py) örneklediği yavaş isteklerin kaydı.
+    Sorgu sayısı, veritabanı süresi, en yavaş ve tekrarlanan sorgular tutulur.
+    En fazla REQUEST_PROFILER_MAX_ROWS satır saklanır; eskiler
+    REQUEST_PROFILER_PRUNE_EVERY kayıtta bir silinir.
+    """
+
+    method = models.CharField(max_length=10, verbose_name="Yöntem")
+    path = models.CharField(max_length=500, verbose_name="Adres")
+    view_name = models.CharField(max_length=200, blank=True, default='', verbose_name="Görünüm")
+    status_code = models.PositiveSmallIntegerField(verbose_name="Durum Kodu")
+    user_id = models.IntegerField(null=True, blank=True, verbose_name="Kullanıcı ID")
+
+    total_ms = models.FloatField(verbose_name="Toplam Süre (ms)")
+    view_ms = models.FloatField(null=True, blank=True, verbose_name="Görünüm Süresi (ms)")
+    template_ms = models.FloatField(null=True, blank=True, verbose_name="Şablon Süresi (ms)")
+    db_ms = models.FloatField(verbose_name="Veritabanı Süresi (ms)")
+
+    query_count = models.PositiveIntegerField(verbose_name="Sorgu Sayısı")
+    template_query_count = models.PositiveIntegerField(default=0, verbose_name="Şablondaki Sorgu Sayısı")
+    duplicate_query_count = models.PositiveIntegerField(default=0, verbose_name="Tekrarlanan Sorgu Sayısı")
+    slowest_queries = models.JSONField(default=list, blank=True, verbose_name="En Yavaş Sorgular")
+    repeated_queries = models.JSONField(default=list, blank=True, verbose_name="Tekrarlanan Sorgular")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Kayıt Zamanı")
+
+    class Meta:
+        verbose_name = "Yavaş İstek"
+        verbose_name_plural = "Yavaş İstekler"
+
+    def __str__(self):
+        return f"{self.method} {self.path} - {self.total_ms:.0f} ms / {self.query_count} sorgu"
+
+
+# -----------------------------------------------------
+# POLİÇE DÖKÜMANI İÇERİK KAYDI (DocumentBlob)
+# -----------------------------------------------------
+class DocumentBlob(models.Model):
+    """
+    İçerik adresli depodaki (storage.py) her dosyanın kaydı. Aynı içerik diskte
+    bir kez tutulur; ref_count, dosyayı kullanan poliçe sayısıdır. Sayaç 0'a
+    düşünce dosya silinir (signals.py); döküman analizi kaydının gösterdiği
+    dosya tutulur.
+    """
+
+    name = models.CharField(max_length=255, unique=True, verbose_name="Dosya Yolu")
+    sha256 = models.CharField(max_length=64, db_index=True, verbose_name="SHA-256")
+    size = models.BigIntegerField(verbose_name="Boyut (bayt)")
+    ref_count = models.IntegerField(default=0, verbose_name="Kullanan Poliçe Sayısı")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturma Tarihi")
+
+    class Meta:
+        verbose_name = "Döküman İçeriği"
+        verbose_name_plural = "Döküman İçerikleri"
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} poliçe)"
+
+
+# -----------------------------------------------------
+# DÖKÜMAN ANALİZ SONUÇLARI (document_extraction.py)
+# -----------------------------------------------------
+class DocumentExtraction(models.Model):
+    """
+    Poliçe dökümanından çıkarılan veriler. İçerik özetine (SHA-256) göre tutulur:
+    aynı dosya tekrar yüklenirse analiz yeniden çalıştırılmaz.
+    """
+
+    STATUS_CHOICES = (
+        ('pending', 'Sırada'),
+        ('done', 'Tamamlandı'),
+        ('failed', 'Hata'),
+    )
+
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name="SHA-256")
+    document = models.CharField(max_length=255, db_index=True, verbose_name="Dosya Yolu")
+    original_name = models.CharField(max_length=255, blank=True, default='', verbose_name="Yüklenen Dosya Adı")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending', verbose_name="Durum")
+    data = models.JSONField(default=dict, blank=True, verbose_name="Çıkarılan Veriler")
+    error_message = models.TextField(blank=True, null=True)
+    duration_ms = models.FloatField(null=True, blank=True, verbose_name="Süre (ms)")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    submitted_at = models.DateTimeField(null=True, blank=True, verbose_name="Havuza Gönderilme")
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Döküman Analizi"
+        verbose_name_plural = "Döküman Analizleri"
 
     def __str__(self):
-        return f"{self.company_name} - {self.policy_type} ({self.premium_amount or 'Hata'})"
\ No newline at end of file
+        return f"{self.original_name or self.document} - {self.get_status_display()}"
@@ -0,0 +1,154 @@
+# policy_management/pagination.py
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Q
+
+# -----------------------------------------------------
+# İmleç (Keyset) Sayfalama
+# -----------------------------------------------------
+# OFFSET ve COUNT(*) kullanılmaz: her sayfa, bir önceki sayfanın son satırının
+# sıralama değerlerinden sonrasını ister. Böylece 1. sayfa ile 10.000. sayfa
+# aynı maliyettedir (indeks üzerinde tek bir aralık okuması).
+
+
+class KeysetPage:
+    def __init__(self, object_list, has_next, has_previous, next_token, previous_token):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_token = next_token
+        self.previous_token = previous_token
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _split(ordering):
+    """'-created_at' -> ('created_at', True)"""
+    return [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+
+
+def encode_cursor(obj, ordering, direction):
+    values = []
+    for name, _ in _split(ordering):
+        value = getattr(obj, obj._meta.get_field(name).attname)
+        # Decimal, tarih vb. JSON'a metin olarak yazılır, çözülürken alan tipine çevrilir
+        if value is not None and not isinstance(value, int):
+            value = str(value)
+        values.append(value)
+    raw = json.dumps({'d': direction, 'v': values}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, model, ordering):
+    """İmleci çözer. Geçersizse None döner (ilk sayfadan başlanır)."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        data = json.loads(raw)
+        direction, values = data['d'], data['v']
+        if direction not in ('next', 'prev') or len(values) != len(ordering):
+            return None
+        fields = [model._meta.get_field(name) for name, _ in _split(ordering)]
+        return direction, [None if v is None else f.to_python(v) for f, v in zip(fields, values)]
+    except (ValueError, TypeError, KeyError, ValidationError):
+        return None
+
+
+def _nulls_after(descending):
+    """NULL değerler bu yönde sıralamanın sonunda mı? (SQLite/MySQL: NULL en küçük, PostgreSQL: en büyük)"""
+    return connection.features.nulls_order_largest != descending
+
+
+def _after(ordering, values):
+    """Verilen sıralama değerlerinden *sonra* gelen satırlar için filtre (satır karşılaştırması)."""
+    condition = Q()
+    equal = Q()
+    for (name, descending), value in zip(_split(ordering), values):
+        # NULL ile karşılaştırma (>, <, =) hiçbir satırı seçmez: NULL'lar ayrıca ele alınır
+        if value is None:
+            if not _nulls_after(descending):
+                condition |= equal & Q(**{f'{name}__isnull': False})
+            equal &= Q(**{f'{name}__isnull': True})
+        else:
+            lookup = 'lt' if descending else 'gt'
+            later = Q(**{f'{name}__{lookup}': value})
+            if _nulls_after(descending):
+                later |= Q(**{f'{name}__isnull': True})
+            condition |= equal & later
+            equal &= Q(**{name: value})
+
+    # İlk alan için ek (gereksiz görünen) sınır: veritabanı indeks üzerinde
+    # doğrudan aralık taramasına başlayabilsin, OR koşulu tüm satırları gezmesin.
+    # Sonraki satırlar arasında NULL olabiliyorsa sınır eklenmez.
+    first_name, first_descending = _split(ordering)[0]
+    if values[0] is None or _nulls_after(first_descending):
+        return condition
+    return Q(**{f"{first_name}__{'lte' if first_descending else 'gte'}": values[0]}) & condition
+
+
+def _reverse(ordering):
+    return [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+
+def keyset_paginate(queryset, ordering, token=None, page_size=50):
+    """
+    queryset'i ordering'e göre sayfalar. ordering benzersiz olmalıdır
+    (son alan olarak birincil anahtar eklenmelidir).
+    """
+    ordering = list(ordering)
+    cursor = decode_cursor(token, queryset.model, ordering) if token else None
+
+    if cursor is None:
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_next, has_previous = len(rows) > page_size, False
+        rows = rows[:page_size]
+    elif cursor[0] == 'next':
+        rows = list(queryset.filter(_after(ordering, cursor[1])).order_by(*ordering)[:page_size + 1])
+        has_next, has_previous = len(rows) > page_size, True
+        rows = rows[:page_size]
+    else:
+        reverse_ordering = _reverse(ordering)
+        rows = list(
+            queryset.filter(_after(reverse_ordering, cursor[1])).order_by(*reverse_ordering)[:page_size + 1]
+        )
+        has_next, has_previous = True, len(rows) > page_size
+        rows = rows[:page_size][::-1]
+
+    return KeysetPage(
+        rows,
+        has_next=has_next and bool(rows),
+        has_previous=has_previous and bool(rows),
+        next_token=encode_cursor(rows[-1], ordering, 'next') if rows else None,
+        previous_token=encode_cursor(rows[0], ordering, 'prev') if rows else None,
+    )
+
+
+class KeysetPaginationMixin:
+    """
+    ListView için imleç tabanlı sayfalama. Şablonda 'keyset_page' kullanılır:
+    keyset_page.has_next / next_token, keyset_page.has_previous / previous_token
+    """
+    page_size = 50
+    cursor_param = 'cursor'
+    keyset_ordering = None
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def get_context_data(self, **kwargs):
+        page = keyset_paginate(
+            self.object_list,
+            self.get_keyset_ordering(),
+            token=self.request.GET.get(self.cursor_param),
+            page_size=self.page_size,
+        )
+        kwargs.setdefault('object_list', page.object_list)
+        kwargs['keyset_page'] = page
+        return super().get_context_data(**kwargs)
@@ -0,0 +1,183 @@
+# policy_management/profiling.py
+
+import itertools
+import random
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+# -----------------------------------------------------
+# İstek Profili (SQL + Süre) Middleware'i
+# -----------------------------------------------------
+# Açıkken isteklerin REQUEST_PROFILER_SAMPLE_RATE kadarı ölçülür:
+# - sorgu sayısı, toplam veritabanı süresi, en yavaş sorgular
+# - aynı SQL'in tekrar tekrar çalışması (N+1) ve birebir aynı sorgular
+# - görünüm ve şablon süresi (TemplateResponse döndüren görünümlerde ayrı ayrı;
+#   render() kullanan fonksiyon görünümlerinde şablon süresi görünüm süresine dahildir)
+# Toplam süresi REQUEST_PROFILER_SLOW_MS'i aşan istekler RequestProfile tablosuna yazılır.
+# Tablo REQUEST_PROFILER_MAX_ROWS kayıtla sınırlıdır; fazlası her istekte değil,
+# süreç başına REQUEST_PROFILER_PRUNE_EVERY kayıtta bir silinir (yavaş isteği daha
+# da yavaşlatmamak için). Sınır bu yüzden en fazla o kadar aşılabilir.
+# Kapalıyken veya istek örneklenmediğinde tek bir ayar okuması dışında ek iş yapılmaz.
+
+DEFAULTS = {
+    'REQUEST_PROFILER_ENABLED': False,
+    'REQUEST_PROFILER_SAMPLE_RATE': 0.1,
+    'REQUEST_PROFILER_SLOW_MS': 500,
+    'REQUEST_PROFILER_TOP_QUERIES': 5,
+    'REQUEST_PROFILER_REPEAT_THRESHOLD': 3,  # Aynı SQL bu kadar çalışırsa tekrarlanan sayılır
+    'REQUEST_PROFILER_MAX_ROWS': 5000,
+    'REQUEST_PROFILER_PRUNE_EVERY': 100,  # Her N kayıtta bir eski kayıtlar silinir
+}
+
+# Bu süreçte yazılan profil sayısı (itertools.count GIL altında iş parçacığı güvenlidir)
+_saved_profiles = itertools.count(1)
+
+
+def _setting(name):
+    return getattr(settings, name, DEFAULTS[name])
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+class ProfileCollector:
+    """Tek bir isteğin ölçümleri (bellekte)."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []  # (sql, params, süre)
+        self.view_started = None
+        self.view_finished = None
+        self.render_finished = None
+        self.queries_before_render = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper kancası: her SQL çalıştırması buradan geçer
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, params, time.perf_counter() - started))
+
+    def summarize(self):
+        top = _setting('REQUEST_PROFILER_TOP_QUERIES')
+        finished = time.perf_counter()
+
+        by_sql = defaultdict(lambda: {'count': 0, 'seconds': 0.0, 'params': defaultdict(int)})
+        for sql, params, seconds in self.queries:
+            entry = by_sql[sql]
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['params'][repr(params)] += 1
+
+        repeated = [
+            {
+                'sql': sql[:1000],
+                'count': entry['count'],
+                'total_ms': _ms(entry['seconds']),
+                # Aynı parametrelerle tekrar: sonucu zaten elde olan sorgu
+                'exact_duplicates': sum(n - 1 for n in entry['params'].values()),
+            }
+            for sql, entry in by_sql.items()
+            if entry['count'] >= _setting('REQUEST_PROFILER_REPEAT_THRESHOLD')
+        ]
+        repeated.sort(key=lambda item: item['count'], reverse=True)
+
+        slowest = sorted(self.queries, key=lambda query: query[2], reverse=True)[:top]
+
+        view_ms = template_ms = None
+        if self.view_started is not None:
+            view_ms = _ms((self.view_finished or finished) - self.view_started)
+        if self.render_finished is not None:
+            template_ms = _ms(self.render_finished - self.view_finished)
+
+        template_queries = 0
+        if self.queries_before_render is not None:
+            template_queries = len(self.queries) - self.queries_before_render
+
+        return {
+            'total_ms': _ms(finished - self.started),
+            'view_ms': view_ms,
+            'template_ms': template_ms,
+            'db_ms': _ms(sum(seconds for _, _, seconds in self.queries)),
+            'query_count': len(self.queries),
+            'template_query_count': template_queries,
+            'duplicate_query_count': sum(
+                n - 1 for entry in by_sql.values() for n in entry['params'].values()
+            ),
+            'slowest_queries': [
+                {'sql': sql[:1000], 'params': repr(params)[:200], 'ms': _ms(seconds)}
+                for sql, params, seconds in slowest
+            ],
+            'repeated_queries': repeated[:top],
+        }
+
+
+class RequestProfilerMiddleware:
+    """settings.MIDDLEWARE listesinin başına eklenir (oturum/kimlik sorguları da ölçülsün)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _setting('REQUEST_PROFILER_ENABLED') or random.random() >= _setting('REQUEST_PROFILER_SAMPLE_RATE'):
+            return self.get_response(request)
+
+        profile = ProfileCollector()
+        request._request_profile = profile
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profile))
+            response = self.get_response(request)
+
+        summary = profile.summarize()
+        if summary['total_ms'] >= _setting('REQUEST_PROFILER_SLOW_MS'):
+            save_profile(request, response, summary)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        profile = getattr(request, '_request_profile', None)
+        if profile is not None:
+            profile.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        profile = getattr(request, '_request_profile', None)
+        if profile is not None:
+            # Görünüm bitti, şablon henüz işlenmedi
+            profile.view_finished = time.perf_counter()
+            profile.queries_before_render = len(profile.queries)
+            response.add_post_render_callback(lambda r: setattr(profile, 'render_finished', time.perf_counter()))
+        return response
+
+
+def save_profile(request, response, summary):
+    # Geç içe aktarım: middleware modeller yüklenmeden önce içe aktarılabilir
+    from .models import RequestProfile
+
+    match = getattr(request, 'resolver_match', None)
+    user = getattr(request, 'user', None)
+    RequestProfile.objects.create(
+        method=request.method,
+        path=request.get_full_path()[:500],
+        view_name=(match.view_name or '')[:200] if match else '',
+        status_code=response.status_code,
+        user_id=user.pk if user is not None and user.is_authenticated else None,
+        **summary,
+    )
+    if next(_saved_profiles) % max(_setting('REQUEST_PROFILER_PRUNE_EVERY'), 1) == 0:
+        prune_profiles()
+
+
+def prune_profiles():
+    """En yeni REQUEST_PROFILER_MAX_ROWS kayıt dışındakileri siler (döner kayıt)."""
+    from .models import RequestProfile
+
+    max_rows = _setting('REQUEST_PROFILER_MAX_ROWS')
+    cutoff = list(RequestProfile.objects.order_by('-id').values_list('id', flat=True)[max_rows:max_rows + 1])
+    if cutoff:
+        RequestProfile.objects.filter(id__lte=cutoff[0]).delete()
@@ -0,0 +1,44 @@
+# policy_management/query_budget.py
+
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+# -----------------------------------------------------
+# Sorgu Bütçesi (N+1 koruması)
+# -----------------------------------------------------
+# Testlerde kullanılır: bir blok içinde çalışan SQL sorgusu sayısı bütçeyi
+# aşarsa test, çalışan sorguların listesiyle birlikte başarısız olur.
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget(max_queries, using=connection):
+    """
+    Kullanım:
+        with query_budget(8):
+            client.get('/agent/policies/')
+    """
+    with CaptureQueriesContext(using) as context:
+        yield context
+
+    executed = len(context.captured_queries)
+    if executed > max_queries:
+        queries = '\n'.join(
+            f"{i}. {query['sql']}" for i, query in enumerate(context.captured_queries, start=1)
+        )
+        raise QueryBudgetExceeded(
+            f"Sorgu bütçesi aşıldı: {executed} sorgu çalıştı, izin verilen {max_queries}.\n{queries}"
+        )
+
+
+class QueryBudgetMixin:
+    """TestCase karması: self.assertQueryBudget(n, self.client.get, url)"""
+
+    def assertQueryBudget(self, max_queries, func, *args, **kwargs):
+        with query_budget(max_queries):
+            return func(*args, **kwargs)
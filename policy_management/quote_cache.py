@@ -0,0 +1,82 @@
+# policy_management/quote_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+# Varsayılan önbellek ayarları (saniye). settings.py üzerinden değiştirilebilir.
+DEFAULT_TTL = 300          # Teklif bu süre boyunca "taze" sayılır
+DEFAULT_STALE_TTL = 900    # Süresi dolduktan sonra, arka planda yenilenirken bu kadar daha kullanılabilir
+DEFAULT_MAX_ENTRIES = 2048
+
+# Fiyatı etkileyen müşteri alanları. Bunlardan biri değişirse önbellek kullanılmaz.
+CUSTOMER_KEY_FIELDS = ('customer_id', 'tckn', 'customer_type', 'date_of_birth', 'address_city')
+
+
+def make_key(customer_data, policy_type, carrier_code):
+    return (
+        carrier_code,
+        policy_type,
+        tuple(customer_data.get(field) for field in CUSTOMER_KEY_FIELDS),
+    )
+
+
+def get_ttl(carrier_code):
+    """Şirkete özel taze kalma süresini döndürür (QUOTE_CACHE_TTLS)."""
+    ttls = getattr(settings, 'QUOTE_CACHE_TTLS', {})
+    return ttls.get(carrier_code, getattr(settings, 'QUOTE_CACHE_DEFAULT_TTL', DEFAULT_TTL))
+
+
+class QuoteCache:
+    """
+    Süreç içi, LRU tahliyeli teklif önbelleği.
+
+    get() bir (sonuç, durum) çifti döndürür. Durum 'fresh' (süresi dolmamış),
+    'stale' (süresi dolmuş ama yedek olarak kullanılabilir) veya None'dır.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.monotonic()
+        stale_ttl = getattr(settings, 'QUOTE_CACHE_STALE_TTL', DEFAULT_STALE_TTL)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+
+            expires_at, result = entry
+            if now > expires_at + stale_ttl:
+                del self._entries[key]
+                return None, None
+
+            self._entries.move_to_end(key)
+            state = 'fresh' if now <= expires_at else 'stale'
+            return dict(result), state
+
+    def set(self, key, result, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, dict(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+quote_cache = QuoteCache(max_entries=getattr(settings, 'QUOTE_CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+
+
+def is_enabled():
+    return getattr(settings, 'QUOTE_CACHE_ENABLED', True)
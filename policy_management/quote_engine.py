@@ -0,0 +1,367 @@
+# policy_management/quote_engine.py
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from functools import partial
+
+from django.conf import settings
+
+# Yerel API Bağlayıcıları (Simülasyonlar)
+from .api_connectors import allianz, doga, turkiye
+from . import quote_cache as cache
+from . import carrier_health as health
+from . import carrier_metrics as metrics
+
+
+# -----------------------------------------------------
+# Sigorta Şirketi Bağlayıcıları
+# -----------------------------------------------------
+API_CONNECTORS = {
+    'allianz': allianz.get_quote,
+    'doga': doga.get_quote,
+    'turkiye': turkiye.get_quote,
+}
+
+# Gerçek API'ler için asenkron (bağlantı havuzlu) bağlayıcılar
+ASYNC_API_CONNECTORS = {
+    'allianz': allianz.aget_quote,
+    'doga': doga.aget_quote,
+    'turkiye': turkiye.aget_quote,
+}
+
+CARRIER_NAMES = {
+    'allianz': allianz.COMPANY_NAME,
+    'doga': doga.COMPANY_NAME,
+    'turkiye': turkiye.COMPANY_NAME,
+}
+
+# Varsayılan süre sınırları (saniye). settings.py üzerinden değiştirilebilir.
+DEFAULT_CARRIER_TIMEOUT = 5.0
+DEFAULT_OVERALL_TIMEOUT = 8.0
+
+# Tüm istekler tek bir havuzu paylaşır. Böylece süresi dolan bir şirketin
+# iş parçacığı arka planda bitmeye devam ederken isteği bekletmez.
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'QUOTE_ENGINE_MAX_WORKERS', 16),
+    thread_name_prefix='quote-engine',
+)
+
+
+def get_carrier_timeout(carrier_code):
+    """Şirkete özel süre sınırını döndürür (QUOTE_CARRIER_TIMEOUTS)."""
+    timeouts = getattr(settings, 'QUOTE_CARRIER_TIMEOUTS', {})
+    default = getattr(settings, 'QUOTE_DEFAULT_CARRIER_TIMEOUT', DEFAULT_CARRIER_TIMEOUT)
+    return timeouts.get(carrier_code, default)
+
+
+def get_effective_timeout(carrier_code):
+    """Gözlenen p95 süresine göre uyarlanmış süre sınırı (yapılandırılan sınırı aşmaz)."""
+    configured = get_carrier_timeout(carrier_code)
+    if not health.is_enabled():
+        return configured
+    return health.carrier_health.get(carrier_code).get_timeout(configured)
+
+
+def _allow_request(carrier_code):
+    return not health.is_enabled() or health.carrier_health.get(carrier_code).allow_request()
+
+
+def _record_outcome(carrier_code, policy_type, result, request_bytes):
+    """Çağrı sonucunu devre kesiciye ve metriklere işler."""
+    if health.is_enabled():
+        health.carrier_health.get(carrier_code).record(
+            result['elapsed'], result['status'] == 'success', timed_out=result['status'] == 'timeout',
+        )
+    metrics.record_call(carrier_code, policy_type, result, request_bytes)
+
+
+def _circuit_open_result(carrier_code):
+    return {
+        'price': None,
+        'status': 'circuit_open',
+        'message': "Şirket geçici olarak devre dışı (art arda hata/zaman aşımı)",
+        'elapsed': 0.0,
+    }
+
+
+def build_customer_data(customer):
+    """Bağlayıcılara gönderilecek müşteri bilgilerini sözlük olarak hazırlar."""
+    return {
+        'customer_id': customer.pk,
+        'name': customer.name,
+        'tckn': customer.tckn,
+        'customer_type': customer.customer_type,
+        'date_of_birth': customer.date_of_birth.isoformat() if customer.date_of_birth else None,
+        'address_city': customer.address_city,
+    }
+
+
+def _timeout_result(timeout, elapsed):
+    return {
+        'price': None,
+        'status': 'timeout',
+        'message': f"Zaman aşımı ({timeout} sn)",
+        'elapsed': round(elapsed, 3),
+    }
+
+
+def _call_connector(connector, customer_data, policy_type):
+    """Bağlayıcıyı çağırır, hataları sonuç sözlüğüne çevirir."""
+    started = time.monotonic()
+    try:
+        result = connector(customer_data, policy_type)
+    except Exception as e:
+        result = {'price': None, 'status': 'error', 'message': f"API Bağlantı Hatası: {e}"}
+    result['elapsed'] = round(time.monotonic() - started, 3)
+    return result
+
+
+def _store_in_cache(key, carrier_code, future):
+    """Başarılı sonucu önbelleğe yazar. Süre sınırını kaçıran çağrılar da bittiğinde önbelleği tazeler."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    result = future.result()
+    if result.get('status') == 'success' and result.get('price') is not None:
+        cache.quote_cache.set(key, result, cache.get_ttl(carrier_code))
+
+
+def _stale_result(stale_result):
+    """Süresi dolmuş önbellek kaydını 'güncel değil' işaretiyle döndürür (şirket beklenmez)."""
+    stale_result.update({
+        'cached': True,
+        'stale': True,
+        'message': "Güncel olmayan fiyat (önbellekten); şirket arka planda yeniden sorgulanıyor.",
+        'elapsed': 0.0,
+    })
+    return stale_result
+
+
+# Arka planda yenilenen önbellek anahtarları: aynı kayıt için tek yenileme çalışır
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _refresh_in_background(key, code, call):
+    """
+    Süresi dolmuş kaydı yenilemek için şirketi isteği bekletmeden arka planda çağırır.
+    call() sonuç sözlüğü döndürür (devre kesici kontrolü call() içindedir);
+    başarılı sonuç önbelleğe yazılır. Yenileme başlatıldıysa Future döndürür.
+    """
+    with _refreshing_lock:
+        if key in _refreshing:
+            return None
+        _refreshing.add(key)
+
+    def run():
+        try:
+            result = call()
+            if result.get('status') == 'success' and result.get('price') is not None:
+                cache.quote_cache.set(key, result, cache.get_ttl(code))
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
+
+    return _executor.submit(run)
+
+
+def mark_best_offer(offers):
+    """
+    En düşük fiyatlı başarılı teklifi 'is_best' ile işaretler (diğerlerinin işareti kaldırılır).
+    Güncel olmayan (stale) fiyatlar en iyi teklif seçilmez.
+    """
+    for offer in offers:
+        offer['is_best'] = False
+    successful_offers = [
+        o for o in offers if o['status'] == 'success' and o.get('price') is not None and not o.get('stale')
+    ]
+    if successful_offers:
+        min(successful_offers, key=lambda o: o['price'])['is_best'] = True
+    return offers
+
+
+def fetch_all_quotes(customer_data, policy_type, connectors=None, overall_timeout=None, on_result=None):
+    """
+    Tüm sigorta şirketlerini aynı anda çağırır.
+
+    Her şirket kendi süre sınırına (QUOTE_CARRIER_TIMEOUTS), tüm istek ise
+    QUOTE_OVERALL_TIMEOUT sınırına tabidir. Süresinde yanıt vermeyen şirketler
+    'timeout' durumuyla döner; diğer sonuçlar beklenmeden kullanılabilir.
+    Dönüş sırası, connectors sözlüğündeki sıradır.
+
+    Süre sınırı, şirketin gözlenen p95 süresine göre daraltılabilir; art arda
+    hata veren şirketin devresi açılır ve çağrılmadan 'circuit_open' döner.
+
+    Taze önbellek kaydı olan şirketler hiç çağrılmaz ('cached'). Süresi dolmuş
+    kayıt varsa eski fiyat beklenmeden 'stale' olarak döner ve şirket arka planda
+    yeniden sorgulanır (sonraki istek taze fiyatı önbellekten alır).
+
+    on_result verilirse, her şirketin sonucu belli olduğu anda on_result(teklif)
+    çağrılır (arka plan işleri ve canlı akış için). 'is_best' en sonda belirlenir.
+    """
+    if connectors is None:
+        connectors = API_CONNECTORS
+    if overall_timeout is None:
+        overall_timeout = getattr(settings, 'QUOTE_OVERALL_TIMEOUT', DEFAULT_OVERALL_TIMEOUT)
+
+    use_cache = cache.is_enabled()
+    request_bytes = metrics.payload_size({'customer': customer_data, 'policy_type': policy_type})
+    started = time.monotonic()
+    overall_deadline = started + overall_timeout
+
+    results = {}
+    futures = {}
+    timeouts = {}
+    deadlines = {}
+
+    def land(code, result):
+        offer = _prepare_offer(code, result)
+        results[code] = offer
+        if on_result is not None:
+            on_result(offer)
+
+    def background_call(code, connector):
+        if not _allow_request(code):
+            return _circuit_open_result(code)
+        result = _call_connector(connector, customer_data, policy_type)
+        _record_outcome(code, policy_type, result, request_bytes)
+        return result
+
+    for code, connector in connectors.items():
+        key = cache.make_key(customer_data, policy_type, code)
+        if use_cache:
+            cached, state = cache.quote_cache.get(key)
+            if state == 'fresh':
+                cached.update({'cached': True, 'elapsed': 0.0})
+                land(code, cached)
+                continue
+            if state == 'stale':
+                land(code, _stale_result(cached))
+                _refresh_in_background(key, code, partial(background_call, code, connector))
+                continue
+
+        # Devresi açık şirket hiç çağrılmaz (beklemeden hata döner)
+        if not _allow_request(code):
+            result = _circuit_open_result(code)
+            metrics.record_call(code, policy_type, result)
+            land(code, result)
+            continue
+
+        future = _executor.submit(_call_connector, connector, customer_data, policy_type)
+        if use_cache:
+            future.add_done_callback(partial(_store_in_cache, key, code))
+        futures[future] = code
+        # Genel sınır önce dolacaksa mesajda o süre raporlanır
+        timeouts[future] = min(get_effective_timeout(code), overall_timeout)
+        deadlines[future] = started + timeouts[future]
+
+    pending = set(futures)
+    while pending:
+        now = time.monotonic()
+        # Süresi dolan şirketleri beklemeyi bırak (çağrı arka planda bitip önbelleği tazeler)
+        for future in [f for f in pending if deadlines[f] <= now]:
+            pending.discard(future)
+            result = _timeout_result(timeouts[future], now - started)
+            _record_outcome(futures[future], policy_type, result, request_bytes)
+            land(futures[future], result)
+        if not pending:
+            break
+
+        next_deadline = min(deadlines[f] for f in pending)
+        done, pending = wait(pending, timeout=max(next_deadline - now, 0), return_when=FIRST_COMPLETED)
+        for future in done:
+            result = dict(future.result())
+            _record_outcome(futures[future], policy_type, result, request_bytes)
+            land(futures[future], result)
+
+    return _finalize_offers(connectors, results)
+
+
+def _prepare_offer(code, result):
+    """Sonuca şirket kodunu ekler ve eksik alanları doldurur."""
+    result['carrier'] = code
+    result.setdefault('company', CARRIER_NAMES.get(code, code))
+    result.setdefault('message', None)
+    result['is_best'] = False
+    return result
+
+
+def _finalize_offers(connectors, results):
+    """Sonuçları şirket sırasına dizer ve en iyi teklifi işaretler."""
+    offers = [_prepare_offer(code, results[code]) for code in connectors]
+    return mark_best_offer(offers)
+
+
+async def gather_quotes(customer_data, policy_type, connectors=None, overall_timeout=None, on_result=None):
+    """
+    fetch_all_quotes'un asenkron karşılığı: ASYNC_API_CONNECTORS içindeki
+    bağlayıcıları aynı olay döngüsünde birlikte bekler. Süre sınırları aynıdır.
+    """
+    if connectors is None:
+        connectors = ASYNC_API_CONNECTORS
+    if overall_timeout is None:
+        overall_timeout = getattr(settings, 'QUOTE_OVERALL_TIMEOUT', DEFAULT_OVERALL_TIMEOUT)
+
+    use_cache = cache.is_enabled()
+    request_bytes = metrics.payload_size({'customer': customer_data, 'policy_type': policy_type})
+
+    async def call(code, connector):
+        if not _allow_request(code):
+            result = _circuit_open_result(code)
+            metrics.record_call(code, policy_type, result)
+            return result
+
+        started = time.monotonic()
+        timeout = min(get_effective_timeout(code), overall_timeout)
+        try:
+            result = await asyncio.wait_for(connector(customer_data, policy_type), timeout=timeout)
+        except asyncio.TimeoutError:
+            result = _timeout_result(timeout, time.monotonic() - started)
+        except Exception as e:
+            result = {'price': None, 'status': 'error', 'message': f"API Bağlantı Hatası: {e}"}
+        result['elapsed'] = round(time.monotonic() - started, 3)
+        _record_outcome(code, policy_type, result, request_bytes)
+        return result
+
+    async def run(code, connector):
+        if not use_cache:
+            return await call(code, connector)
+
+        key = cache.make_key(customer_data, policy_type, code)
+        cached, state = cache.quote_cache.get(key)
+        if state == 'fresh':
+            cached.update({'cached': True, 'elapsed': 0.0})
+            return cached
+        if state == 'stale':
+            # Yenileme kendi olay döngüsünde çalışır: bu döngü gather bitince kapanır
+            _refresh_in_background(key, code, lambda: asyncio.run(call(code, connector)))
+            return _stale_result(cached)
+
+        result = await call(code, connector)
+        if result['status'] == 'success' and result.get('price') is not None:
+            cache.quote_cache.set(key, result, cache.get_ttl(code))
+        return result
+
+    async def land(code, connector):
+        offer = _prepare_offer(code, await run(code, connector))
+        if on_result is not None:
+            # on_result veritabanına yazabilir; ORM olay döngüsünde çalıştırılamaz
+            await asyncio.to_thread(on_result, offer)
+        return offer
+
+    codes = list(connectors)
+    results = await asyncio.gather(*(land(code, connectors[code]) for code in codes))
+    return _finalize_offers(connectors, dict(zip(codes, results)))
+
+
+def fetch_real_quotes(customer_data, policy_type, on_result=None):
+    """Senkron kod (view'lar) için gerçek API yolunu çalıştırır."""
+    return asyncio.run(gather_quotes(customer_data, policy_type, on_result=on_result))
+
+
+def get_quotes(customer_data, policy_type, on_result=None):
+    """QUOTE_USE_REAL_APIS ayarına göre gerçek API'leri veya simülasyonu kullanır."""
+    if getattr(settings, 'QUOTE_USE_REAL_APIS', False):
+        return fetch_real_quotes(customer_data, policy_type, on_result=on_result)
+    return fetch_all_quotes(customer_data, policy_type, API_CONNECTORS, on_result=on_result)
@@ -0,0 +1,83 @@
+# policy_management/quote_jobs.py
+
+import os
+import socket
+from datetime import timedelta
+
+from django.utils import timezone
+
+from . import carrier_metrics
+from .models import QuoteJob
+from .quote_engine import build_customer_data, get_quotes, mark_best_offer
+from .quote_persistence import save_offers
+
+# -----------------------------------------------------
+# Arka Plan Teklif İşleri (Veritabanı Kuyruğu)
+# -----------------------------------------------------
+# Web isteği enqueue_quote_job() ile işi yazar ve hemen döner.
+# run_quote_workers komutundaki işçiler claim_next_job() ile işi sahiplenir,
+# run_job() ile şirketleri çağırır. Sonuçlar geldikçe job.results güncellenir.
+
+# Tarayıcıya gönderilen teklif alanları
+PUBLIC_OFFER_FIELDS = ('carrier', 'company', 'price', 'status', 'message', 'is_best', 'cached', 'stale', 'elapsed')
+
+
+def public_offer(offer):
+    return {field: offer.get(field) for field in PUBLIC_OFFER_FIELDS}
+
+
+def enqueue_quote_job(agent, customer, policy_type):
+    return QuoteJob.objects.create(agent=agent, customer=customer, policy_type=policy_type)
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker):
+    """
+    Sıradaki işi sahiplenir. Koşullu UPDATE kullanılır: iki işçi aynı işi
+    seçse bile yalnızca biri 'pending' -> 'running' geçişini yapabilir.
+    """
+    while True:
+        job_id = QuoteJob.objects.filter(status='pending').order_by('id').values_list('id', flat=True).first()
+        if job_id is None:
+            return None
+        claimed = QuoteJob.objects.filter(pk=job_id, status='pending').update(
+            status='running', worker=worker, started_at=timezone.now()
+        )
+        if claimed:
+            return QuoteJob.objects.select_related('customer', 'agent').get(pk=job_id)
+
+
+def requeue_stale_jobs(older_than_seconds):
+    """Çöken işçilerden kalan 'running' işleri tekrar sıraya koyar."""
+    limit = timezone.now() - timedelta(seconds=older_than_seconds)
+    return QuoteJob.objects.filter(status='running', started_at__lt=limit).update(
+        status='pending', worker='', started_at=None
+    )
+
+
+def run_job(job):
+    landed = []
+
+    def on_result(offer):
+        # Her şirketin sonucu geldiği anda yazılır; durum sorgusu bunu hemen görür
+        landed.append(public_offer(offer))
+        mark_best_offer(landed)
+        QuoteJob.objects.filter(pk=job.pk).update(results=landed)
+
+    try:
+        offers = get_quotes(build_customer_data(job.customer), job.policy_type, on_result=on_result)
+        save_offers(offers, job.policy_type, job.agent, job.customer)
+        carrier_metrics.flush()
+    except Exception as e:
+        QuoteJob.objects.filter(pk=job.pk).update(
+            status='failed', error_message=str(e), finished_at=timezone.now()
+        )
+        return False
+
+    QuoteJob.objects.filter(pk=job.pk).update(
+        status='done', results=[public_offer(o) for o in offers], finished_at=timezone.now()
+    )
+    return True
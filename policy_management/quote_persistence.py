@@ -0,0 +1,74 @@
+# policy_management/quote_persistence.py
+
+from django.contrib import messages
+from django.db import transaction
+
+from . import best_offers
+from . import fragment_cache
+from .models import Quote
+
+
+def build_quotes(offers, policy_type, agent, customer):
+    """
+    Teklif sonuçlarından kaydedilecek Quote nesnelerini bellekte oluşturur.
+    Önbellekten gelen teklifler zaten kayıtlı olduğu için atlanır.
+    """
+    quotes = []
+    for result in offers:
+        if result.get('cached'):
+            continue
+
+        quote = Quote(
+            company_name=result['company'],
+            policy_type=policy_type,
+            issued_by_agent=agent,
+            customer=customer
+        )
+        if result['status'] == 'success' and result.get('price') is not None:
+            quote.premium_amount = result['price']
+        else:
+            quote.premium_amount = 0
+            quote.error_message = result.get('message') or 'Bilinmeyen API hatası'
+        quotes.append(quote)
+    return quotes
+
+
+def save_offers(offers, policy_type, agent, customer):
+    """Tüm teklifleri tek bir toplu INSERT ile kaydeder (yazma kilidi kısa süre tutulur)."""
+    quotes = build_quotes(offers, policy_type, agent, customer)
+    if quotes:
+        with transaction.atomic():
+            Quote.objects.bulk_create(quotes)
+            # bulk_create sinyal göndermez: en iyi teklif tablosu burada güncellenir
+            best_offers.record_quotes(quotes)
+        fragment_cache.invalidate(agent.pk if agent else None)
+    return quotes
+
+
+def summarize_offers(offers):
+    """İstek başına tek bir özet mesaj hazırlar. (seviye, metin) döndürür."""
+    successful = [o for o in offers if o['status'] == 'success' and o.get('price') is not None]
+    failed = [o for o in offers if o not in successful]
+
+    parts = []
+    if successful:
+        best = next((o for o in successful if o.get('is_best')), successful[0])
+        parts.append(
+            f"{len(successful)}/{len(offers)} şirketten teklif alındı. "
+            f"En iyi fiyat: {best['company']} {best['price']} TL."
+        )
+        stale = [o['company'] for o in successful if o.get('stale')]
+        cached = [o['company'] for o in successful if o.get('cached') and not o.get('stale')]
+        if cached:
+            parts.append(f"Önbellekten: {', '.join(cached)}.")
+        if stale:
+            parts.append(f"Güncel olmayan fiyat: {', '.join(stale)}.")
+    else:
+        parts.append("Hiçbir şirketten teklif alınamadı.")
+
+    if failed:
+        details = ', '.join(f"{o['company']} ({o.get('message') or 'Bilinmeyen Hata'})" for o in failed)
+        parts.append(f"Teklif vermeyen: {details}.")
+
+    level = messages.SUCCESS if successful and not failed else messages.WARNING
+    return level, ' '.join(parts)
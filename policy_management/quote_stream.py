@@ -0,0 +1,88 @@
+# policy_management/quote_stream.py
+
+import json
+import queue
+import threading
+
+from django.contrib import messages
+
+from . import carrier_metrics
+from .quote_engine import build_customer_data, get_quotes, mark_best_offer
+from .quote_jobs import public_offer
+from .quote_persistence import save_offers, summarize_offers
+
+# -----------------------------------------------------
+# Canlı Teklif Akışı (Server-Sent Events)
+# -----------------------------------------------------
+# Şirketler arka plan iş parçacığında çağrılır; her sonuç geldiği anda
+# 'offer' olayı olarak tarayıcıya gönderilir. Her olayda o ana kadar gelen
+# teklifler içindeki en iyi fiyat yeniden belirlenir ('best' alanı).
+# Tüm şirketler bitince teklifler kaydedilir ve 'done' olayı gönderilir.
+# Tarayıcı akış bitmeden ayrılırsa (üreteç kapatılır) o ana kadar gelen
+# teklifler yine kaydedilir: şirketlerden alınmış fiyatlar kaybolmaz.
+
+# Bu süre boyunca sonuç gelmezse bağlantının kapanmaması için yorum satırı gönderilir
+KEEPALIVE_INTERVAL = 15
+
+_FINISHED = object()
+
+
+def sse_event(event, data):
+    """Tek bir SSE çerçevesi üretir."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def stream_quote_events(agent, customer, policy_type):
+    """StreamingHttpResponse için olay üreteci."""
+    events = queue.Queue()
+    outcome = {}
+
+    def fetch():
+        try:
+            outcome['offers'] = get_quotes(build_customer_data(customer), policy_type, on_result=events.put)
+        except Exception as e:
+            outcome['error'] = str(e)
+        finally:
+            events.put(_FINISHED)
+
+    # Veritabanına dokunmaz: sonuçlar kuyruk üzerinden bu üretece taşınır
+    threading.Thread(target=fetch, name='quote-stream', daemon=True).start()
+
+    received = []
+    landed = []
+    saved = False
+    try:
+        while True:
+            try:
+                offer = events.get(timeout=KEEPALIVE_INTERVAL)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if offer is _FINISHED:
+                break
+
+            received.append(offer)
+            landed.append(public_offer(offer))
+            mark_best_offer(landed)
+            best = next((o['carrier'] for o in landed if o['is_best']), None)
+            yield sse_event('offer', {'offer': landed[-1], 'best': best})
+
+        if 'error' in outcome:
+            yield sse_event('failed', {'error': outcome['error']})
+            return
+
+        offers = outcome['offers']
+        saved = True
+        save_offers(offers, policy_type, agent, customer)
+        carrier_metrics.flush()
+        level, summary = summarize_offers(offers)
+        yield sse_event('done', {
+            'results': [public_offer(o) for o in offers],
+            'summary': summary,
+            'success': level == messages.SUCCESS,
+        })
+    finally:
+        # Bağlantı koptu veya akış hatayla bitti: gelmiş teklifler kaydedilir
+        if not saved and received:
+            save_offers(received, policy_type, agent, customer)
+            carrier_metrics.flush()
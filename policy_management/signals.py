@@ -0,0 +1,194 @@
+# policy_management/signals.py
+
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Customer, Policy, Quote
+from . import summaries
+from . import customer_search
+from . import analytics
+from . import best_offers
+from . import fragment_cache
+from .storage import release_document, retain_document
+
+# -----------------------------------------------------
+# Acente Özet Sayaçları (AgentSummary)
+# -----------------------------------------------------
+# Not: bulk_create / QuerySet.update sinyal göndermez. Bu yollarla yazan kod
+# summaries.rebuild_summaries() çağırmalıdır.
+
+
+def _policy_state(agent_id, status, premium_amount):
+    return (agent_id, status, premium_amount) if agent_id else None
+
+
+@receiver(pre_save, sender=Customer)
+def remember_customer_agent(sender, instance, raw=False, **kwargs):
+    instance._summary_old_agent_id = None
+    if instance.pk and not raw:
+        instance._summary_old_agent_id = (
+            Customer.objects.filter(pk=instance.pk).values_list('agent_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Customer)
+def update_summary_on_customer_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_agent_id = None if created else getattr(instance, '_summary_old_agent_id', None)
+    summaries.customer_changed(old_agent_id, instance.agent_id)
+
+
+@receiver(post_delete, sender=Customer)
+def update_summary_on_customer_delete(sender, instance, **kwargs):
+    summaries.customer_changed(instance.agent_id, None)
+
+
+@receiver(pre_save, sender=Policy)
+def remember_policy_state(sender, instance, raw=False, **kwargs):
+    instance._summary_old_state = None
+    instance._old_document = ''
+    if instance.pk and not raw:
+        # Özet sayaçları ve döküman referansı için tek sorgu
+        old = Policy.objects.filter(pk=instance.pk).values_list(
+            'issued_by_agent_id', 'status', 'premium_amount', 'document'
+        ).first()
+        if old:
+            instance._summary_old_state = _policy_state(*old[:3])
+            instance._old_document = old[3] or ''
+
+
+@receiver(post_save, sender=Policy)
+def update_summary_on_policy_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = None if created else getattr(instance, '_summary_old_state', None)
+    new_state = _policy_state(instance.issued_by_agent_id, instance.status, instance.premium_amount)
+    summaries.policy_changed(old_state, new_state)
+
+
+@receiver(post_delete, sender=Policy)
+def update_summary_on_policy_delete(sender, instance, **kwargs):
+    summaries.policy_changed(
+        _policy_state(instance.issued_by_agent_id, instance.status, instance.premium_amount), None
+    )
+
+
+# -----------------------------------------------------
+# Müşteri Arama İndeksi (customer_search.py)
+# -----------------------------------------------------
+@receiver(post_save, sender=Customer)
+def update_search_index_on_customer_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        customer_search.index_customers([instance])
+
+
+@receiver(post_delete, sender=Customer)
+def update_search_index_on_customer_delete(sender, instance, **kwargs):
+    customer_search.remove_customers([instance.pk])
+
+
+# -----------------------------------------------------
+# Poliçe Dökümanı Referans Sayacı (storage.py)
+# -----------------------------------------------------
+# Not: bulk_create / QuerySet.update ile döküman yazan kod sayaçları kendisi güncellemelidir.
+@receiver(post_save, sender=Policy)
+def update_document_refs_on_policy_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_name = '' if created else getattr(instance, '_old_document', '')
+    new_name = instance.document.name or ''
+    if old_name != new_name:
+        retain_document(new_name)
+        release_document(old_name)
+
+
+@receiver(post_delete, sender=Policy)
+def update_document_refs_on_policy_delete(sender, instance, **kwargs):
+    release_document(instance.document.name or '')
+
+
+# -----------------------------------------------------
+# Prim Analizi Önbelleği (analytics.py)
+# -----------------------------------------------------
+@receiver(post_save, sender=Policy)
+def invalidate_analytics_on_policy_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = getattr(instance, '_summary_old_state', None)
+    analytics.invalidate(instance.issued_by_agent_id, old_state[0] if old_state else None)
+
+
+@receiver(post_delete, sender=Policy)
+def invalidate_analytics_on_policy_delete(sender, instance, **kwargs):
+    analytics.invalidate(instance.issued_by_agent_id)
+
+
+@receiver(post_save, sender=Customer)
+def invalidate_analytics_on_customer_save(sender, instance, raw=False, **kwargs):
+    # Şehir kırılımı müşteri adresinden gelir
+    if not raw:
+        analytics.invalidate(instance.agent_id, getattr(instance, '_summary_old_agent_id', None))
+
+
+# -----------------------------------------------------
+# En İyi Teklif Tablosu (best_offers.py)
+# -----------------------------------------------------
+# Not: Teklifler çoğunlukla bulk_create ile yazılır (quote_persistence.save_offers),
+# o yol best_offers.record_quotes() çağırır. Buradakiler tekil kayıtlar içindir.
+@receiver(post_save, sender=Quote)
+def update_best_offer_on_quote_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        best_offers.record_quotes([instance])
+    elif instance.customer_id and instance.issued_by_agent_id:
+        best_offers.refresh([(instance.issued_by_agent_id, instance.customer_id, instance.policy_type)])
+
+
+@receiver(post_delete, sender=Quote)
+def update_best_offer_on_quote_delete(sender, instance, **kwargs):
+    # Satır CASCADE ile silinmiş olabilir; grubun yeni en iyisi işlem sonunda, grup
+    # başına bir kez seçilir (müşteri silinince her teklif için ayrı sorgu çalışmaz)
+    if instance.customer_id and instance.issued_by_agent_id:
+        best_offers.refresh_on_commit([(instance.issued_by_agent_id, instance.customer_id, instance.policy_type)])
+
+
+# -----------------------------------------------------
+# Acente Sayfa Parçası Önbelleği (fragment_cache.py)
+# -----------------------------------------------------
+# Not: Toplu yazma yolları (imports.py, save_offers, policy_documents komutu)
+# fragment_cache.invalidate() çağırır.
+@receiver(post_save, sender=Customer)
+def invalidate_fragments_on_customer_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fragment_cache.invalidate(instance.agent_id, getattr(instance, '_summary_old_agent_id', None))
+
+
+@receiver(post_delete, sender=Customer)
+def invalidate_fragments_on_customer_delete(sender, instance, **kwargs):
+    fragment_cache.invalidate(instance.agent_id)
+
+
+@receiver(post_save, sender=Policy)
+def invalidate_fragments_on_policy_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    old_state = getattr(instance, '_summary_old_state', None)
+    fragment_cache.invalidate(instance.issued_by_agent_id, old_state[0] if old_state else None)
+
+
+@receiver(post_delete, sender=Policy)
+def invalidate_fragments_on_policy_delete(sender, instance, **kwargs):
+    fragment_cache.invalidate(instance.issued_by_agent_id)
+
+
+@receiver(post_save, sender=Quote)
+def invalidate_fragments_on_quote_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fragment_cache.invalidate(instance.issued_by_agent_id)
+
+
+@receiver(post_delete, sender=Quote)
+def invalidate_fragments_on_quote_delete(sender, instance, **kwargs):
+    fragment_cache.invalidate(instance.issued_by_agent_id)
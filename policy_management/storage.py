@@ -0,0 +1,150 @@
+# policy_management/storage.py
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# -----------------------------------------------------
+# İçerik Adresli Döküman Deposu
+# -----------------------------------------------------
+# Yüklenen dosya diske yazılırken SHA-256 özeti aynı geçişte hesaplanır ve dosya
+# özetten türetilen yola konur:  policies/blobs/ab/cd/abcd...ef.pdf
+# Aynı içerik ikinci kez yüklenirse diske yazılmaz, mevcut yol döndürülür.
+# Her dosyanın kaç poliçe tarafından kullanıldığı DocumentBlob.ref_count'ta tutulur
+# (signals.py). Sayaç 0'a düşünce dosya silinir (bir döküman analizi kaydı hâlâ
+# gösteriyorsa tutulur; eski analiz kayıtlarını 'policy_documents --gc' siler);
+# storage.delete() paylaşılan dosyaları doğrudan silmez.
+# Yükleme (_save) ile silme (release_document) aynı DocumentBlob satırını kilitleyerek
+# sıraya girer: silme, sayacı kilit altında yeniden okur; yükleme, kilit altında
+# dosya yoksa yeniden yazar. Yüklenen dosyanın sayacı post_save sinyalinde artar;
+# bu yüzden dosya yükleyen kaydetme tek bir transaction içinde yapılmalıdır
+# (kilit sayaç artana kadar tutulur).
+
+BLOB_PREFIX = 'policies/blobs/'
+CHUNK_SIZE = 64 * 1024
+
+
+def blob_name(sha256, original_name):
+    extension = os.path.splitext(original_name)[1].lower()
+    return f"{BLOB_PREFIX}{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}"
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(BLOB_PREFIX)
+
+
+def _lock_blob(name, sha256, size):
+    """
+    Dosyanın kaydını kilitler, yoksa oluşturur. Kilit içinde bulunulan işlem bitene
+    kadar tutulur. select_for_update yerine UPDATE kullanılır: SQLite'ta da yazma
+    kilidini hemen alır (aynı içerik için boyut zaten aynıdır).
+    """
+    from .models import DocumentBlob
+
+    if DocumentBlob.objects.filter(name=name).update(size=size):
+        return
+    try:
+        with transaction.atomic():
+            DocumentBlob.objects.create(name=name, sha256=sha256, size=size)
+    except IntegrityError:
+        # Başka bir işlem aynı anda oluşturdu
+        DocumentBlob.objects.filter(name=name).update(size=size)
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        # Yol içerikten belirlenir (_save); rastgele sonek eklemeye gerek yok
+        return name
+
+    def _save(self, name, content):
+        directory = self.path(BLOB_PREFIX)
+        os.makedirs(directory, exist_ok=True)
+
+        # Tek geçiş: parçalar geçici dosyaya yazılırken özet hesaplanır
+        digest = hashlib.sha256()
+        size = 0
+        if hasattr(content, 'seek') and content.seekable():
+            content.seek(0)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks(CHUNK_SIZE):
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+
+            final_name = blob_name(digest.hexdigest(), name)
+            final_path = self.path(final_name)
+            with transaction.atomic():
+                # Kilit altında: eşzamanlı release_document dosyayı silmiş olabilir
+                _lock_blob(final_name, digest.hexdigest(), size)
+                if os.path.exists(final_path):
+                    os.remove(temp_path)  # Aynı içerik zaten var: ikinci kopya tutulmaz
+                else:
+                    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                    os.replace(temp_path, final_path)
+                    if self.file_permissions_mode is not None:
+                        os.chmod(final_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return final_name
+
+    def delete(self, name):
+        # Paylaşılan dosyalar referans sayacıyla silinir (release_document)
+        if is_blob(name):
+            return
+        super().delete(name)
+
+    def delete_blob(self, name):
+        super().delete(name)
+
+
+_document_storage = ContentAddressedStorage()
+
+
+def document_storage():
+    """Policy.document alanının deposu (göçlerde çağrılabilir olarak saklanır)."""
+    return _document_storage
+
+
+# -----------------------------------------------------
+# Referans Sayacı (signals.py tarafından çağrılır)
+# -----------------------------------------------------
+def retain_document(name):
+    from .models import DocumentBlob
+
+    if is_blob(name):
+        DocumentBlob.objects.filter(name=name).update(ref_count=F('ref_count') + 1)
+
+
+def used_by_extraction(name):
+    """Dosyayı bir döküman analizi kaydı (DocumentExtraction.document) kullanıyor mu?"""
+    from .models import DocumentExtraction
+
+    return DocumentExtraction.objects.filter(document=name).exists()
+
+
+def release_document(name):
+    """
+    Sayaç 0'a düşerse dosyayı ve kaydını siler (satır kilitliyken; bkz. _save).
+    Analiz kaydının kullandığı dosya sayaç 0 iken de tutulur.
+    """
+    from .models import DocumentBlob
+
+    if not is_blob(name):
+        return
+    with transaction.atomic():
+        # UPDATE satırı kilitler; sayaç kilit altında yeniden okunur
+        if not DocumentBlob.objects.filter(name=name).update(ref_count=F('ref_count') - 1):
+            return
+        ref_count = DocumentBlob.objects.filter(name=name).values_list('ref_count', flat=True).get()
+        if ref_count <= 0 and not used_by_extraction(name):
+            _document_storage.delete_blob(name)
+            DocumentBlob.objects.filter(name=name).delete()
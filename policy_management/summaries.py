@@ -0,0 +1,125 @@
+# policy_management/summaries.py
+
+from decimal import Decimal
+
+from django.db.models import Count, F, Q, Sum
+
+from .models import AgentSummary, CustomUser, Customer, Policy
+
+STATUS_COUNT_FIELDS = {
+    'active': 'active_count',
+    'expired': 'expired_count',
+    'cancelled': 'cancelled_count',
+}
+
+
+# -----------------------------------------------------
+# Baştan Hesaplama (rebuild)
+# -----------------------------------------------------
+def compute_summaries(agent_ids=None):
+    """Sayaçları gruplanmış sorgularla baştan hesaplar. {agent_id: {alan: değer}} döndürür."""
+    customers = Customer.objects.filter(agent__isnull=False)
+    policies = Policy.objects.filter(issued_by_agent__isnull=False)
+    if agent_ids is not None:
+        customers = customers.filter(agent_id__in=agent_ids)
+        policies = policies.filter(issued_by_agent_id__in=agent_ids)
+    else:
+        agent_ids = CustomUser.objects.values_list('id', flat=True)
+
+    summaries = {
+        agent_id: {
+            'customer_count': 0, 'policy_count': 0, 'active_count': 0,
+            'expired_count': 0, 'cancelled_count': 0, 'total_premium': Decimal('0'),
+        }
+        for agent_id in agent_ids
+    }
+
+    for row in customers.values('agent_id').annotate(total=Count('pk')).order_by():
+        summaries[row['agent_id']]['customer_count'] = row['total']
+
+    policy_rows = policies.values('issued_by_agent_id').annotate(
+        total=Count('pk'),
+        premium=Sum('premium_amount'),
+        **{field: Count('pk', filter=Q(status=status)) for status, field in STATUS_COUNT_FIELDS.items()}
+    ).order_by()
+    for row in policy_rows:
+        summary = summaries[row['issued_by_agent_id']]
+        summary['policy_count'] = row['total']
+        summary['total_premium'] = row['premium'] or Decimal('0')
+        for field in STATUS_COUNT_FIELDS.values():
+            summary[field] = row[field]
+
+    return summaries
+
+
+def rebuild_summaries(agent_ids=None):
+    """Özet satırlarını tek bir toplu upsert ile yeniden yazar. Güncellenen acente sayısını döndürür."""
+    summaries = compute_summaries(agent_ids)
+    fields = ['customer_count', 'policy_count', 'active_count', 'expired_count', 'cancelled_count', 'total_premium']
+    AgentSummary.objects.bulk_create(
+        [AgentSummary(agent_id=agent_id, **values) for agent_id, values in summaries.items()],
+        update_conflicts=True,
+        unique_fields=['agent'],
+        update_fields=fields + ['updated_at'],
+    )
+    return len(summaries)
+
+
+def get_summary(agent):
+    """Acentenin özet satırını döndürür; yoksa oluşturur."""
+    summary = AgentSummary.objects.filter(agent=agent).first()
+    if summary is None:
+        rebuild_summaries([agent.pk])
+        summary = AgentSummary.objects.get(agent=agent)
+    return summary
+
+
+# -----------------------------------------------------
+# Artımlı Güncelleme (signals.py tarafından çağrılır)
+# -----------------------------------------------------
+def _apply(agent_id, changes):
+    """Sayaçları F() ifadeleriyle günceller. Özet satırı yoksa acente baştan hesaplanır."""
+    if agent_id is None or not changes:
+        return
+    updated = AgentSummary.objects.filter(agent_id=agent_id).update(
+        **{field: F(field) + delta for field, delta in changes.items()}
+    )
+    if not updated:
+        rebuild_summaries([agent_id])
+
+
+def customer_changed(old_agent_id, new_agent_id):
+    """Müşteri eklendi (old=None), silindi (new=None) veya acentesi değişti."""
+    if old_agent_id == new_agent_id:
+        return
+    _apply(old_agent_id, {'customer_count': -1})
+    _apply(new_agent_id, {'customer_count': 1})
+
+
+def _policy_changes(state, sign):
+    agent_id, status, premium_amount = state
+    changes = {'policy_count': sign, 'total_premium': Decimal(premium_amount or 0) * sign}
+    if status in STATUS_COUNT_FIELDS:
+        changes[STATUS_COUNT_FIELDS[status]] = sign
+    return agent_id, changes
+
+
+def policy_changed(old_state, new_state):
+    """
+    Poliçe eklendi, silindi veya güncellendi. Durumlar (agent_id, status, premium_amount)
+    üçlüsüdür ya da None'dır. Eski katkı çıkarılır, yenisi eklenir; acente başına tek UPDATE.
+    """
+    if old_state == new_state:
+        return
+
+    per_agent = {}
+    for state, sign in ((old_state, -1), (new_state, 1)):
+        if state is None:
+            continue
+        agent_id, changes = _policy_changes(state, sign)
+        merged = per_agent.setdefault(agent_id, {})
+        for field, delta in changes.items():
+            merged[field] = merged.get(field, 0) + delta
+
+    for agent_id, changes in per_agent.items():
+        _apply(agent_id, {field: delta for field, delta in changes.items() if delta})
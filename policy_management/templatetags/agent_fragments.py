@@ -0,0 +1,37 @@
+# policy_management/templatetags/agent_fragments.py
+
+from django import template
+
+from policy_management.fragment_cache import CSRF_PLACEHOLDER, set_fragment
+
+register = template.Library()
+
+
+class AgentFragmentNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        html = context.get('cached_fragment')
+        if html is None:
+            key = context.get('fragment_key')
+            if not key:
+                return self.nodelist.render(context)
+            # Oturuma özel CSRF değeri önbelleğe girmesin
+            with context.push(csrf_token=CSRF_PLACEHOLDER):
+                html = self.nodelist.render(context)
+            set_fragment(key, html)
+        if CSRF_PLACEHOLDER in html:
+            html = html.replace(CSRF_PLACEHOLDER, str(context.get('csrf_token') or ''))
+        return html
+
+
+@register.tag
+def agent_fragment(parser, token):
+    """
+    {% agent_fragment %}...{% endagent_fragment %}
+    Bloğu görünümün verdiği 'fragment_key' ile önbelleğe alır (bkz. fragment_cache.py).
+    """
+    nodelist = parser.parse(('endagent_fragment',))
+    parser.delete_first_token()
+    return AgentFragmentNode(nodelist)
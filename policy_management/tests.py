@@ -1,3 +1,1186 @@
-from django.test import TestCase
+import asyncio
+import importlib
+import io
+import itertools
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, override_settings
+from django.utils import timezone
+
+from . import analytics, best_offers, carrier_metrics, customer_search, imports, profiling, quote_engine, quote_stream
+from .api_connectors import allianz, base, stub_server
+from .carrier_health import CarrierHealth
+from .exports import stream_resource_csv
+from .management.commands import run_quote_workers
+from .models import (
+    AgentSummary, BestOffer, CarrierMetric, CustomUser, Customer, DocumentBlob, DocumentExtraction,
+    ExpiryNotification, Policy, Quote, QuoteJob, RequestProfile,
+)
+from .pagination import keyset_paginate
+from .query_budget import QueryBudgetMixin
+from .resources import CustomerResource, PolicyResource
+from .quote_cache import make_key, quote_cache
+from .storage import document_storage
+from .summaries import compute_summaries
+from .views import AgentCustomerListView, AgentPolicyListView, QuoteListView
+
+try:
+    import openpyxl
+except ImportError:  # İsteğe bağlı: yoksa XLSX testleri atlanır
+    openpyxl = None
+
+
+def xlsx_file(rows):
+    """Satırlardan (ilki başlık) bellekte bir .xlsx dosyası üretir; hücre tipleri korunur."""
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    file = io.BytesIO()
+    workbook.save(file)
+    file.seek(0)
+    return file
+
+
+# -----------------------------------------------------
+# İndeks Kullanımı (Sorgu Planı)
+# -----------------------------------------------------
+@skipUnless(connection.vendor == 'sqlite', 'Sorgu planı metni SQLite EXPLAIN QUERY PLAN çıktısına göre yazıldı.')
+class AgentQueryIndexTests(TestCase):
+    """Acente sayfalarının sorgularının bileşik indeksleri kullandığını sorgu planı üzerinden doğrular."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=cls.agent)
+        Policy.objects.create(
+            policy_number='POL-1', policy_type='Kasko', customer=cls.customer,
+            start_date=date.today(), end_date=date.today() + timedelta(days=3),
+            premium_amount=1000, issued_by_agent=cls.agent,
+        )
+        Quote.objects.create(
+            company_name='Doğa Sigorta', policy_type='Kasko', premium_amount=900,
+            issued_by_agent=cls.agent, customer=cls.customer,
+        )
+        # Planlayıcının istatistiklerle karar vermesi için
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def get_view_queryset(self, view_class, query=None):
+        view = view_class()
+        view.request = RequestFactory().get('/', query or {})
+        view.request.user = self.agent
+        view.kwargs = {}
+        return view.get_queryset()
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, msg=plan)
+        # Sıralama indeksten gelmeli, ayrıca geçici sıralama yapılmamalı
+        self.assertNotIn('USE TEMP B-TREE', plan, msg=plan)
+
+    def test_policy_list_uses_agent_index(self):
+        self.assertUsesIndex(self.get_view_queryset(AgentPolicyListView), 'policy_agent_id_idx')
+
+    def test_customer_list_uses_agent_index(self):
+        self.assertUsesIndex(self.get_view_queryset(AgentCustomerListView), 'customer_agent_id_idx')
+
+    def test_dashboard_expiring_policies_uses_active_end_index(self):
+        queryset = Policy.objects.filter(
+            issued_by_agent=self.agent,
+            end_date__lte=date.today() + timedelta(days=7),
+            end_date__gt=date.today(),
+            status='active'
+        ).order_by('end_date')[:5]
+        self.assertUsesIndex(queryset, 'policy_agent_active_end_idx')
+
+    def test_quote_list_uses_created_index(self):
+        self.assertUsesIndex(self.get_view_queryset(QuoteListView), 'quote_agent_created_idx')
+
+    def test_quote_list_filtered_uses_customer_type_index(self):
+        queryset = self.get_view_queryset(
+            QuoteListView, {'customer': self.customer.pk, 'policy_type': 'Kasko'}
+        )
+        self.assertUsesIndex(queryset, 'quote_agent_cust_type_idx')
+
+    def test_quote_list_type_filter_uses_type_index(self):
+        queryset = self.get_view_queryset(QuoteListView, {'policy_type': 'Kasko'})
+        self.assertUsesIndex(queryset, 'quote_agent_type_prem_idx')
+
+
+# -----------------------------------------------------
+# Sorgu Bütçesi (N+1 koruması)
+# -----------------------------------------------------
+class AgentViewQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Acente sayfalarının sorgu sayısı satır sayısından bağımsız ve sabit bir bütçe altında olmalı."""
+
+    # Oturum + kullanıcı sorguları dahil, sayfa başına izin verilen en fazla sorgu
+    MAX_QUERIES = 8
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        for i in range(30):
+            customer = Customer.objects.create(name=f'Müşteri {i}', agent=cls.agent)
+            Policy.objects.create(
+                policy_number=f'POL-{i}', policy_type='Kasko', customer=customer,
+                start_date=date.today(), end_date=date.today() + timedelta(days=3),
+                premium_amount=1000 + i, issued_by_agent=cls.agent,
+            )
+            Quote.objects.create(
+                company_name='Doğa Sigorta', policy_type='Kasko', premium_amount=900 + i,
+                issued_by_agent=cls.agent, customer=customer,
+            )
+        cls.customer = customer
+
+    def setUp(self):
+        self.client.force_login(self.agent)
+
+    def get_agent_urls(self):
+        quote = Quote.objects.filter(issued_by_agent=self.agent).first()
+        policy = Policy.objects.filter(issued_by_agent=self.agent).first()
+        return [
+            '/agent/',
+            '/agent/customers/',
+            '/agent/policies/',
+            '/agent/quotes/',
+            f'/agent/quotes/?customer={self.customer.pk}&policy_type=Kasko',
+            f'/quotes/{quote.pk}/',
+            f'/customers/edit/{self.customer.pk}/',
+            f'/agent/policy/edit/{policy.pk}/',
+        ]
+
+    def test_agent_views_stay_within_query_budget(self):
+        for url in self.get_agent_urls():
+            with self.subTest(url=url):
+                response = self.assertQueryBudget(self.MAX_QUERIES, self.client.get, url)
+                self.assertEqual(response.status_code, 200)
+
+
+# -----------------------------------------------------
+# Acente Sayfa Parçası Önbelleği
+# -----------------------------------------------------
+class AgentFragmentCacheTests(TestCase):
+    """Tekrarlanan ziyaret sorgu çalıştırmamalı; kayıt değişince sayfa güncellenmeli."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=cls.agent)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.agent)
+
+    def test_repeat_view_is_served_from_cache_until_policy_changes(self):
+        self.client.get('/agent/policies/')
+        # Yalnızca oturum ve kullanıcı sorguları
+        with self.assertNumQueries(2):
+            self.client.get('/agent/policies/')
+
+        Policy.objects.create(
+            policy_number='POL-YENI', policy_type='Kasko', customer=self.customer,
+            start_date=date.today(), end_date=date.today() + timedelta(days=3),
+            premium_amount=1000, issued_by_agent=self.agent,
+        )
+        self.assertContains(self.client.get('/agent/policies/'), 'POL-YENI')
+
+
+# -----------------------------------------------------
+# İmleç Sayfalama (pagination.py)
+# -----------------------------------------------------
+class KeysetPaginationTests(TestCase):
+    """Sayfalar arka arkaya gezildiğinde her satır bir kez ve sırayla gelmeli (NULL değerler dahil)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        for i, premium in enumerate([None, 900, None, 800, 900, None, 700]):
+            Quote.objects.create(
+                company_name=f'Şirket {i}', policy_type='Kasko', premium_amount=premium,
+                issued_by_agent=cls.agent,
+            )
+
+    def walk(self, ordering, page_size=2):
+        queryset = Quote.objects.filter(issued_by_agent=self.agent)
+        forward, token = [], None
+        while True:
+            page = keyset_paginate(queryset, ordering, token=token, page_size=page_size)
+            forward.extend(quote.pk for quote in page)
+            if not page.has_next:
+                break
+            token = page.next_token
+
+        backward = []
+        while page.has_previous:
+            page = keyset_paginate(queryset, ordering, token=page.previous_token, page_size=page_size)
+            backward[:0] = [quote.pk for quote in page]
+        return forward, backward
+
+    def test_pages_cover_rows_with_null_sort_values(self):
+        for ordering in (['-created_at', 'premium_amount', 'id'], ['premium_amount', '-created_at', 'id'],
+                         ['-premium_amount', 'id']):
+            with self.subTest(ordering=ordering):
+                expected = list(Quote.objects.order_by(*ordering).values_list('pk', flat=True))
+                forward, backward = self.walk(ordering)
+                self.assertEqual(forward, expected)
+                # Son sayfadan geriye: son sayfa (1 satır) dışındaki tüm satırlar
+                self.assertEqual(backward, expected[:-1])
+
+    @mock.patch.object(QuoteListView, 'page_size', 2)
+    def test_quote_list_next_page_after_null_premium(self):
+        self.client.force_login(self.agent)
+        response = self.client.get('/agent/quotes/', {'policy_type': 'Kasko'})
+        page = response.context['keyset_page']
+        self.assertIsNone(page.object_list[-1].premium_amount)
+        self.assertEqual(self.client.get('/agent/quotes/', {'policy_type': 'Kasko', 'cursor': page.next_token}).status_code, 200)
+
+
+# -----------------------------------------------------
+# Poliçe İçe Aktarma (imports.import_policies)
+# -----------------------------------------------------
+class PolicyImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=cls.agent)
+        Policy.objects.create(
+            policy_number='MEVCUT', policy_type='Kasko', customer=cls.customer,
+            start_date=date.today(), end_date=date.today() + timedelta(days=3),
+            premium_amount=1000, issued_by_agent=cls.agent,
+        )
+
+    def test_chunked_import_writes_valid_rows_and_reports_errors(self):
+        content = (
+            "policy_number;policy_type;customer_tckn;start_date;end_date;premium_amount;status\n"
+            "P-1;Kasko;10000000146;01.01.2026;01.01.2027;1.234,50;Aktif\n"
+            "P-2;Trafik;10000000146;2026-01-01 00:00:00;2027-01-01 00:00:00;900;\n"
+            "P-1;Kasko;10000000146;01.01.2026;01.01.2027;100;\n"       # dosya içi tekrar (başka parçada)
+            "MEVCUT;Kasko;10000000146;01.01.2026;01.01.2027;100;\n"    # veritabanında var
+            "P-3;Kasko;99999999999;01.01.2026;01.01.2027;100;\n"       # müşteri yok
+            "P-4;Kasko;10000000146;01.01.2027;01.01.2026;abc;\n"       # tarih sırası + tutar
+        )
+        report = imports.import_policies(io.BytesIO(content.encode()), self.agent, 'policeler.csv', chunk_size=2)
+
+        self.assertEqual((report['total'], report['imported'], report['error_count']), (6, 2, 4))
+        self.assertEqual([error['row'] for error in report['errors']], [4, 5, 6, 7])
+        self.assertEqual(len(report['errors'][3]['errors']), 2)
+        self.assertEqual(Policy.objects.get(policy_number='P-1').premium_amount, Decimal('1234.50'))
+
+        output = io.StringIO()
+        imports.write_error_report(report, output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], 'row,key,errors')
+        self.assertEqual(len(lines), 5)
+
+    def test_windows_turkish_csv_is_decoded(self):
+        content = (
+            "policy_number,policy_type,customer,start_date,end_date,premium_amount\n"
+            f"P-1,İşyeri,{self.customer.pk},01.01.2026,01.01.2027,100\n"
+        )
+        report = imports.import_policies(io.BytesIO(content.encode('cp1254')), self.agent, 'policeler.csv')
+        self.assertEqual(report['imported'], 1)
+        self.assertEqual(Policy.objects.get(policy_number='P-1').policy_type, 'İşyeri')
+
+    def test_unreadable_file_raises_import_error(self):
+        with self.assertRaises(imports.ImportFileError):
+            imports.import_policies(io.BytesIO(b"policy_number\n\x81\x8d\n"), self.agent, 'policeler.csv')
+        with self.assertRaises(imports.ImportFileError):
+            imports.import_policies(io.BytesIO(b"not a zip"), self.agent, 'policeler.xlsx')
+
+    @skipUnless(openpyxl, 'openpyxl kurulu değil.')
+    def test_xlsx_numeric_and_date_cells(self):
+        # Excel'de TCKN, müşteri ID ve tutar sayı; tarihler tarih hücresi olarak saklanır
+        file = xlsx_file([
+            ['policy_number', 'policy_type', 'customer_tckn', 'customer', 'start_date', 'end_date', 'premium_amount'],
+            ['P-1', 'Kasko', 10000000146, None, datetime(2026, 1, 31), datetime(2027, 1, 31), 1234.5],
+            [100234, 'Trafik', None, self.customer.pk, date(2026, 2, 1), '01.02.2027', 900],
+            ['P-3', 'Kasko', 10000000147, None, datetime(2026, 1, 31), datetime(2027, 1, 31), 100],  # müşteri yok
+        ])
+        report = imports.import_policies(file, self.agent, 'policeler.xlsx')
+
+        self.assertEqual((report['total'], report['imported'], report['error_count']), (3, 2, 1))
+        self.assertEqual(report['errors'][0]['row'], 4)
+        first = Policy.objects.get(policy_number='P-1')
+        self.assertEqual(
+            (first.customer_id, first.start_date, first.end_date, first.premium_amount),
+            (self.customer.pk, date(2026, 1, 31), date(2027, 1, 31), Decimal('1234.50')),
+        )
+        second = Policy.objects.get(policy_number='100234')
+        self.assertEqual((second.customer_id, second.start_date, second.end_date), (
+            self.customer.pk, date(2026, 2, 1), date(2027, 2, 1),
+        ))
+
+
+# -----------------------------------------------------
+# Müşteri İçe Aktarma (imports.import_customers)
+# -----------------------------------------------------
+class CustomerImportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.other = CustomUser.objects.create_user('diger', password='x', role='agent')
+
+    def run_import(self, content):
+        return imports.import_customers(io.BytesIO(content.encode()), self.agent, 'musteriler.csv')
+
+    @skipUnless(openpyxl, 'openpyxl kurulu değil.')
+    def test_xlsx_numeric_identity_numbers_and_dates(self):
+        file = xlsx_file([
+            ['tckn', 'name', 'phone', 'date_of_birth'],
+            [10000000146, 'Ali Veli', 5321112233, datetime(1980, 5, 17)],
+            [1234567890, 'Firma A.Ş.', None, None],
+            ['10000000078', 'Ayşe Kaya', '0532 111 22 33', '17.05.1990'],
+        ])
+        report = imports.import_customers(file, self.agent, 'musteriler.xlsx')
+
+        self.assertEqual((report['imported'], report['updated'], report['error_count']), (3, 0, 0))
+        person = Customer.objects.get(tckn='10000000146')
+        self.assertEqual((person.name, person.phone, person.date_of_birth), (
+            'Ali Veli', '5321112233', date(1980, 5, 17),
+        ))
+        company = Customer.objects.get(tckn_vkn='1234567890')
+        self.assertEqual((company.customer_type, company.agent), ('corporate', self.agent))
+        self.assertEqual(Customer.objects.get(tckn='10000000078').date_of_birth, date(1990, 5, 17))
+
+    def test_identity_number_checksums(self):
+        self.assertTrue(imports.is_valid_tckn('10000000146'))
+        self.assertFalse(imports.is_valid_tckn('10000000147'))
+        self.assertFalse(imports.is_valid_tckn('01000000146'))
+        self.assertTrue(imports.is_valid_vkn('1234567890'))
+        self.assertFalse(imports.is_valid_vkn('1234567891'))
+
+    def test_inserts_updates_and_reports_duplicates(self):
+        Customer.objects.create(name='Eski Ad', tckn='10000000146', phone='555', agent=self.agent)
+        report = self.run_import(
+            "tckn,name,phone\n"
+            "10000000146,Yeni Ad,\n"        # güncelleme: boş telefon mevcut değeri korur
+            "10000000078,Ayşe,\n"           # yeni bireysel
+            "1234567890,Firma A.Ş.,\n"      # yeni kurumsal (VKN)
+            "10000000078,Tekrar,\n"         # dosya içi tekrar
+            "10000000147,Hatalı,\n"         # kontrol hanesi tutmuyor
+        )
+        self.assertEqual((report['imported'], report['updated'], report['error_count']), (2, 1, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [5, 6])
+        updated = Customer.objects.get(tckn='10000000146')
+        self.assertEqual((updated.name, updated.phone), ('Yeni Ad', '555'))
+        self.assertEqual(Customer.objects.get(tckn_vkn='1234567890').customer_type, 'corporate')
+
+    def test_new_customer_without_name_is_reported(self):
+        report = self.run_import("tckn,name\n10000000146,\n")
+        self.assertEqual((report['imported'], report['error_count']), (0, 1))
+        self.assertFalse(Customer.objects.filter(tckn='10000000146').exists())
+
+    def test_other_agents_customer_is_never_modified(self):
+        Customer.objects.create(name='Başkası', tckn='10000000146', phone='555', agent=self.other)
+        self.assertEqual(self.run_import("tckn,name\n10000000146,Yeni\n")['error_count'], 1)
+
+        # Aynı numara okuma ile yazma arasında başka bir işlemce eklenmiş gibi
+        with mock.patch.object(imports, '_find_existing_customers', return_value={}):
+            report = self.run_import("tckn,name\n10000000146,Yeni\n")
+        self.assertEqual((report['imported'], report['error_count']), (0, 1))
+        customer = Customer.objects.get(tckn='10000000146')
+        self.assertEqual((customer.name, customer.phone, customer.agent), ('Başkası', '555', self.other))
+
+
+# -----------------------------------------------------
+# Şirket Bağlayıcıları (yerel simülatöre karşı)
+# -----------------------------------------------------
+@override_settings(QUOTE_CACHE_ENABLED=False, CARRIER_HEALTH_ENABLED=False, CARRIER_METRICS_ENABLED=False)
+class CarrierConnectorTests(TestCase):
+    """aget_quote/gather_quotes yolunu stub_server üzerinden uçtan uca çalıştırır."""
+
+    def start_server(self, **profile):
+        server = stub_server.start_stub_server(
+            profiles=stub_server.build_profiles({'allianz': profile}), seed=1,
+        )
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        base.close_clients()
+        self.addCleanup(base.close_clients)
+        options = override_settings(CARRIER_HTTP_OPTIONS=server.http_options())
+        options.enable()
+        self.addCleanup(options.disable)
+        return server
+
+    def gather(self, **timeouts):
+        with override_settings(QUOTE_CARRIER_TIMEOUTS=timeouts):
+            return asyncio.run(quote_engine.gather_quotes(
+                {'tckn': '10000000146'}, 'Kasko', connectors={'allianz': allianz.aget_quote},
+            ))
+
+    def test_success_reuses_pooled_connection(self):
+        server = self.start_server(latency={'distribution': 'fixed', 'value': 0.0})
+        for _ in range(3):
+            [offer] = self.gather()
+            self.assertEqual((offer['status'], offer['company'], offer['is_best']), ('success', 'Allianz Sigorta', True))
+            self.assertGreater(offer['price'], 0)
+        stats = server.stats()
+        self.assertEqual((stats['requests_served'], stats['connections_opened']), (3, 1))
+
+    def test_slow_carrier_times_out(self):
+        self.start_server(latency={'distribution': 'fixed', 'value': 0.5})
+        [offer] = self.gather(allianz=0.1)
+        self.assertEqual((offer['status'], offer['price'], offer['is_best']), ('timeout', None, False))
+        self.assertLess(offer['elapsed'], 0.5)
+
+    def test_server_error_and_malformed_body_are_errors(self):
+        self.start_server(error_rate=1.0, error_statuses=[503])
+        [offer] = self.gather()
+        self.assertEqual((offer['status'], offer['price']), ('error', None))
+        self.assertIn('503', offer['message'])
+
+        self.start_server(malformed_rate=1.0)
+        [offer] = self.gather()
+        self.assertEqual((offer['status'], offer['price']), ('error', None))
+
+
+# -----------------------------------------------------
+# Müşteri Arama
+# -----------------------------------------------------
+class CustomerSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.other = CustomUser.objects.create_user('diger', password='x', role='agent')
+        cls.sule = Customer.objects.create(name='Şule Işık', tckn='10000000146', agent=cls.agent)
+        cls.mehmet = Customer.objects.create(
+            name='Mehmet Yıldız', tckn='10000000078', phone='+90 532 123 45 67', agent=cls.agent,
+        )
+        cls.ismail = Customer.objects.create(name='İSMAİL ÇAĞLAR', tckn='10000000214', agent=cls.other)
+
+    def search(self, query, agent=None):
+        return customer_search.search_customers(query, agent=agent)
+
+    def test_turkish_case_folding(self):
+        self.assertEqual(customer_search.fold('İSMAİL'), 'ismail')
+        self.assertEqual(customer_search.fold('Ismail'), 'ismail')
+        self.assertEqual(customer_search.fold('ŞULE IŞIK'), 'sule isik')
+        self.assertEqual(self.search('ismail'), [self.ismail])
+        self.assertEqual(self.search('ISIK'), [self.sule])
+        self.assertEqual(self.search('çağlar'), [self.ismail])
+
+    def test_prefix_and_phone_search(self):
+        self.assertEqual(self.search('meh yıl'), [self.mehmet])
+        self.assertEqual(self.search('1000000007'), [self.mehmet])
+        self.assertEqual(self.search('0532 123'), [self.mehmet])
+        self.assertEqual(self.search('m'), [])
+
+    def test_identity_numbers_with_leading_zero_or_ninety(self):
+        vkn = Customer.objects.create(name='Sıfır A.Ş.', tckn_vkn='0123456789', customer_type='corporate',
+                                      agent=self.agent)
+        tckn = Customer.objects.create(name='Doksan Bey', tckn='90012345678', agent=self.agent)
+        self.assertEqual(self.search('0123456789'), [vkn])
+        self.assertEqual(self.search('90012345678'), [tckn])
+        self.assertEqual(self.search('900123'), [tckn])
+        self.assertEqual(self.search('+90 532 123'), [self.mehmet])
+
+    def test_results_are_scoped_to_agent_and_follow_updates(self):
+        self.assertEqual(self.search('ismail', agent=self.agent), [])
+        self.ismail.agent = self.agent
+        self.ismail.save()
+        self.assertEqual(self.search('ismail', agent=self.agent), [self.ismail])
+        self.ismail.delete()
+        self.assertEqual(self.search('ismail'), [])
+
+    def test_migration_documents_match_live_index(self):
+        migration = importlib.import_module('policy_management.migrations.0018_customer_search_index')
+        for customer in (self.sule, self.mehmet, self.ismail):
+            live = customer_search.document_for(customer)
+            self.assertEqual(
+                migration._document_row(customer),
+                (customer.pk, *live.values(), str(customer.agent_id)),
+            )
+
+
+# -----------------------------------------------------
+# Teklif Önbelleği (stale-while-revalidate)
+# -----------------------------------------------------
+@override_settings(QUOTE_CACHE_ENABLED=True, CARRIER_HEALTH_ENABLED=False, CARRIER_METRICS_ENABLED=False)
+class QuoteCacheRevalidationTests(TestCase):
+    customer_data = {'customer_id': 1, 'tckn': '10000000146'}
+
+    def setUp(self):
+        quote_cache.clear()
+        self.addCleanup(quote_cache.clear)
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.calls = 0
+
+    def slow_carrier(self, customer_data, policy_type):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return {'company': 'Yavaş', 'price': 900.0, 'status': 'success'}
+
+    def fast_carrier(self, customer_data, policy_type):
+        return {'company': 'Hızlı', 'price': 1200.0, 'status': 'success'}
+
+    def expire(self, carrier, price):
+        quote_cache.set(make_key(self.customer_data, 'Kasko', carrier),
+                        {'company': 'Yavaş', 'price': price, 'status': 'success'}, ttl=-1)
+
+    def fetch(self):
+        return quote_engine.fetch_all_quotes(
+            self.customer_data, 'Kasko', {'slow': self.slow_carrier, 'fast': self.fast_carrier},
+            overall_timeout=5,
+        )
+
+    def test_stale_price_is_served_without_waiting_and_refreshed(self):
+        self.expire('slow', 800.0)
+        started = time.monotonic()
+        slow, fast = self.fetch()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual((slow['price'], slow['stale'], slow['is_best']), (800.0, True, False))
+        self.assertTrue(fast['is_best'])
+
+        # Yenileme sürerken gelen istek şirketi ikinci kez çağırmaz
+        self.assertTrue(self.started.wait(5))
+        self.fetch()
+        self.assertEqual(self.calls, 1)
+
+        self.release.set()
+        key = make_key(self.customer_data, 'Kasko', 'slow')
+        for _ in range(100):
+            if quote_cache.get(key)[1] == 'fresh':
+                break
+            time.sleep(0.02)
+        slow, fast = self.fetch()
+        self.assertEqual((slow['price'], slow['cached'], slow.get('stale'), slow['is_best']), (900.0, True, None, True))
+
+    def test_async_path_serves_stale_price(self):
+        self.expire('slow_async', 800.0)
+
+        async def slow(customer_data, policy_type):
+            await asyncio.sleep(1)
+
+        started = time.monotonic()
+        [offer] = asyncio.run(quote_engine.gather_quotes(
+            self.customer_data, 'Kasko', {'slow_async': slow}, overall_timeout=5,
+        ))
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual((offer['status'], offer['stale'], offer['is_best']), ('success', True, False))
+
+
+# -----------------------------------------------------
+# Uyarlanabilir Süre Sınırı
+# -----------------------------------------------------
+@override_settings(CARRIER_ADAPTIVE_MIN_SAMPLES=20, CARRIER_ADAPTIVE_TIMEOUT_FACTOR=1.5,
+                   CARRIER_ADAPTIVE_MIN_TIMEOUT=0.2, CARRIER_HEALTH_WINDOW=100)
+@override_settings(QUOTE_CACHE_ENABLED=False, CARRIER_HEALTH_ENABLED=False, CARRIER_METRICS_ENABLED=False)
+class FetchAllQuotesTests(TestCase):
+    """fetch_all_quotes'u yavaş ve hata veren sahte bağlayıcılarla çalıştırır."""
+
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def connectors(self):
+        def fast(customer_data, policy_type):
+            return {'price': 1000.0, 'status': 'success', 'company': 'Hızlı Sigorta'}
+
+        def failing(customer_data, policy_type):
+            time.sleep(0.05)
+            raise ConnectionError('bağlantı reddedildi')
+
+        def slow(customer_data, policy_type):
+            self.release.wait(5)  # Süre sınırını kaçırır
+            return {'price': 500.0, 'status': 'success', 'company': 'Yavaş Sigorta'}
+
+        return {'slow': slow, 'failing': failing, 'fast': fast}
+
+    def fetch(self, overall_timeout, **timeouts):
+        landed = []
+        with override_settings(QUOTE_CARRIER_TIMEOUTS=timeouts):
+            started = time.monotonic()
+            offers = quote_engine.fetch_all_quotes(
+                {'tckn': '10000000146'}, 'Kasko', connectors=self.connectors(),
+                overall_timeout=overall_timeout, on_result=lambda offer: landed.append(offer['carrier']),
+            )
+            return offers, landed, time.monotonic() - started
+
+    def test_slow_carrier_times_out_and_failure_is_isolated(self):
+        offers, landed, elapsed = self.fetch(2, slow=0.3, failing=1, fast=1)
+        slow, failing, fast = offers
+        self.assertEqual([o['carrier'] for o in offers], ['slow', 'failing', 'fast'])
+        self.assertEqual((slow['status'], slow['price'], slow['message']), ('timeout', None, 'Zaman aşımı (0.3 sn)'))
+        self.assertEqual((failing['status'], failing['price']), ('error', None))
+        self.assertIn('bağlantı reddedildi', failing['message'])
+        self.assertEqual((fast['status'], fast['price'], fast['is_best']), ('success', 1000.0, True))
+        # Sonuçlar geldikleri sırayla bildirilir; yavaş şirket diğerlerini bekletmez
+        self.assertEqual(landed, ['fast', 'failing', 'slow'])
+        self.assertLess(elapsed, 1)
+
+    def test_overall_deadline_caps_carrier_timeouts(self):
+        offers, landed, elapsed = self.fetch(0.3, slow=5, failing=5, fast=5)
+        slow = offers[0]
+        self.assertEqual((slow['status'], slow['message']), ('timeout', 'Zaman aşımı (0.3 sn)'))
+        self.assertEqual(landed, ['fast', 'failing', 'slow'])
+        self.assertLess(elapsed, 1)
+
+
+class AdaptiveTimeoutTests(TestCase):
+    def test_timeout_follows_p95_of_successes(self):
+        health = CarrierHealth('test')
+        for _ in range(19):
+            health.record(0.4, True)
+        self.assertEqual(health.get_timeout(5.0), 5.0)  # yetersiz örnek
+        health.record(0.4, True)
+        self.assertEqual(health.get_timeout(5.0), 0.6)
+
+    def test_timeouts_keep_the_limit_from_ratcheting_down(self):
+        health = CarrierHealth('test')
+        for _ in range(20):
+            health.record(0.4, True)
+        # Sınıra takılan yavaş çağrılar yapılandırılan süre kadar sayılır
+        for _ in range(2):
+            health.record(0.6, False, timed_out=True)
+        self.assertEqual(health.get_timeout(5.0), 5.0)
+
+        # Hızlı hata yanıtları süre hesabına girmez
+        health = CarrierHealth('test')
+        for _ in range(20):
+            health.record(0.4, True)
+        for _ in range(5):
+            health.record(0.01, False)
+        self.assertEqual(health.get_timeout(5.0), 0.6)
+
+
+# -----------------------------------------------------
+# Teklif İşçileri
+# -----------------------------------------------------
+class QuoteWorkerTests(TestCase):
+    def test_worker_loop_requeues_jobs_of_crashed_workers(self):
+        agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=agent)
+        job = QuoteJob.objects.create(
+            customer=customer, policy_type='Kasko', agent=agent, status='running', worker='olu-isci',
+            started_at=timezone.now() - timedelta(seconds=600),
+        )
+        recent = QuoteJob.objects.create(
+            customer=customer, policy_type='Kasko', agent=agent, status='running', worker='canli-isci',
+            started_at=timezone.now(),
+        )
+
+        with mock.patch.object(run_quote_workers, 'run_job') as run_job:
+            run_quote_workers.worker_loop(0, once=True, stale_after=300, requeue_interval=0)
+        self.assertEqual([call.args[0].pk for call in run_job.call_args_list], [job.pk])
+        recent.refresh_from_db()
+        self.assertEqual((recent.status, recent.worker), ('running', 'canli-isci'))
+
+
+# -----------------------------------------------------
+# Şirket Çağrı Metrikleri
+# -----------------------------------------------------
+@override_settings(CARRIER_METRICS_ENABLED=True, CARRIER_METRICS_FLUSH_INTERVAL=60, CARRIER_METRICS_FLUSH_THRESHOLD=3)
+class CarrierMetricsTests(TestCase):
+    def setUp(self):
+        carrier_metrics.recorder.drain()
+        self.addCleanup(carrier_metrics.recorder.drain)
+
+    def record(self, status, elapsed):
+        carrier_metrics.record_call('allianz', 'Kasko', {'status': status, 'price': 1.0, 'elapsed': elapsed})
+
+    def test_flush_waits_for_threshold_or_interval(self):
+        self.record('success', 0.3)
+        self.record('timeout', 5.0)
+        self.assertEqual(carrier_metrics.flush(), 0)
+        self.assertFalse(CarrierMetric.objects.exists())
+
+        self.record('success', 0.3)
+        self.assertEqual(carrier_metrics.flush(), 2)  # iki kova: success/0.3 ve timeout/5.0
+        [summary] = carrier_metrics.collect()
+        self.assertEqual((summary['calls'], summary['outcomes']['success'], summary['outcomes']['timeout']), (3, 2, 1))
+
+        self.record('error', 0.1)
+        with override_settings(CARRIER_METRICS_FLUSH_INTERVAL=0):
+            self.assertEqual(carrier_metrics.flush(), 1)
+
+    def test_forced_flush_adds_to_existing_rows(self):
+        self.record('success', 0.3)
+        carrier_metrics.flush(force=True)
+        self.record('success', 0.3)
+        carrier_metrics.flush(force=True)
+        self.assertEqual(CarrierMetric.objects.get().count, 2)
+        self.assertEqual(carrier_metrics.flush(force=True), 0)
+
+
+# -----------------------------------------------------
+# Poliçe Dökümanları (İçerik Adresli Depo)
+# -----------------------------------------------------
+class DocumentRefCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=cls.agent)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def create_policy(self, number, content=b'%PDF-1.4 police'):
+        return Policy.objects.create(
+            policy_number=number, policy_type='Kasko', customer=self.customer, issued_by_agent=self.agent,
+            start_date=date.today(), end_date=date.today() + timedelta(days=365), premium_amount=1000,
+            document=SimpleUploadedFile('police.pdf', content),
+        )
+
+    def blob_exists(self, name):
+        return os.path.exists(document_storage().path(name))
+
+    def test_shared_content_is_stored_once_and_released_by_count(self):
+        first = self.create_policy('POL-1')
+        second = self.create_policy('POL-2')
+        name = first.document.name
+        self.assertEqual(second.document.name, name)
+        self.assertEqual(DocumentBlob.objects.get(name=name).ref_count, 2)
+
+        first.delete()
+        self.assertEqual(DocumentBlob.objects.get(name=name).ref_count, 1)
+        self.assertTrue(self.blob_exists(name))
+
+        second.document = SimpleUploadedFile('yeni.pdf', b'%PDF-1.4 yeni')
+        second.save()
+        self.assertFalse(DocumentBlob.objects.filter(name=name).exists())
+        self.assertFalse(self.blob_exists(name))
+        self.assertEqual(DocumentBlob.objects.get(name=second.document.name).ref_count, 1)
+
+    def test_upload_recreates_missing_file(self):
+        # Eşzamanlı bir silme dosyayı kaldırmış, kayıt kalmış (ör. silme işlemi geri alındı)
+        name = self.create_policy('POL-1').document.name
+        os.remove(document_storage().path(name))
+
+        self.assertEqual(self.create_policy('POL-2').document.name, name)
+        self.assertTrue(self.blob_exists(name))
+        self.assertEqual(DocumentBlob.objects.get(name=name).ref_count, 2)
+
+    def test_blob_used_by_extraction_survives_release_and_gc(self):
+        policy = self.create_policy('POL-1')
+        name = policy.document.name
+        DocumentExtraction.objects.create(
+            sha256=DocumentBlob.objects.get(name=name).sha256, document=name, status='done',
+        )
+        orphan = self.create_policy('POL-2', content=b'%PDF-1.4 sahipsiz')
+        orphan_name = orphan.document.name
+        DocumentBlob.objects.filter(name=orphan_name).update(ref_count=0)
+        Policy.objects.filter(pk=orphan.pk).update(document='')  # sinyalsiz: sayaç güncellenmez
+
+        policy.delete()
+        self.assertEqual(DocumentBlob.objects.get(name=name).ref_count, 0)
+        self.assertTrue(self.blob_exists(name))
+
+        call_command('policy_documents', gc=True, gc_age=0, stdout=io.StringIO())
+        self.assertTrue(DocumentBlob.objects.filter(name=name).exists())
+        self.assertTrue(self.blob_exists(name))
+        self.assertFalse(DocumentBlob.objects.filter(name=orphan_name).exists())
+        self.assertFalse(self.blob_exists(orphan_name))
+
+        # Saklama süresi dolan analiz kaydı ve (poliçesi olmayan) dosyası silinir
+        DocumentExtraction.objects.update(created_at=timezone.now() - timedelta(days=31))
+        call_command('policy_documents', gc=True, gc_age=0, extraction_days=30, stdout=io.StringIO())
+        self.assertFalse(DocumentExtraction.objects.exists())
+        self.assertFalse(DocumentBlob.objects.filter(name=name).exists())
+        self.assertFalse(self.blob_exists(name))
+
+    def test_old_extraction_of_a_policy_document_is_kept(self):
+        name = self.create_policy('POL-1').document.name
+        DocumentExtraction.objects.create(
+            sha256=DocumentBlob.objects.get(name=name).sha256, document=name, status='done',
+        )
+        DocumentExtraction.objects.update(created_at=timezone.now() - timedelta(days=31))
+        call_command('policy_documents', gc=True, gc_age=0, extraction_days=30, stdout=io.StringIO())
+        self.assertTrue(DocumentExtraction.objects.filter(document=name).exists())
+        self.assertTrue(self.blob_exists(name))
+
+    def test_only_agents_can_upload_for_extraction(self):
+        admin = CustomUser.objects.create_user('yonetici', password='x', role='admin')
+        self.client.force_login(admin)
+        response = self.client.post('/policy/extract/', {'document': SimpleUploadedFile('a.pdf', b'%PDF')})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(DocumentBlob.objects.exists())
+
+
+# -----------------------------------------------------
+# En İyi Teklif Tablosu
+# -----------------------------------------------------
+class BestOfferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=cls.agent)
+
+    def quote(self, company, premium, error=None, policy_type='Kasko'):
+        return Quote.objects.create(
+            company_name=company, policy_type=policy_type, premium_amount=premium, error_message=error,
+            issued_by_agent=self.agent, customer=self.customer,
+        )
+
+    def best(self, policy_type='Kasko'):
+        return BestOffer.objects.get(agent=self.agent, customer=self.customer, policy_type=policy_type).quote_id
+
+    def test_cheapest_valid_quote_is_selected(self):
+        self.quote('Allianz Sigorta', 1200)
+        cheapest = self.quote('Doğa Sigorta', 900)
+        self.quote('Türkiye Sigorta', 0, error='Zaman aşımı')
+        self.quote('Doğa Sigorta', 1000)
+        trafik = self.quote('Allianz Sigorta', 700, policy_type='Trafik')
+        self.assertEqual((self.best(), self.best('Trafik')), (cheapest.pk, trafik.pk))
+
+        best_offers.rebuild()
+        self.assertEqual((self.best(), self.best('Trafik')), (cheapest.pk, trafik.pk))
+
+    def test_ties_prefer_newest_quote(self):
+        older = self.quote('Allianz Sigorta', 900)
+        newer = self.quote('Doğa Sigorta', 900)
+        self.assertEqual(self.best(), newer.pk)
+
+        # Aynı zaman damgasında büyük ID kazanır (artımlı, yenileme ve baştan kurma aynı sonucu verir)
+        Quote.objects.filter(pk=newer.pk).update(created_at=older.created_at)
+        best_offers.refresh([(self.agent.pk, self.customer.pk, 'Kasko')])
+        self.assertEqual(self.best(), newer.pk)
+        best_offers.rebuild()
+        self.assertEqual(self.best(), newer.pk)
+
+    def test_deletes_refresh_each_group_once_on_commit(self):
+        self.quote('Doğa Sigorta', 800)
+        runner_up = self.quote('Allianz Sigorta', 900)
+        for premium in (1000, 1100, 1200):
+            self.quote('Türkiye Sigorta', premium)
+
+        with mock.patch.object(best_offers, 'refresh', wraps=best_offers.refresh) as refresh:
+            with self.captureOnCommitCallbacks(execute=True):
+                Quote.objects.exclude(pk=runner_up.pk).delete()
+        refresh.assert_called_once_with({(self.agent.pk, self.customer.pk, 'Kasko')})
+        self.assertEqual(self.best(), runner_up.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            runner_up.delete()
+        self.assertFalse(BestOffer.objects.exists())
+
+
+# -----------------------------------------------------
+# Acente Özet Sayaçları
+# -----------------------------------------------------
+class AgentSummaryTests(TestCase):
+    FIELDS = ('customer_count', 'policy_count', 'active_count', 'expired_count', 'cancelled_count', 'total_premium')
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.other = CustomUser.objects.create_user('diger', password='x', role='agent')
+
+    def counters(self, agent):
+        return AgentSummary.objects.values_list(*self.FIELDS).get(agent=agent)
+
+    def assert_matches_rebuild(self):
+        expected = compute_summaries([self.agent.pk, self.other.pk])
+        for agent in (self.agent, self.other):
+            self.assertEqual(self.counters(agent), tuple(expected[agent.pk][f] for f in self.FIELDS))
+
+    def test_signals_keep_counters_in_step_with_rebuild(self):
+        customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=self.agent)
+        Customer.objects.create(name='Ayşe Kaya', tckn='10000000078', agent=self.other)
+        policy = Policy.objects.create(
+            policy_number='POL-1', policy_type='Kasko', customer=customer, issued_by_agent=self.agent,
+            start_date=date.today(), end_date=date.today() + timedelta(days=365), premium_amount=Decimal('1000.50'),
+        )
+        Policy.objects.create(
+            policy_number='POL-2', policy_type='Trafik', customer=customer, issued_by_agent=self.agent,
+            start_date=date.today(), end_date=date.today(), premium_amount=500, status='expired',
+        )
+        self.assertEqual(self.counters(self.agent), (1, 2, 1, 1, 0, Decimal('1500.50')))
+
+        # Durum ve prim değişikliği, acente değişikliği, silme
+        policy.status, policy.premium_amount = 'cancelled', Decimal('800')
+        policy.save()
+        self.assertEqual(self.counters(self.agent), (1, 2, 0, 1, 1, Decimal('1300')))
+        policy.issued_by_agent = self.other
+        policy.save()
+        customer.agent = self.other
+        customer.save()
+        self.assert_matches_rebuild()
+        self.assertEqual(self.counters(self.other), (2, 1, 0, 0, 1, Decimal('800')))
+
+        policy.delete()
+        self.assert_matches_rebuild()
+        self.assertEqual(self.counters(self.other)[:2], (2, 0))
+
+
+# -----------------------------------------------------
+# Poliçe Bitiş Uyarıları
+# -----------------------------------------------------
+class PolicyExpiryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=cls.agent)
+        today = timezone.localdate()
+        cls.policies = {
+            name: Policy.objects.create(
+                policy_number=name, policy_type='Kasko', customer=cls.customer, issued_by_agent=cls.agent,
+                start_date=today - timedelta(days=360), end_date=today + timedelta(days=days),
+                premium_amount=1000, status=status,
+            )
+            for name, days, status in (
+                ('YAKIN', 3, 'active'), ('BUGUN', 0, 'active'), ('UZAK', 30, 'active'),
+                ('IPTAL', 2, 'cancelled'), ('GECMIS', -1, 'active'),
+            )
+        }
+
+    def run_check(self, *args):
+        out = io.StringIO()
+        call_command('check_policy_expiry', '--horizon', '7', '--batch-size', '1', *args, stdout=out)
+        return out.getvalue()
+
+    def notified(self):
+        return sorted(ExpiryNotification.objects.values_list('policy__policy_number', flat=True))
+
+    def test_each_policy_is_warned_once_per_end_date(self):
+        self.assertIn('Toplam 2 adet', self.run_check('--dry-run'))
+        self.assertEqual(self.notified(), [])
+
+        self.assertIn('Toplam 2 adet', self.run_check())
+        self.assertEqual(self.notified(), ['BUGUN', 'YAKIN'])
+        self.assertIn('bulunamadı', self.run_check())
+        self.assertEqual(ExpiryNotification.objects.count(), 2)
+
+        # Yenilenen poliçe yeni bitiş tarihi için tekrar uyarılır
+        policy = self.policies['YAKIN']
+        policy.end_date += timedelta(days=2)
+        policy.save()
+        output = self.run_check()
+        self.assertIn('Toplam 1 adet', output)
+        self.assertIn('YAKIN', output)
+        self.assertEqual(ExpiryNotification.objects.filter(policy=policy).count(), 2)
+
+
+# -----------------------------------------------------
+# Canlı Teklif Akışı
+# -----------------------------------------------------
+class QuoteStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=cls.agent)
+
+    def test_offers_are_saved_when_client_disconnects(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def fake_get_quotes(customer_data, policy_type, on_result=None):
+            offers = [
+                {'carrier': 'allianz', 'company': 'Allianz Sigorta', 'price': 1200.0, 'status': 'success'},
+                {'carrier': 'doga', 'company': 'Doğa Sigorta', 'price': None, 'status': 'timeout',
+                 'message': 'Zaman aşımı (5 sn)'},
+            ]
+            for offer in offers:
+                on_result(offer)
+            release.wait(5)  # Kalan şirket hâlâ bekleniyor
+            return offers
+
+        with mock.patch.object(quote_stream, 'get_quotes', fake_get_quotes):
+            events = quote_stream.stream_quote_events(self.agent, self.customer, 'Kasko')
+            self.assertIn('Allianz', next(events))
+            self.assertIn('Doğa', next(events))
+            events.close()  # Tarayıcı sayfadan ayrıldı
+
+        quotes = Quote.objects.filter(customer=self.customer).order_by('company_name')
+        self.assertEqual(
+            [(q.company_name, q.premium_amount, q.error_message) for q in quotes],
+            [('Allianz Sigorta', Decimal('1200'), None), ('Doğa Sigorta', 0, 'Zaman aşımı (5 sn)')],
+        )
+
+    def test_completed_stream_saves_once(self):
+        def fake_get_quotes(customer_data, policy_type, on_result=None):
+            offer = {'carrier': 'allianz', 'company': 'Allianz Sigorta', 'price': 1200.0, 'status': 'success'}
+            on_result(offer)
+            return quote_engine.mark_best_offer([offer])
+
+        with mock.patch.object(quote_stream, 'get_quotes', fake_get_quotes):
+            events = list(quote_stream.stream_quote_events(self.agent, self.customer, 'Kasko'))
+        self.assertTrue(events[-1].startswith('event: done'))
+        self.assertEqual(Quote.objects.filter(customer=self.customer).count(), 1)
+
+
+# -----------------------------------------------------
+# İstek Profili
+# -----------------------------------------------------
+@override_settings(REQUEST_PROFILER_MAX_ROWS=2, REQUEST_PROFILER_PRUNE_EVERY=3)
+class RequestProfilerTests(TestCase):
+    def save(self):
+        request = RequestFactory().get('/agent/policies/')
+        profiling.save_profile(request, HttpResponse(), profiling.ProfileCollector().summarize())
+        return RequestProfile.objects.count()
+
+    def test_old_profiles_are_pruned_every_nth_save(self):
+        with mock.patch.object(profiling, '_saved_profiles', itertools.count(1)):
+            counts = [self.save() for _ in range(6)]
+        # Silme yalnızca 3. ve 6. kayıtta çalışır; arada sınır geçici olarak aşılır
+        self.assertEqual(counts, [1, 2, 2, 3, 4, 2])
+        self.assertEqual(
+            list(RequestProfile.objects.order_by('id').values_list('id', flat=True)),
+            list(RequestProfile.objects.order_by('-id').values_list('id', flat=True)[:2])[::-1],
+        )
+
+
+# -----------------------------------------------------
+# Prim Analizi
+# -----------------------------------------------------
+class PremiumAnalyticsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_user('yonetici', password='x', role='admin')
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        cls.other = CustomUser.objects.create_user('diger', password='x', role='agent')
+        cls.customer = Customer.objects.create(name='Ali Veli', tckn='10000000146', agent=cls.agent)
+        other_customer = Customer.objects.create(name='Ayşe Kaya', tckn='10000000214', agent=cls.other)
+        for number, policy_type, premium, customer, agent in [
+            ('P-1', 'Kasko', '1000.00', cls.customer, cls.agent),
+            ('P-2', 'Kasko', '2500.40', cls.customer, cls.agent),
+            ('P-3', 'Trafik', '900.00', cls.customer, cls.agent),
+            ('P-4', 'Kasko', '4000.00', other_customer, cls.other),
+        ]:
+            cls.create_policy(number, policy_type, premium, customer, agent)
+
+    @staticmethod
+    def create_policy(number, policy_type, premium, customer, agent):
+        return Policy.objects.create(
+            policy_number=number, policy_type=policy_type, customer=customer, issued_by_agent=agent,
+            start_date=date.today(), end_date=date.today() + timedelta(days=365), premium_amount=Decimal(premium),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def analytics_for(self, user, **data):
+        return analytics.get_analytics(user, analytics.parse_params(data, user))
+
+    def summary(self, result):
+        return [(row['policy_type'], row['count'], row['total']) for row in result['rows']]
+
+    def test_grouped_totals(self):
+        result = self.analytics_for(self.admin, group_by='policy_type')
+        self.assertEqual(self.summary(result), [
+            ('Kasko', 3, Decimal('7500.40')), ('Trafik', 1, Decimal('900.00')),
+        ])
+        self.assertEqual(result['totals'], {'count': 4, 'total': Decimal('8400.40'), 'average': Decimal('2100.10')})
+        self.assertEqual(result['rows'][0]['average'], Decimal('2500.13'))
+        self.assertEqual((result['rows'][0]['min'], result['rows'][0]['max']), (Decimal('1000.00'), Decimal('4000.00')))
+
+        result = self.analytics_for(self.admin, group_by='agent,policy_type')
+        self.assertEqual(
+            [(row['agent'], row['policy_type'], row['count']) for row in result['rows']],
+            [('acente', 'Kasko', 2), ('acente', 'Trafik', 1), ('diger', 'Kasko', 1)],
+        )
+
+    def test_admin_can_filter_by_agent_but_agent_cannot(self):
+        result = self.analytics_for(self.admin, agent='diger')
+        self.assertEqual(self.summary(result), [('Kasko', 1, Decimal('4000.00'))])
+        self.assertEqual(result['filters'], {'agent': 'diger'})
+
+        # Acentenin agent= parametresi yok sayılır: yalnızca kendi poliçeleri döner
+        params = analytics.parse_params({'agent': str(self.other.pk)}, self.agent)
+        self.assertNotIn('agent', params)
+        result = analytics.get_analytics(self.agent, params)
+        self.assertEqual(self.summary(result), [('Kasko', 2, Decimal('3500.40')), ('Trafik', 1, Decimal('900.00'))])
+
+        # Aynı parametrelerle diğer acente kendi sonucunu alır (önbellek kapsamı ayrı)
+        result = analytics.get_analytics(self.other, params)
+        self.assertFalse(result['cached'])
+        self.assertEqual(self.summary(result), [('Kasko', 1, Decimal('4000.00'))])
+
+    def test_policy_save_invalidates_cached_results(self):
+        self.assertFalse(self.analytics_for(self.agent)['cached'])
+        self.assertFalse(self.analytics_for(self.other)['cached'])
+        self.assertFalse(self.analytics_for(self.admin)['cached'])
+        self.assertTrue(self.analytics_for(self.agent)['cached'])
+
+        self.create_policy('P-5', 'Trafik', '100.00', self.customer, self.agent)
+
+        result = self.analytics_for(self.agent)
+        self.assertFalse(result['cached'])
+        self.assertEqual(result['totals']['count'], 4)
+        self.assertEqual(self.analytics_for(self.admin)['totals']['count'], 5)
+        # Başka acentenin sonucu geçerliliğini korur
+        self.assertTrue(self.analytics_for(self.other)['cached'])
+
+        # Poliçe başka acenteye geçince eski acentenin sonucu da yenilenir
+        policy = Policy.objects.get(policy_number='P-5')
+        policy.issued_by_agent = self.other
+        policy.save()
+        self.assertEqual(self.analytics_for(self.agent)['totals']['count'], 3)
+        self.assertEqual(self.analytics_for(self.other)['totals']['count'], 2)
+
+    def test_import_invalidates_cached_results(self):
+        self.assertEqual(self.analytics_for(self.agent)['totals']['count'], 3)
+        self.assertEqual(self.analytics_for(self.admin)['totals']['count'], 4)
+
+        content = (
+            "policy_number;policy_type;customer_tckn;start_date;end_date;premium_amount\n"
+            "P-10;Kasko;10000000146;01.01.2026;01.01.2027;1.000,00\n"
+            "P-11;Konut;10000000146;01.01.2026;01.01.2027;250\n"
+        )
+        report = imports.import_policies(io.BytesIO(content.encode()), self.agent, 'policeler.csv')
+        self.assertEqual(report['imported'], 2)
+
+        result = self.analytics_for(self.agent)
+        self.assertFalse(result['cached'])
+        self.assertEqual(self.summary(result), [
+            ('Kasko', 3, Decimal('4500.40')), ('Konut', 1, Decimal('250.00')), ('Trafik', 1, Decimal('900.00')),
+        ])
+        self.assertEqual(self.analytics_for(self.admin)['totals']['count'], 6)
+
+
+# -----------------------------------------------------
+# Akışlı CSV Dışa Aktarma
+# -----------------------------------------------------
+class StreamingExportTests(TestCase):
+    """values_list yolu, Resource().export() ile birebir aynı CSV'yi üretmeli."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.agent = CustomUser.objects.create_user('acente', password='x', role='agent')
+        customer = Customer.objects.create(
+            name='Şükrü Öztürk, "Kardeşler"', tckn='10000000146', agent=cls.agent, phone='0532 111 22 33',
+        )
+        # Acentesi silinmiş (NULL) ve iletişim bilgisi boş müşteri
+        orphan = Customer.objects.create(name='Ayşe Kaya', tckn_vkn='1234567890', customer_type='corporate')
+        for number, owner, agent, premium in [
+            ('P-1', customer, cls.agent, Decimal('1234.50')),
+            ('P-2', orphan, None, Decimal('0.05')),
+            ('P-3', orphan, cls.agent, Decimal('99999999.99')),
+        ]:
+            Policy.objects.create(
+                policy_number=number, policy_type='Kasko', customer=owner, issued_by_agent=agent,
+                start_date=date(2026, 1, 31), end_date=date(2027, 1, 31), premium_amount=premium,
+            )
+
+    def assert_same_csv(self, resource_class, queryset):
+        streamed = ''.join(stream_resource_csv(resource_class(), queryset, chunk_size=2))
+        self.assertEqual(streamed, resource_class().export(queryset.order_by('pk')).csv)
+        return streamed
+
+    def test_policy_csv_matches_resource_export(self):
+        streamed = self.assert_same_csv(PolicyResource, Policy.objects.all())
+        self.assertEqual(len(streamed.splitlines()), 4)
+
+    def test_customer_csv_matches_resource_export(self):
+        self.assert_same_csv(CustomerResource, Customer.objects.all())
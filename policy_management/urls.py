@@ -23,6 +23,8 @@ urlpatterns = [
     # EK İŞLEVLER
     path('agent/export/customers/csv/', views.export_customer_data, name='agent_export_customers'),
     path('agent/export/policies/csv/', views.export_policy_data, name='agent_export_policies'),
+    path('agent/import/customers/', views.agent_customer_import, name='agent_customer_import'),
+    path('agent/import/policies/', views.agent_policy_import, name='agent_policy_import'),
     path('agent/policy/document/delete/<int:pk>/', views.agent_policy_document_delete, name='agent_policy_document_delete'),
     #path('agent/pricing/', views.agent_pricing_view, name='agent_pricing_engine'),
 
@@ -33,6 +35,9 @@ urlpatterns = [
     path('customers/', views.AgentCustomerListView.as_view(), name='agent_customer_list'),
     path('customers/add/', views.CustomerCreateView.as_view(), name='agent_customer_add'),
 
+    # Müşteri arama (yazarken öneri, JSON)
+    path('customers/search/', views.customer_search, name='agent_customer_search'),
+
     # YENİ YOLLAR: MÜŞTERİ DÜZENLEME
     # <int:pk> kısmı, hangi müşterinin düzenleneceğini URL'den yakalar.
     path('customers/edit/<int:pk>/', views.CustomerUpdateView.as_view(), name='edit_customer'),
@@ -44,6 +49,19 @@ urlpatterns = [
     # 🚨 YENİ EKLEME: Teklif Detay Sayfası
     # Teklifin ID'si (pk) ile sayfaya erişilecek
     path('quotes/<int:pk>/', views.QuoteDetailView.as_view(), name='agent_quote_detail'),
+
+    # Arka plan teklif işinin durumu (JSON, sayfa tarafından yoklanır)
+    path('quotes/jobs/<int:pk>/', views.quote_job_status, name='agent_quote_job_status'),
+
+    # Şirket sonuçlarını geldikçe gönderen canlı akış (text/event-stream)
+    path('quotes/stream/', views.quote_stream, name='agent_quote_stream'),
+
+    # Prim analizi (sayfa + JSON API)
+    path('analytics/', views.premium_analytics, name='premium_analytics'),
+    path('analytics/premiums/', views.premium_analytics_api, name='premium_analytics_api'),
+
+    # Şirket çağrı metrikleri (süre dağılımı, hata oranları; sadece yöneticiler)
+    path('metrics/carriers/', views.carrier_metrics_view, name='carrier_metrics'),
     
     # 🚨 YENİ POLİÇE YÖNETİM YOLLARI:
     path('policies/', views.AgentPolicyListView.as_view(), name='agent_policy_list'),
@@ -54,6 +72,10 @@ urlpatterns = [
     # Poliçe Düzenleme (PDF analizini kullanacak)
     path('policy/edit/<int:pk>/', views.agent_policy_edit, name='agent_policy_edit'),
     
+    # Döküman Analizi (işlem havuzu; form sonucu sorgulayıp alanları doldurur)
+    path('policy/extract/', views.agent_policy_extract, name='agent_policy_extract'),
+    path('policy/extract/<slug:sha256>/', views.agent_policy_extraction_status, name='agent_policy_extraction_status'),
+    
     # Poliçe Dökümanı Silme
     path('policy/delete-document/<int:pk>/', views.agent_policy_document_delete, name='agent_policy_document_delete'),
 
@@ -42,4 +42,15 @@ def extract_policy_data_mock(uploaded_file):
         'start_date': start_date.strftime('%Y-%m-%d'), # Form bekler: YYYY-MM-DD
         'end_date': end_date.strftime('%Y-%m-%d'),     # Form bekler: YYYY-MM-DD
         'premium_amount': premium_amount
-    }
\ No newline at end of file
+    }
+
+
+def extract_policy_data_from_path(path, original_name):
+    """
+    Döküman analizi işlem havuzunda (document_extraction.py) bu fonksiyonla çalışır.
+    Alt süreçte Django kurulmadığı için modeller/ayarlar burada kullanılmamalıdır.
+    """
+    from django.core.files import File
+
+    with open(path, 'rb') as f:
+        return extract_policy_data_mock(File(f, name=original_name))
@@ -7,26 +7,45 @@ from django.contrib.auth.views import LoginView
 from django.contrib.messages.views import SuccessMessageMixin
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
-from django.urls import reverse_lazy
+from django.http import HttpResponse, StreamingHttpResponse, JsonResponse
+from django.urls import reverse, reverse_lazy
 from django.contrib import messages
+from django.conf import settings
 from django.db import transaction
 from django import forms # forms modülünü import ediyoruz
 
-# Eş zamanlı API çağrıları için
-from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta 
 
 # Yerel Modeller
-from .models import Customer, Policy, Quote
+from .models import Customer, Policy, Quote, QuoteJob
 
 # Yerel Kaynaklar (Export)
 from .resources import CustomerResource, PolicyResource
+from .exports import stream_resource_csv
+from .imports import ImportFileError, import_customers, import_policies
 
-# Yerel API Bağlayıcıları (Simülasyonlar)
-from .api_connectors import allianz, doga, turkiye
+# Eş zamanlı teklif motoru (API bağlayıcılarını paralel çağırır)
+from .quote_engine import build_customer_data, get_quotes
+from .quote_jobs import enqueue_quote_job
+from .quote_stream import stream_quote_events
+from . import carrier_metrics
+from .customer_search import get_backend as get_search_backend, search_customers, MIN_QUERY_LENGTH
 
-from .utils import extract_policy_data_mock
+from .quote_persistence import save_offers, summarize_offers
+
+# İmleç tabanlı sayfalama (OFFSET / COUNT(*) yok)
+from .pagination import KeysetPaginationMixin
+
+from .summaries import get_summary
+from . import analytics
+from . import best_offers
+from . import fragment_cache
+
+# Döküman analizi ayrı süreçlerde (işlem havuzu), sonuçlar içerik özetine göre saklanır
+from .document_extraction import (
+    ExtractionQueueFull, extraction_payload, request_extraction, wait_for_extraction,
+)
+from .models import DocumentExtraction
 
 # -----------------------------------------------------
 # FORMLAR (forms.py içeriğini buraya taşıdık)
@@ -94,36 +113,73 @@ class QuoteRequestForm(forms.Form):
 
 
 # -----------------------------------------------------
-# API Bağlantıları ve Mixinler
+# Mixinler
 # -----------------------------------------------------
-API_CONNECTORS = {
-    'allianz': allianz.get_quote,
-    'doga': doga.get_quote,
-    'turkiye': turkiye.get_quote,
-}
+def is_agent(user):
+    return user.is_superuser or user.role == 'agent'
 
 
 class AgentAccessMixin(LoginRequiredMixin, UserPassesTestMixin):
     def test_func(self):
-        user = self.request.user
-        return user.is_superuser or user.role == 'agent'
+        return is_agent(self.request.user)
 
     def get_login_url(self):
         return '/admin/login/?next=' + self.request.path
 
 
+class AgentFragmentCacheMixin:
+    """
+    Şablondaki {% agent_fragment %} bloğunu acente başına önbelleğe alır
+    (fragment_cache.py). Önbellekte varsa get_context_data çağrılmaz: sayfanın
+    sorguları ve o bölümün işlenmesi atlanır.
+    """
+    fragment_name = None
+    fragment_key = None
+
+    def get_fragment_vary_on(self):
+        # Filtre, arama ve imleç parametreleri içeriği belirler
+        return sorted(self.request.GET.lists())
+
+    def get(self, request, *args, **kwargs):
+        self.fragment_key = fragment_cache.fragment_key(
+            request.user.pk, self.fragment_name, *self.get_fragment_vary_on()
+        )
+        html = fragment_cache.get_fragment(self.fragment_key)
+        if html is None:
+            return super().get(request, *args, **kwargs)
+        # get_template_names() ListView'da object_list ister; şablon doğrudan verilir
+        return self.response_class(
+            request=request,
+            template=[self.template_name],
+            context={'view': self, 'fragment_key': self.fragment_key, 'cached_fragment': html},
+            using=self.template_engine,
+        )
+
+    def get_context_data(self, **kwargs):
+        kwargs['fragment_key'] = self.fragment_key
+        return super().get_context_data(**kwargs)
+
+
 # -----------------------------------------------------
 # Acente Dashboard (Özet Sayfa)
 # -----------------------------------------------------
-class AgentDashboardView(AgentAccessMixin, TemplateView):
+class AgentDashboardView(AgentAccessMixin, AgentFragmentCacheMixin, TemplateView):
     template_name = 'agent/dashboard.html'
+    fragment_name = 'dashboard'
+
+    def get_fragment_vary_on(self):
+        # "Yakında bitecek poliçeler" güne bağlı
+        return [date.today().isoformat()]
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         
-        context['customer_count'] = Customer.objects.filter(agent=user).count()
-        context['policy_count'] = Policy.objects.filter(issued_by_agent=user).count()
+        # Sayaçlar her seferinde COUNT(*) ile değil, önceden tutulan özet satırından okunur
+        summary = get_summary(user)
+        context['summary'] = summary
+        context['customer_count'] = summary.customer_count
+        context['policy_count'] = summary.policy_count
         
         seven_days_later = date.today() + timedelta(days=7)
 
@@ -132,6 +188,8 @@ class AgentDashboardView(AgentAccessMixin, TemplateView):
             end_date__lte=seven_days_later,
             end_date__gt=date.today(),
             status='active'
+        ).select_related('customer').only(
+            'policy_number', 'policy_type', 'end_date', 'customer__name'
         ).order_by('end_date')[:5]
         
         return context
@@ -139,13 +197,51 @@ class AgentDashboardView(AgentAccessMixin, TemplateView):
 # -----------------------------------------------------
 # Acenteye Ait Müşteri Listesi & Düzenleme
 # -----------------------------------------------------
-class AgentCustomerListView(AgentAccessMixin, ListView):
+class AgentCustomerListView(AgentAccessMixin, AgentFragmentCacheMixin, KeysetPaginationMixin, ListView):
     model = Customer
     template_name = 'agent/customer_list.html'
     context_object_name = 'customers'
+    keyset_ordering = ['-customer_id']
+    fragment_name = 'customer_list'
     
+    # Arama yapıldığında listelenecek en fazla eşleşme
+    search_limit = 500
+
     def get_queryset(self):
-        return Customer.objects.filter(agent=self.request.user).order_by('-customer_id')
+        # Sadece listede gösterilen sütunlar okunur
+        queryset = Customer.objects.filter(agent=self.request.user).only(
+            'customer_id', 'name', 'tckn', 'date_of_birth', 'phone', 'address_city'
+        )
+
+        # Arama: eşleşen ID'ler tam metin indeksinden gelir (tablo taranmaz)
+        query = self.request.GET.get('q', '').strip()
+        if len(query) >= MIN_QUERY_LENGTH:
+            ids = get_search_backend().search(query, agent_id=self.request.user.pk, limit=self.search_limit)
+            queryset = queryset.filter(customer_id__in=ids)
+
+        return queryset.order_by('-customer_id')
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['search_query'] = self.request.GET.get('q', '').strip()
+        return context
+
+
+@login_required
+def customer_search(request):
+    """Yazarken arama (typeahead) için JSON: en iyi eşleşen müşteriler."""
+    customers = search_customers(request.GET.get('q', ''), agent=request.user, limit=10)
+    return JsonResponse({'results': [
+        {
+            'id': customer.pk,
+            'name': customer.name,
+            'tckn': customer.tckn,
+            'phone': customer.phone,
+            'email': customer.email,
+            'edit_url': reverse('edit_customer', args=[customer.pk]),
+        }
+        for customer in customers
+    ]})
 
 class CustomerCreateView(AgentAccessMixin, CreateView):
     model = Customer
@@ -173,13 +269,19 @@ class CustomerUpdateView(LoginRequiredMixin, UpdateView):
 # -----------------------------------------------------
 # Acenteye Ait Poliçe Listesi
 # -----------------------------------------------------
-class AgentPolicyListView(AgentAccessMixin, ListView):
+class AgentPolicyListView(AgentAccessMixin, AgentFragmentCacheMixin, KeysetPaginationMixin, ListView):
     model = Policy
     template_name = 'agent/policy_list.html'
     context_object_name = 'policies'
+    keyset_ordering = ['-policy_id']
+    fragment_name = 'policy_list'
     
     def get_queryset(self):
-        return Policy.objects.filter(issued_by_agent=self.request.user).order_by('-policy_id')
+        # Müşteri adı aynı sorguda JOIN ile gelir (satır başına ek sorgu yok)
+        return Policy.objects.filter(issued_by_agent=self.request.user).select_related('customer').only(
+            'policy_id', 'policy_number', 'policy_type', 'start_date', 'end_date',
+            'premium_amount', 'status', 'document', 'customer__name'
+        ).order_by('-policy_id')
         
 # -----------------------------------------------------
 # Poliçe Oluşturma ve Düzenleme (Fonksiyon Tabanlı)
@@ -191,10 +293,19 @@ def agent_policy_create(request):
     extracted_data = {}
     if request.method == 'POST':
         is_analysis_request = 'analyze_document' in request.POST
-        if request.FILES and 'document' in request.FILES:
+        # Analiz yalnızca istendiğinde yapılır; havuzdaki sonuç kısa süre beklenir
+        # (sayfa JavaScript ile policy/extract/ üzerinden beklemeden doldurur)
+        if is_analysis_request and request.FILES and 'document' in request.FILES:
             try:
-                uploaded_file = request.FILES['document']
-                extracted_data = extract_policy_data_mock(uploaded_file)
+                extraction = wait_for_extraction(request_extraction(request.FILES['document']))
+                if extraction.status == 'done':
+                    extracted_data = extraction.data
+                elif extraction.status == 'failed':
+                    messages.error(request, f"Döküman analizi sırasında hata oluştu: {extraction.error_message}")
+                else:
+                    messages.info(request, "Döküman analizi sürüyor, birkaç saniye sonra tekrar deneyin.")
+            except ExtractionQueueFull as e:
+                messages.warning(request, str(e))
             except Exception as e:
                 messages.error(request, f"Döküman analizi sırasında hata oluştu: {e}")
         
@@ -203,7 +314,9 @@ def agent_policy_create(request):
             if form.is_valid():
                 policy = form.save(commit=False)
                 policy.issued_by_agent = request.user
-                policy.save() 
+                # Dosya yükleme ve referans sayacı tek işlemde (storage.py)
+                with transaction.atomic():
+                    policy.save()
                 messages.success(request, "Yeni poliçe başarıyla oluşturuldu!")
                 return redirect('agent_policy_list')
         
@@ -218,6 +331,38 @@ def agent_policy_create(request):
     return render(request, 'agent/policy_form.html', context)
 
 
+@login_required
+def agent_policy_extract(request):
+    """Dökümanı analiz kuyruğuna ekler; sonuç hazırsa (aynı içerik daha önce analiz edildiyse) hemen döner."""
+    # Yüklenen dosya diske yazılır: yalnızca acenteler
+    if not is_agent(request.user):
+        return JsonResponse({'error': 'Yetkisiz Erişim'}, status=403)
+    if request.method != 'POST':
+        return HttpResponse(status=405, headers={'Allow': 'POST'})
+    uploaded_file = request.FILES.get('document')
+    if uploaded_file is None:
+        return JsonResponse({'error': 'Döküman seçilmedi.'}, status=400)
+    try:
+        extraction = request_extraction(uploaded_file)
+    except ExtractionQueueFull as e:
+        return JsonResponse({'status': 'busy', 'error': str(e)}, status=503, headers={'Retry-After': '5'})
+
+    payload = extraction_payload(extraction)
+    payload['status_url'] = reverse('agent_policy_extraction_status', args=[extraction.sha256])
+    return JsonResponse(payload, status=200 if payload['done'] else 202)
+
+
+@login_required
+def agent_policy_extraction_status(request, sha256):
+    if not is_agent(request.user):
+        return JsonResponse({'error': 'Yetkisiz Erişim'}, status=403)
+    # Adres içerik özetini içerir: sonucu yalnızca dosyaya sahip olan sorgulayabilir
+    extraction = get_object_or_404(
+        DocumentExtraction.objects.only('sha256', 'status', 'data', 'error_message'), sha256=sha256
+    )
+    return JsonResponse(extraction_payload(extraction))
+
+
 @login_required
 def agent_policy_edit(request, pk):
     # ... (Mevcut agent_policy_edit fonksiyonu buraya gelecek) ...
@@ -225,7 +370,8 @@ def agent_policy_edit(request, pk):
     if request.method == 'POST':
         form = PolicyForm(request.POST, request.FILES, instance=policy)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
             messages.success(request, f"{policy.policy_number} numaralı poliçe başarıyla güncellendi.")
             return redirect('agent_policy_list')
     else:
@@ -250,48 +396,29 @@ def agent_policy_document_delete(request, pk):
     return redirect('agent_policy_list')
     
 
-# -----------------------------------------------------
-# Sahte Teklif Motoru Fonksiyonları
-# -----------------------------------------------------
-
-def get_mock_offers(customer_name, policy_type):
-    # ... (Mevcut get_mock_offers fonksiyonu buraya gelecek) ...
-    base_price = 1000 
-    if 'TRAFIK' in policy_type.upper():
-        base_price = 1200
-        
-    offers = [
-        {'company': 'Ankara Sigorta', 'price': base_price, 'is_best': False, 'status': 'success', 'message': None},
-        {'company': 'Türkiye Sigorta', 'price': base_price * 1.5, 'is_best': False, 'status': 'success', 'message': None},
-        {'company': 'Allianz Sigorta', 'price': base_price * 2.5, 'is_best': False, 'status': 'success', 'message': None},
-        {'company': 'Doğa Sigorta', 'price': base_price * 3.2, 'is_best': False, 'status': 'success', 'message': None},
-        {'company': 'ABC Sigorta', 'price': None, 'is_best': False, 'status': 'error', 'message': 'TCKN/Plaka eşleşmedi'},
-    ]
-    
-    successful_offers = [o for o in offers if o['status'] == 'success']
-    if successful_offers:
-        successful_offers.sort(key=lambda x: x['price'])
-        for offer in offers:
-            if offer.get('price') == successful_offers[0]['price']:
-                offer['is_best'] = True
-                break
-        
-    return offers
-    
 # ----------------------------------------------------------------------
 # FİYAT TEKLİFİ LİSTELEME ve YENİ TEKLİF ALMA
 # ----------------------------------------------------------------------
 
-class QuoteListView(LoginRequiredMixin, ListView):
+class QuoteListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     model = Quote
     template_name = 'agent/quote_list.html'
     context_object_name = 'quotes'
+
+    def get_keyset_ordering(self):
+        # Filtre varsa en ucuz teklif üstte; yoksa en yeni teklif üstte.
+        # Son alan (id) sıralamayı benzersiz yapar, imleç için gereklidir.
+        if self.request.GET.get('customer') or self.request.GET.get('policy_type'):
+            return ['premium_amount', '-created_at', 'id']
+        return ['-created_at', 'premium_amount', 'id']
     
     def get_queryset(self):
         filter_customer_id = self.request.GET.get('customer', None)
         filter_policy_type = self.request.GET.get('policy_type', None)
 
-        queryset = Quote.objects.filter(issued_by_agent=self.request.user)
+        queryset = Quote.objects.filter(issued_by_agent=self.request.user).select_related('customer').only(
+            'id', 'company_name', 'policy_type', 'premium_amount', 'error_message', 'created_at', 'customer__name'
+        )
         
         if filter_customer_id:
             try:
@@ -302,18 +429,29 @@ class QuoteListView(LoginRequiredMixin, ListView):
         if filter_policy_type:
             queryset = queryset.filter(policy_type=filter_policy_type)
         
-        if filter_customer_id or filter_policy_type:
-            queryset = queryset.order_by('premium_amount', '-created_at')
-        else:
-            queryset = queryset.order_by('-created_at', 'premium_amount')
-            
-        return queryset
+        return queryset.order_by(*self.get_keyset_ordering())
         
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
         if 'form' not in context:
             context['form'] = QuoteRequestForm(user=self.request.user) 
+
+        # Arka planda çalışan teklif işi varsa sayfa durumunu yoklar
+        job_id = self.request.GET.get('job')
+        if job_id and job_id.isdigit():
+            context['quote_job_status_url'] = reverse('agent_quote_job_status', args=[int(job_id)])
+
+        # Arka plan modu kapalıyken form sonuçları canlı akıştan okur (JS yoksa normal POST)
+        if not getattr(settings, 'QUOTE_BACKGROUND_JOBS', False):
+            context['quote_stream_url'] = reverse('agent_quote_stream')
+
+        # Filtre listesi için müşteriler (tek sorgu, sadece ad)
+        context['filter_customers'] = Customer.objects.filter(agent=self.request.user).only('customer_id', 'name')
+
+        # En iyi fiyat işareti sıralamadan değil, en iyi teklif tablosundan gelir
+        # (sayfalama/filtre sırasından bağımsız; grup başına tazelik süresindeki en ucuz teklif)
+        context['best_quote_ids'] = best_offers.best_quote_ids(self.request.user, context['quotes'])
             
         return context
 
@@ -324,27 +462,23 @@ class QuoteListView(LoginRequiredMixin, ListView):
             customer = form.cleaned_data['customer']
             policy_type = form.cleaned_data['policy_type']
             
-            offers_data = get_mock_offers(customer.name, policy_type)
+            # Arka plan modu: iş kuyruğa yazılır, istek şirketleri beklemeden döner
+            if getattr(settings, 'QUOTE_BACKGROUND_JOBS', False):
+                job = enqueue_quote_job(request.user, customer, policy_type)
+                status_url = reverse('agent_quote_job_status', args=[job.pk])
+                if request.headers.get('x-requested-with') == 'XMLHttpRequest' or \
+                        'application/json' in request.headers.get('accept', ''):
+                    return JsonResponse({'job_id': job.pk, 'status_url': status_url}, status=202)
+                return redirect(f"{reverse('agent_quote_list')}?job={job.pk}")
+
+            # Tüm şirketler aynı anda çağrılır; yavaş kalanlar 'timeout' olarak döner
+            offers_data = get_quotes(build_customer_data(customer), policy_type)
             
-            with transaction.atomic():
-                for result in offers_data:
-                    
-                    quote = Quote(
-                        company_name=result['company'],
-                        policy_type=policy_type,
-                        issued_by_agent=request.user,
-                        customer=customer
-                    )
-                    
-                    if result['status'] == 'success' and result.get('price') is not None:
-                        quote.premium_amount = result['price']
-                        messages.success(request, f"{result['company']} teklifi başarıyla alındı: {result['price']} TL")
-                    else:
-                        quote.premium_amount = 0 
-                        quote.error_message = result.get('message', 'Bilinmeyen API hatası')
-                        messages.warning(request, f"{result['company']} teklif vermedi: {result.get('message', 'Bilinmeyen Hata')}")
-                    
-                    quote.save()
+            # Tüm teklifler tek INSERT ile yazılır, kullanıcıya tek özet mesaj gösterilir
+            save_offers(offers_data, policy_type, request.user, customer)
+            carrier_metrics.flush()
+            level, summary = summarize_offers(offers_data)
+            messages.add_message(request, level, summary)
 
             return redirect(reverse_lazy('agent_quote_list'))
 
@@ -360,7 +494,7 @@ class QuoteDetailView(LoginRequiredMixin, DetailView):
     context_object_name = 'quote'
     
     def get_queryset(self):
-        return Quote.objects.filter(issued_by_agent=self.request.user)
+        return Quote.objects.filter(issued_by_agent=self.request.user).select_related('customer', 'issued_by_agent')
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -388,6 +522,112 @@ class QuoteDetailView(LoginRequiredMixin, DetailView):
              ]
 
 
+# ----------------------------------------------------------------------
+# ARKA PLAN TEKLİF İŞİ DURUMU (JSON)
+# ----------------------------------------------------------------------
+@login_required
+def quote_job_status(request, pk):
+    job = get_object_or_404(
+        QuoteJob.objects.only('id', 'status', 'results', 'error_message', 'agent_id'),
+        pk=pk, agent=request.user
+    )
+    return JsonResponse({
+        'job_id': job.pk,
+        'status': job.status,
+        'done': job.status in ('done', 'failed'),
+        'results': job.results,
+        'error': job.error_message,
+    })
+
+
+# ----------------------------------------------------------------------
+# CANLI TEKLİF AKIŞI (Server-Sent Events)
+# ----------------------------------------------------------------------
+@login_required
+def quote_stream(request):
+    # Teklifler kaydedildiği için POST (CSRF korumalı); tarayıcı yanıtı fetch ile okur
+    if request.method != 'POST':
+        return HttpResponse(status=405, headers={'Allow': 'POST'})
+
+    form = QuoteRequestForm(request.POST, user=request.user)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    response = StreamingHttpResponse(
+        stream_quote_events(request.user, form.cleaned_data['customer'], form.cleaned_data['policy_type']),
+        content_type='text/event-stream; charset=utf-8',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx arkasında tamponlamayı kapatır
+    return response
+
+
+# ----------------------------------------------------------------------
+# ŞİRKET METRİKLERİ (JSON)
+# ----------------------------------------------------------------------
+@login_required
+def carrier_metrics_view(request):
+    # Operasyonel veri: sadece yönetici kullanıcılar
+    if not request.user.is_staff:
+        return HttpResponse('Yetkisiz Erişim', status=403)
+
+    carrier_metrics.flush(force=True)
+    return JsonResponse({
+        'carriers': carrier_metrics.collect(
+            carrier=request.GET.get('carrier'), policy_type=request.GET.get('policy_type')
+        ),
+        'latency_buckets': ['inf' if b == float('inf') else b for b in carrier_metrics.LATENCY_BUCKETS],
+    })
+
+
+# ----------------------------------------------------------------------
+# PRİM ANALİZİ (gruplanmış toplamlar; acente kendi poliçelerini, yönetici tümünü görür)
+# ----------------------------------------------------------------------
+@login_required
+def premium_analytics_api(request):
+    try:
+        params = analytics.parse_params(request.GET, request.user)
+    except analytics.AnalyticsError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(analytics.get_analytics(request.user, params))
+
+
+@login_required
+def premium_analytics(request):
+    context = {
+        'dimensions': analytics.DIMENSION_LABELS.items(),
+        'statuses': Policy.STATUS_CHOICES,
+        'is_admin': analytics.is_admin(request.user),
+        'result': None,
+    }
+    data = request.GET.copy()
+    data.setdefault('stats', '1')
+    if 'group_by' in request.GET:
+        data['group_by'] = ','.join(request.GET.getlist('group_by'))
+    try:
+        params = analytics.parse_params(data, request.user)
+        context['params'] = params
+        context['result'] = analytics.get_analytics(request.user, params)
+    except analytics.AnalyticsError as e:
+        messages.error(request, str(e))
+        context['params'] = {'group_by': ['policy_type']}
+
+    result = context['result']
+    if result:
+        group_by = result['group_by']
+        context['columns'] = [analytics.DIMENSION_LABELS[name] for name in group_by]
+        context['table'] = [([row[name] for name in group_by], row) for row in result['rows']]
+        context['api_url'] = reverse('premium_analytics_api') + '?' + data.urlencode()
+    if result and result.get('distribution'):
+        counts = result['distribution']['counts']
+        peak = max(counts) or 1
+        context['distribution_rows'] = [
+            {'upper': upper, 'count': count, 'width': round(count * 100 / peak)}
+            for upper, count in zip(result['distribution']['buckets'], counts)
+        ]
+    return render(request, 'agent/premium_analytics.html', context)
+
+
 # -----------------------------------------------------
 # Veri Dışa Aktarma Görünümleri (Export Views)
 # -----------------------------------------------------
@@ -397,9 +637,9 @@ def export_customer_data(request):
         return HttpResponse('Yetkisiz Erişim', status=403)
         
     queryset = Customer.objects.filter(agent=request.user)
-    dataset = CustomerResource().export(queryset)
     
-    response = HttpResponse(dataset.csv, content_type='text/csv')
+    # Satırlar parça parça okunup yazılır (tüm liste belleğe alınmaz)
+    response = StreamingHttpResponse(stream_resource_csv(CustomerResource(), queryset), content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="musteri_listesi.csv"'
     return response
 
@@ -408,12 +648,52 @@ def export_policy_data(request):
         return HttpResponse('Yetkisiz Erişim', status=403)
         
     queryset = Policy.objects.filter(issued_by_agent=request.user)
-    dataset = PolicyResource().export(queryset)
     
-    response = HttpResponse(dataset.csv, content_type='text/csv')
+    # Satırlar parça parça okunup yazılır (tüm liste belleğe alınmaz)
+    response = StreamingHttpResponse(stream_resource_csv(PolicyResource(), queryset), content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="police_listesi.csv"'
     return response
 
+# -----------------------------------------------------
+# Toplu İçe Aktarma (CSV / XLSX)
+# -----------------------------------------------------
+def _import_view(request, importer, context):
+    context.update(report=None, dry_run=False)
+    if request.method == 'POST':
+        uploaded_file = request.FILES.get('file')
+        if uploaded_file is None:
+            messages.error(request, "Lütfen bir dosya seçin.")
+        else:
+            context['dry_run'] = bool(request.POST.get('dry_run'))
+            try:
+                context['report'] = importer(
+                    uploaded_file, request.user, file_name=uploaded_file.name, dry_run=context['dry_run']
+                )
+            except ImportFileError as e:
+                messages.error(request, str(e))
+    return render(request, 'agent/import_form.html', context)
+
+
+@login_required
+def agent_policy_import(request):
+    return _import_view(request, import_policies, {
+        'page_title': 'Toplu Poliçe Yükleme',
+        'columns': ['policy_number', 'policy_type', 'customer (ID) veya customer_tckn', 'start_date',
+                    'end_date', 'premium_amount', 'status'],
+        'back_url': reverse('agent_policy_list'),
+    })
+
+
+@login_required
+def agent_customer_import(request):
+    return _import_view(request, import_customers, {
+        'page_title': 'Toplu Müşteri Yükleme',
+        'columns': ['name', 'tckn (TCKN veya VKN)', 'customer_type', 'phone', 'email', 'address_street',
+                    'address_city', 'address_state', 'address_zipcode', 'date_of_birth'],
+        'back_url': reverse('agent_customer_list'),
+    })
+
+
 # -----------------------------------------------------
 # Özel Giriş Sayfası (Login View)
 # -----------------------------------------------------